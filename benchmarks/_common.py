@@ -0,0 +1,29 @@
+"""Setup shared by the benchmarks."""
+import os
+import tempfile
+from contextlib import contextmanager
+from database.db_manager import DatabaseManager
+from utils.auth import Auth
+
+MASTER_PASSWORD = 'benchmark-master-password'
+
+@contextmanager
+def temporary_vault(password: str = MASTER_PASSWORD, chdir: bool = False):
+    """An empty vault in a temporary directory, removed with everything in it afterwards.
+
+    Yields the open DatabaseManager; scratch files can go next to its db_path.
+    With chdir=True the block runs inside the directory, for the benchmarks
+    that open a MainWindow, which finds its vaults in the working directory.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        auth = Auth(config_file=os.path.join(directory, 'config.json'))
+        auth.set_master_password(password)
+        db = DatabaseManager(password, auth, db_path=os.path.join(directory, 'passwords.db'))
+        cwd = os.getcwd()
+        if chdir:
+            os.chdir(directory)
+        try:
+            yield db
+        finally:
+            db.close()
+            os.chdir(cwd)
\ No newline at end of file
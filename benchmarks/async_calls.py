@@ -0,0 +1,82 @@
+"""UI responsiveness while the vault is queried: blocking calls on the event loop
+against the same calls awaited through utils.async_calls.
+
+A 5 ms heartbeat timer stands in for the UI; its longest gap is how long the
+window would have frozen. Needs a display, or QT_QPA_PLATFORM=offscreen.
+
+Run from the repository root:  python -m benchmarks.async_calls [rows]
+"""
+import asyncio
+import sys
+import time
+from PySide6.QtCore import QCoreApplication, QTimer
+import PySide6.QtAsyncio as QtAsyncio
+from benchmarks._common import temporary_vault
+
+def workload(db):
+    """A burst of the reads one busy moment in the UI triggers."""
+    return [
+        (db.get_all_passwords, (), {'include_passwords': False}),
+        (db.search_passwords, ('site12',), {'include_passwords': False}),
+        (db.search_passwords, ('user7',), {'include_passwords': False}),
+        (db.find_for_url, ('https://www.site4242.example.com/login',), {}),
+        (db.get_category_counts, (), {}),
+        (db.get_secret, (4242,), {}),
+        (db.get_search_index, (), {}),
+    ]
+
+async def measure(db, label, run):
+    gaps = []
+    last = [time.perf_counter()]
+
+    def beat():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+    heartbeat = QTimer()
+    heartbeat.timeout.connect(beat)
+    heartbeat.start(5)
+    await asyncio.sleep(0.05)
+
+    # Cold caches and no quick search index in every run, as right after unlocking
+    db.cache.invalidate()
+    db._index_pool.pop(db._pool_key, None)
+    start = time.perf_counter()
+    await run()
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.05)
+    heartbeat.stop()
+    print(f"  {label:<28} {elapsed * 1000:8.0f} ms   longest UI stall {max(gaps) * 1000:6.0f} ms")
+
+async def benchmark(db):
+    from utils.async_calls import run_blocking
+
+    async def blocking():
+        for func, args, kwargs in workload(db):
+            func(*args, **kwargs)
+
+    async def awaited_one_by_one():
+        for func, args, kwargs in workload(db):
+            await run_blocking(func, *args, **kwargs)
+
+    async def awaited_together():
+        await asyncio.gather(*(run_blocking(func, *args, **kwargs)
+                               for func, args, kwargs in workload(db)))
+
+    await measure(db, "blocking on the event loop", blocking)
+    await measure(db, "awaited, one by one", awaited_one_by_one)
+    await measure(db, "awaited, overlapping", awaited_together)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    QCoreApplication(sys.argv[:1])
+    with temporary_vault() as db:
+        db.add_passwords_bulk((f'https://www.site{i}.example.com/login', f'user{i}@example.com',
+                               'correct horse battery staple', f'Category {i % 20}', None)
+                              for i in range(count))
+        print(f"{count} rows; a burst of {len(workload(db))} reads")
+        QtAsyncio.run(benchmark(db), keep_running=False)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
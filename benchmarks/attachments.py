@@ -0,0 +1,58 @@
+"""Streaming throughput and peak memory of encrypted attachments, and the table listing with them present.
+
+Run from the repository root:  python -m benchmarks.attachments [megabytes]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from benchmarks._common import temporary_vault
+
+def list_page_ms(db) -> float:
+    start = time.perf_counter()
+    for _ in range(20):
+        db.get_all_passwords(sort='website', limit=500)
+    return (time.perf_counter() - start) / 20 * 1000
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with temporary_vault() as db:
+        # Scratch files go next to the vault and are removed with it
+        large, restored, small = (os.path.join(os.path.dirname(db.db_path), name)
+                                  for name in ('large.bin', 'restored.bin', 'small.bin'))
+        db.add_passwords_bulk((f'site{i}.example.com', f'user{i}', 'correct horse battery staple', None, None)
+                              for i in range(10_000))
+        before_ms = list_page_ms(db)
+
+        with open(large, 'wb') as f:
+            for _ in range(megabytes):
+                f.write(os.urandom(2**20))
+        tracemalloc.start()
+        start = time.perf_counter()
+        attachment_id = db.attachments.add_file(1, large)
+        write_seconds = time.perf_counter() - start
+        write_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        db.attachments.save(attachment_id, restored)
+        read_seconds = time.perf_counter() - start
+        read_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # A few hundred smaller files spread over the vault
+        with open(small, 'wb') as f:
+            f.write(os.urandom(256 * 1024))
+        for password_id in range(1, 10_001, 25):
+            db.attachments.add_file(password_id, small)
+        after_ms = list_page_ms(db)
+
+        print(f"{megabytes} MiB attachment")
+        print(f"  write: {megabytes / write_seconds:7.1f} MiB/s, peak {write_peak / 1024:.0f} KiB traced")
+        print(f"  read:  {megabytes / read_seconds:7.1f} MiB/s, peak {read_peak / 1024:.0f} KiB traced")
+        print(f"  round trip intact: {os.path.getsize(restored) == os.path.getsize(large)}")
+        print(f"500-row table page of 10k entries: {before_ms:.2f} ms without attachments, "
+              f"{after_ms:.2f} ms with {megabytes} MiB + 400 x 256 KiB attached")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
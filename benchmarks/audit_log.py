@@ -0,0 +1,53 @@
+"""Time the UI thread spends per audit event: a commit per event against the batched audit log.
+
+Run from the repository root:  python -m benchmarks.audit_log [events]
+"""
+import sys
+import time
+from benchmarks._common import temporary_vault
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    from database.audit import GENESIS_HASH, event_hash
+
+    with temporary_vault() as db:
+        db.add_passwords_bulk((f'site{i}.example.com', f'user{i}', 'correct horse battery staple', None, None)
+                              for i in range(10_000))
+
+        # One INSERT and commit per event, chained the same way, on the caller's thread
+        start = time.perf_counter()
+        for i in range(count):
+            event_id, previous = db.conn.execute(
+                'SELECT id, hash FROM audit_log ORDER BY id DESC LIMIT 1').fetchone() or (0, GENESIS_HASH)
+            created_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+            row = (event_id + 1, created_at, 'bench', 'copy', i % 10_000 + 1, 'Password')
+            db.conn.execute('INSERT INTO audit_log (id, created_at, actor, action, password_id, detail, hash) '
+                            'VALUES (?, ?, ?, ?, ?, ?, ?)', row + (event_hash(previous, *row),))
+            db.conn.commit()
+        sync_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(count):
+            db.audit.record('copy', i % 10_000 + 1, 'Password')
+        record_seconds = time.perf_counter() - start
+        db.audit.flush()
+        total_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        events = db.get_audit_events(password_id=42)
+        query_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        broken = db.verify_audit_log()
+        verify_seconds = time.perf_counter() - start
+
+        print(f"{count} events")
+        print(f"  commit per event: {sync_seconds / count * 1000:7.3f} ms per event on the UI thread, "
+              f"{sync_seconds:.2f} s total")
+        print(f"  audit log:        {record_seconds / count * 1000:7.3f} ms per event on the UI thread, "
+              f"{total_seconds:.2f} s until flushed")
+        print(f"  history of one entry: {len(events)} events in {query_ms:.2f} ms")
+        print(f"  verified {2 * count} chained rows in {verify_seconds:.2f} s, "
+              f"{'intact' if broken is None else f'broken at {broken}'}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
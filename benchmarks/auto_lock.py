@@ -0,0 +1,73 @@
+"""Lock and re-unlock latency against logging in from scratch, plus the idle filter's cost per event.
+
+Run from the repository root:  python -m benchmarks.auto_lock [rows]
+"""
+import asyncio
+import os
+import sys
+import time
+import traceback
+from benchmarks._common import MASTER_PASSWORD, temporary_vault
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QEvent, QPointF, QTimer, Qt
+    from PySide6.QtGui import QMouseEvent
+    import PySide6.QtAsyncio as QtAsyncio
+    from utils.auth import Auth
+    from utils.async_calls import spawn
+
+    app = QApplication(sys.argv[:1])
+    password = MASTER_PASSWORD
+    from ui.main_window import MainWindow
+
+    async def scenario():
+        # What the login window does, up to the first page of the table
+        start = time.perf_counter()
+        Auth().verify_password(password)
+        window = MainWindow(password)
+        while window.table_task is None:
+            await asyncio.sleep(0.001)  # setup_ui() runs from the event loop
+        await window.table_task
+        login_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        window.lock_session()
+        lock_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        await window.unlock_session(password)
+        unlock_ms = (time.perf_counter() - start) * 1000
+
+        event = QMouseEvent(QEvent.Type.MouseMove, QPointF(5, 5), QPointF(5, 5), Qt.MouseButton.NoButton,
+                            Qt.MouseButton.NoButton, Qt.KeyboardModifier.NoModifier)
+        start = time.perf_counter()
+        for _ in range(100_000):
+            window.idle_lock.eventFilter(window, event)
+        filter_us = (time.perf_counter() - start) * 10
+
+        print(f"{count} entries")
+        print(f"  login from scratch: {login_ms:7.1f} ms (bcrypt, key unwrap, window and first page)")
+        print(f"  lock:               {lock_ms:7.1f} ms")
+        print(f"  re-unlock:          {unlock_ms:7.1f} ms (key unwrap only), "
+              f"table still has {window.password_table.rowCount()} rows")
+        print(f"  idle filter:        {filter_us:7.3f} µs per input event")
+
+    async def run():
+        try:
+            await scenario()
+        except Exception:
+            traceback.print_exc()  # QtAsyncio would only report that the task failed
+        finally:
+            app.quit()
+
+    with temporary_vault(chdir=True) as db:
+        db.add_passwords_bulk((f'site{i}.example.com', f'user{i}', 'correct horse battery staple', None, None)
+                              for i in range(count))
+        db.close()
+        QTimer.singleShot(0, lambda: spawn(run()))
+        QtAsyncio.run(handle_sigint=True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
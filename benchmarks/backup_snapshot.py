@@ -0,0 +1,49 @@
+"""Time and size of encrypted vault backups, and UI write latency while one runs.
+
+Run from the repository root:  python -m benchmarks.backup_snapshot [rows]
+"""
+import os
+import sys
+import time
+from datetime import datetime
+from benchmarks._common import temporary_vault
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with temporary_vault() as db:
+        timestamp = datetime(2020, 1, 1).isoformat()
+        with db.transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO passwords (id, website, username, password, category,
+                                       tags, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', ((i, f'https://site{i}.example.com', f'user{i}@example.com',
+                   db.encryptor.encrypt('correct horse battery staple', i),
+                   'Work', 'email, social', timestamp, timestamp) for i in range(1, count + 1)))
+        print(f"{count} rows, database {os.path.getsize(db.db_path) / 2**20:.1f} MiB\n")
+        print(f"{'backup':<26} {'seconds':>8} {'size MiB':>9} {'max write ms':>13}")
+
+        def run(label, incremental, write_every=None):
+            # Optionally keep writing from the "UI" connection while the backup runs
+            job = db.start_backup(incremental=incremental)
+            worst = 0.0
+            while job.is_alive():
+                if write_every:
+                    start = time.perf_counter()
+                    db.update_password(1, username=f'user-{time.monotonic()}')
+                    worst = max(worst, time.perf_counter() - start)
+                time.sleep(write_every or 0.01)
+            progress = job.progress()
+            print(f"{label:<26} {progress['seconds']:>8.2f} {progress['size'] / 2**20:>9.2f} "
+                  f"{worst * 1000:>13.1f}")
+
+        run("full", False)
+        run("full, writing every 100ms", False, write_every=0.1)
+        for i in range(2, count // 100 + 2):
+            db.update_password(i, username=f'changed{i}')
+        run("incremental (1% rows)", True)
+        run("incremental (no change)", True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
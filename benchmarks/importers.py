@@ -0,0 +1,81 @@
+"""Throughput and peak memory of the foreign-export importers on generated files.
+
+Run from the repository root:  python -m benchmarks.importers [rows]
+"""
+import csv
+import json
+import os
+import sys
+import time
+import tracemalloc
+from xml.sax.saxutils import escape
+from benchmarks._common import temporary_vault
+
+def write_csv(path, count):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'url', 'username', 'password'])
+        for i in range(count):
+            writer.writerow([f'site{i}.example.com', f'https://site{i}.example.com/login',
+                             f'user{i}@example.com', f'pw-{i}-correct-horse'])
+
+def write_bitwarden(path, count):
+    with open(path, 'w') as f:
+        f.write('{"encrypted": false, "folders": [{"id": "f1", "name": "Work"}], "items": [\n')
+        for i in range(count):
+            item = {'id': str(i), 'type': 1, 'name': f'site{i}', 'folderId': 'f1',
+                    'login': {'username': f'user{i}@example.com', 'password': f'pw-{i}-correct-horse',
+                              'uris': [{'uri': f'https://site{i}.example.com/login'}]}}
+            f.write(('  ' if i == 0 else ', ') + json.dumps(item) + '\n')
+        f.write(']}')
+
+def write_keepass(path, count):
+    with open(path, 'w') as f:
+        f.write('<KeePassFile><Root><Group><Name>Database</Name><Group><Name>Work</Name>\n')
+        for i in range(count):
+            strings = {'Title': f'site{i}', 'URL': f'https://site{i}.example.com/login',
+                       'UserName': f'user{i}@example.com', 'Password': f'pw-{i}-correct-horse'}
+            f.write('<Entry>' + ''.join(
+                f'<String><Key>{key}</Key><Value>{escape(value)}</Value></String>'
+                for key, value in strings.items()) + '<Tags>imported</Tags></Entry>\n')
+        f.write('</Group></Group></Root></KeePassFile>')
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    from importers import IMPORTERS, import_file
+
+    with temporary_vault() as db:
+
+        files = {'passwords.csv': write_csv, 'bitwarden.json': write_bitwarden,
+                 'keepass.xml': write_keepass}
+        print(f"{count} entries per file\n")
+        print(f"{'file':<16} {'MiB':>6} {'parse rows/s':>13} {'peak MiB':>9} "
+              f"{'import rows/s':>14} {'re-import s':>12}")
+        for name, write in files.items():
+            path = os.path.join(os.path.dirname(db.db_path), name)  # Removed with the vault
+            write(path, count)
+            importer = IMPORTERS[os.path.splitext(name)[1]]
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            parsed = sum(1 for _ in importer(path))
+            parse_seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            # Each file gets an empty vault, then a second pass that is all duplicates
+            with db.transaction() as cursor:
+                cursor.execute('DELETE FROM passwords')
+            start = time.perf_counter()
+            result = import_file(db, path)
+            import_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            again = import_file(db, path)
+            reimport_seconds = time.perf_counter() - start
+            assert parsed == count and result.imported == count and again.duplicates == count
+
+            print(f"{name:<16} {os.path.getsize(path) / 2**20:>6.1f} {parsed / parse_seconds:>13,.0f} "
+                  f"{peak / 2**20:>9.2f} {count / import_seconds:>14,.0f} {reimport_seconds:>12.2f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""Per-keystroke latency of the quick search index against the SQL substring search.
+
+Run from the repository root:  python -m benchmarks.quick_search [rows]
+"""
+import sys
+import time
+import tracemalloc
+from benchmarks._common import MASTER_PASSWORD, temporary_vault
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    from database.db_manager import DatabaseManager
+    from utils.search_index import SearchIndex
+
+    with temporary_vault() as db:
+        db.add_passwords_bulk((f'https://www.site{i}.example.com/login', f'user{i}@example.com',
+                               'correct horse battery staple', None, None) for i in range(count))
+        db.close()
+        db = DatabaseManager(MASTER_PASSWORD, db.auth, db.db_path)
+
+        start = time.perf_counter()
+        index = db.get_search_index()
+        build_seconds = time.perf_counter() - start
+        # Size measured on a second build; tracing would distort the timing above
+        snapshot = [(password_id, website, username)
+                    for password_id, website, username, _, _, _ in db.get_metadata_snapshot()]
+        tracemalloc.start()
+        copy = SearchIndex(snapshot)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del copy
+        print(f"{count} rows; index built in {build_seconds:.2f}s, {size / 2**20:.1f} MiB\n")
+
+        # Typing "site4242" one key at a time, then a username fragment
+        keystrokes = ['site4242'[:n] for n in range(1, 9)] + ['ser424', 'user4242 exam']
+        print(f"{'query':<16} {'index ms':>9} {'sql ms':>8}")
+        for query in keystrokes:
+            start = time.perf_counter()
+            index.search(query, limit=20)
+            index_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            db.search_passwords(query, include_passwords=False)
+            sql_ms = (time.perf_counter() - start) * 1000
+            print(f"{query:<16} {index_ms:>9.2f} {sql_ms:>8.2f}")
+
+        start = time.perf_counter()
+        for i in range(1, 1001):
+            db.update_password(i, username=f'renamed{i}@example.com')
+        print(f"\n1000 edits kept in the index: {(time.perf_counter() - start) * 1000:.0f} ms total, "
+              f"search after: {index.search('renamed999')[:1]}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Stored size and throughput of the AES-GCM record format vs legacy Fernet tokens.
+
+Run from the repository root:  python -m benchmarks.record_format [rows]
+"""
+import os
+import sys
+import time
+from cryptography.fernet import Fernet
+from utils.encryption import Encryptor
+
+def rate(count, func):
+    start = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - start)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    encryptor = Encryptor({1: os.urandom(32)}, 1)
+    fernet = Fernet(Fernet.generate_key())
+
+    print(f"{'secret':>8} {'fernet B':>9} {'gcm B':>6}")
+    for length in (8, 16, 32, 64):
+        secret = 'x' * length
+        print(f"{length:>8} {len(fernet.encrypt(secret.encode())):>9} "
+              f"{len(encryptor.encrypt(secret, 1)):>6}")
+
+    secrets = [f'p@ssw0rd-{i:08d}' for i in range(count)]
+    fernet_rows = []
+    gcm_rows = []
+    print(f"\n{count} rows of {len(secrets[0])}-char secrets, rows/s")
+    print(f"{'':<8} {'encrypt':>10} {'decrypt':>10}")
+    enc = rate(count, lambda: fernet_rows.extend(fernet.encrypt(s.encode()) for s in secrets))
+    dec = rate(count, lambda: [fernet.decrypt(token) for token in fernet_rows])
+    print(f"{'fernet':<8} {enc:>10,.0f} {dec:>10,.0f}")
+    enc = rate(count, lambda: gcm_rows.extend(
+        encryptor.encrypt(s, i) for i, s in enumerate(secrets)))
+    dec = rate(count, lambda: [encryptor.decrypt(blob, i) for i, blob in enumerate(gcm_rows)])
+    print(f"{'aes-gcm':<8} {enc:>10,.0f} {dec:>10,.0f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""Heap used by 100k listed passwords: the old per-row dicts vs PasswordRecord.
+
+Run from the repository root:  python -m benchmarks.record_memory [rows]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from benchmarks._common import temporary_vault
+
+def measure(label, build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<38} {size / len(rows):8.1f} B/row  {size / 2**20:8.1f} MiB  {elapsed:6.2f} s")
+    return rows
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with temporary_vault() as db:
+        timestamp = datetime.now().isoformat()
+        with db.transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO passwords (id, website, username, password, category,
+                                       tags, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', ((i, f'https://site{i}.example.com', f'user{i}@example.com',
+                   db.encryptor.encrypt('correct horse battery staple', i),
+                   'Work', 'email, social', timestamp, timestamp) for i in range(1, count + 1)))
+
+        def old_dicts():
+            # What get_all_passwords used to build: one dict per row, decrypted up front
+            cursor = db.conn.execute('SELECT * FROM passwords ORDER BY updated_at DESC')
+            return [{
+                'id': row[0],
+                'website': row[1],
+                'username': row[2],
+                'password': db.encryptor.decrypt(row[3], row[0]),
+                'category': row[4],
+                'tags': row[5],
+                'created_at': row[6],
+                'updated_at': row[7]
+            } for row in cursor.fetchall()]
+
+        print(f"{count} rows")
+        measure("dict rows (decrypted)", old_dicts)
+        measure("PasswordRecord (lazy, with blob)", db.get_all_passwords)
+        measure("PasswordRecord (metadata only)",
+                lambda: db.get_all_passwords(include_passwords=False))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
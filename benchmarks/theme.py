@@ -0,0 +1,98 @@
+"""Cost of a style sheet per widget against one application style sheet.
+
+Builds the same table of row buttons both ways, and opens a dialog with and
+without its own sheet. Needs a display, or QT_QPA_PLATFORM=offscreen.
+
+Run from the repository root:  python -m benchmarks.theme [rows]
+"""
+import sys
+import time
+from PySide6.QtCore import QEvent
+from PySide6.QtWidgets import QApplication, QTableWidget, QPushButton, QDialog, QVBoxLayout, QLineEdit
+from ui.theme import build_stylesheet
+
+ROW_BUTTON_STYLE = """
+    QPushButton {
+        background-color: #d63031;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 4px;
+    }
+    QPushButton:hover {
+        background-color: #c02627;
+    }
+"""
+
+def flush_deletes(app):
+    # deleteLater() only runs from an event loop; keep the widget count flat between runs
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+def build_table(app, rows, per_widget):
+    table = QTableWidget(rows, 2)
+    start = time.perf_counter()
+    for row in range(rows):
+        for column in range(2):
+            button = QPushButton("x")
+            if per_widget:
+                button.setStyleSheet(ROW_BUTTON_STYLE)
+            else:
+                button.setProperty("variant", "danger")
+            table.setCellWidget(row, column, button)
+    table.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    table.deleteLater()
+    flush_deletes(app)
+    return elapsed
+
+def open_dialogs(app, count, sheet):
+    start = time.perf_counter()
+    for _ in range(count):
+        dialog = QDialog()
+        if sheet:
+            dialog.setStyleSheet(sheet)
+        layout = QVBoxLayout(dialog)
+        for _ in range(4):
+            layout.addWidget(QLineEdit())
+        layout.addWidget(QPushButton("Save"))
+        dialog.show()
+        app.processEvents()
+        dialog.close()
+        dialog.deleteLater()
+        flush_deletes(app)
+    return (time.perf_counter() - start) / count * 1000
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    app = QApplication(sys.argv[:1])
+    sheet = build_stylesheet()
+    app.setStyleSheet(sheet)
+
+    per_widget = build_table(app, rows, per_widget=True)
+    themed = build_table(app, rows, per_widget=False)
+    print(f"table of {rows} rows, 2 buttons each")
+    print(f"  sheet per button:  {per_widget * 1000:8.0f} ms")
+    print(f"  variant property:  {themed * 1000:8.0f} ms")
+
+    own_sheet = open_dialogs(app, 50, sheet)
+    shared = open_dialogs(app, 50, None)
+    print("dialog open, mean of 50")
+    print(f"  own style sheet:   {own_sheet:8.1f} ms")
+    print(f"  application sheet: {shared:8.1f} ms")
+
+    table = QTableWidget(rows, 2)
+    for row in range(rows):
+        for column in range(2):
+            button = QPushButton("x")
+            button.setProperty("variant", "danger")
+            table.setCellWidget(row, column, button)
+    table.show()
+    app.processEvents()
+    start = time.perf_counter()
+    app.setStyleSheet(build_stylesheet('light'))
+    app.processEvents()
+    print(f"theme switch with the {rows}-row table open: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
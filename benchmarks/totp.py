@@ -0,0 +1,77 @@
+"""Cost of a 2FA code tick for a small and a large vault where every entry has a secret.
+
+Run from the repository root:  python -m benchmarks.totp [rows ...]
+"""
+import asyncio
+import os
+import sys
+import time
+import traceback
+from benchmarks._common import MASTER_PASSWORD, temporary_vault
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [20, 20_000]
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+    import PySide6.QtAsyncio as QtAsyncio
+    from utils.async_calls import spawn
+    from database.attachments import TOTP_NAME
+
+    app = QApplication(sys.argv[:1])
+    password = MASTER_PASSWORD
+    from ui.main_window import MainWindow
+
+    def fill_vault(db, count: int):
+        db.add_passwords_bulk((f'site{i}.example.com', f'user{i}', 'correct horse battery staple', None, None)
+                              for i in range(count))
+        with db.transaction() as cursor:
+            for password_id in range(1, count + 1):
+                db.attachments.replace_small(cursor, password_id, 'totp', TOTP_NAME, b'JBSWY3DPEHPK3PXP')
+        db.close()
+
+    async def measure(count: int):
+        window = MainWindow(password)
+        window.show()
+        window.resize(1000, 700)
+        while window.table_task is None:
+            await asyncio.sleep(0.001)  # setup_ui() runs from the event loop
+        await window.table_task
+        column = window.totp_column
+        column.cache.clear()
+        before = column.computed
+        start = time.perf_counter()
+        column.refresh()  # First sight: secrets read and decrypted, codes computed
+        first_ms = (time.perf_counter() - start) * 1000
+        computed = column.computed
+
+        ticks = 200
+        now = time.time()
+        start = time.perf_counter()
+        for tick in range(1, ticks + 1):
+            column.refresh(now=now + 30 * tick)  # Every one a new time step
+        tick_us = (time.perf_counter() - start) / ticks * 1_000_000
+        per_tick = (column.computed - computed) / ticks
+
+        print(f"{count} entries, {window.password_table.rowCount()} rows in the table")
+        print(f"  first refresh: {first_ms:7.2f} ms, {computed - before} codes")
+        print(f"  tick:          {tick_us:7.1f} µs, {per_tick:.0f} HMACs")
+        window.lock_session()  # Stops its timers before the vault's directory is removed
+        window.close()
+
+    async def run():
+        try:
+            for count in counts:
+                with temporary_vault(chdir=True) as db:
+                    fill_vault(db, count)
+                    await measure(count)
+        except Exception:
+            traceback.print_exc()  # QtAsyncio would only report that the task failed
+        finally:
+            app.quit()
+
+    QTimer.singleShot(0, lambda: spawn(run()))
+    QtAsyncio.run(handle_sigint=True)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
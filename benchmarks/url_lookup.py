@@ -0,0 +1,31 @@
+"""Latency of find_for_url() against a substring search for the same site.
+
+Run from the repository root:  python -m benchmarks.url_lookup [rows]
+"""
+import sys
+import time
+from benchmarks._common import temporary_vault
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with temporary_vault() as db:
+        db.add_passwords_bulk((f'https://www.site{i}.co.uk/login', f'user{i}@example.com',
+                               'correct horse battery staple', None, None) for i in range(count))
+        urls = [f'https://accounts.site{i}.co.uk/signin?next=/' for i in range(0, count, 97)]
+        print(f"{count} rows, {len(urls)} lookups\n")
+        print(f"{'lookup':<22} {'ms per url':>11}")
+
+        def run(label, lookup, urls=urls):
+            start = time.perf_counter()
+            for url in urls:
+                assert lookup(url)
+            print(f"{label:<22} {(time.perf_counter() - start) / len(urls) * 1000:>11.3f}")
+
+        run("find_for_url", lambda url: db.find_for_url(url))
+        run("substring search", lambda url: db.search_passwords(url.split('/')[2].split('.', 1)[1],
+                                                                include_passwords=False),
+            urls[:20])  # A full scan per lookup; a sample is enough
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
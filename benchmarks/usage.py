@@ -0,0 +1,77 @@
+"""Cost of counting copies, batched against a commit per copy, and of the "most used first" order.
+
+Run from the repository root:  python -m benchmarks.usage [rows]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from benchmarks._common import temporary_vault
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    copies = 2000
+    from database.usage import DECAY, combine
+
+    with temporary_vault() as db:
+        db.add_passwords_bulk((f'site{i}.example.com', f'user{i}', 'correct horse battery staple', None, None)
+                              for i in range(count))
+        random.seed(1)
+        # A few favourites get most of the copies, as in real use
+        used = [int(random.paretovariate(1.2)) % count + 1 for _ in range(copies)]
+        now = datetime.now()
+
+        # Read, update and commit on every copy, on the caller's thread
+        start = time.perf_counter()
+        for password_id in used:
+            score = db.conn.execute('SELECT frecency FROM passwords WHERE id = ?', (password_id,)).fetchone()[0]
+            db.conn.execute('UPDATE passwords SET use_count = use_count + 1, last_used_at = ?, frecency = ? '
+                            'WHERE id = ?',
+                            (now.isoformat(), combine(score, DECAY * now.timestamp()), password_id))
+            db.conn.commit()
+        sync_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for password_id in used:
+            db.usage.record(password_id)
+        record_seconds = time.perf_counter() - start
+        pending = len(db.usage)
+        start = time.perf_counter()
+        db.flush_usage()
+        flush_seconds = time.perf_counter() - start
+
+        # Older uses as well, so the order is not just "copied in this run"
+        for i in range(1000):
+            db.usage.record(random.randrange(count) + 1, now - timedelta(days=random.randrange(365)))
+        db.flush_usage()
+
+        def page_ms(order_by: str) -> float:
+            start = time.perf_counter()
+            for _ in range(20):
+                db.conn.execute(f'SELECT id, website, username, category FROM passwords {order_by}').fetchall()
+            return (time.perf_counter() - start) / 20 * 1000
+
+        indexed_ms = page_ms(db._order_by('frecency', True, 501, 0))
+        sorted_ms = page_ms('ORDER BY frecency + 0 DESC, id DESC LIMIT 501')  # "+ 0" keeps the index out
+
+        index = db.get_search_index()
+        start = time.perf_counter()
+        for _ in range(200):
+            index.search('site', limit=20)
+        scan_ms = (time.perf_counter() - start) / 200 * 1000
+        start = time.perf_counter()
+        for _ in range(200):
+            index.most_used(20)
+        most_used_us = (time.perf_counter() - start) / 200 * 1_000_000
+
+        print(f"{copies} copies, {count} entries")
+        print(f"  commit per copy:      {sync_seconds / copies * 1_000_000:8.1f} µs per copy on the UI thread")
+        print(f"  batched counter:      {record_seconds / copies * 1_000_000:8.1f} µs per copy, "
+              f"then {flush_seconds * 1000:.1f} ms to write {pending} entries in one transaction")
+        print(f"  most used page:       {indexed_ms:8.2f} ms from idx_passwords_frecency, "
+              f"{sorted_ms:.2f} ms sorting every row")
+        print(f"  quick search 'site':  {scan_ms:8.2f} ms, used entries first")
+        print(f"  quick search, empty:  {most_used_us:8.1f} µs for the 20 most used")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Time the UI thread spends per edit: synchronous DatabaseManager calls against the write queue.
+
+Run from the repository root:  python -m benchmarks.write_queue [edits]
+"""
+import sys
+import time
+from PySide6.QtCore import QCoreApplication
+from benchmarks._common import temporary_vault
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    from ui.write_queue import WriteQueue
+
+    app = QCoreApplication(sys.argv[:1])
+    with temporary_vault() as db:
+        db.add_passwords_bulk((f'site{i}.example.com', f'user{i}', 'correct horse battery staple', None, None)
+                              for i in range(10_000))
+
+        start = time.perf_counter()
+        for i in range(count):
+            db.update_password(i % 100 + 1, username=f'sync{i}', password=f'secret{i}')
+        sync_seconds = time.perf_counter() - start
+
+        queue = WriteQueue()
+        start = time.perf_counter()
+        for i in range(count):
+            queue.update(db, i % 100 + 1, username=f'queued{i}', password=f'secret{i}')
+        enqueue_seconds = time.perf_counter() - start
+        queue.flush()
+        total_seconds = time.perf_counter() - start
+        queue.stop()
+        app.processEvents()
+
+        print(f"{count} edits spread over 100 entries")
+        print(f"  synchronous:   {sync_seconds / count * 1000:7.3f} ms per edit on the UI thread, "
+              f"{sync_seconds:.2f} s total")
+        print(f"  write queue:   {enqueue_seconds / count * 1000:7.3f} ms per edit on the UI thread, "
+              f"{total_seconds:.2f} s until flushed")
+        print(f"  check: entry 1 is {db.get_password(1).username}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
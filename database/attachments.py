@@ -0,0 +1,242 @@
+import io
+import os
+import sqlite3
+import struct
+from datetime import datetime
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from utils.encryption import NONCE_SIZE, DECRYPT_ERRORS
+
+# Plaintext bytes per chunk; each chunk is sealed on its own, so reading or
+# writing an attachment never holds more than one chunk in memory
+CHUNK_SIZE = 64 * 1024
+CHUNK_OVERHEAD = NONCE_SIZE + 16  # nonce + GCM tag
+ATTACHMENT_KEY_INFO = b'securepass attachment v1'
+NOTE_NAME = 'Note'
+TOTP_NAME = '2FA secret'
+
+def stored_size(size: int, chunk_size: int = CHUNK_SIZE) -> int:
+    """Length of the encrypted blob holding `size` plaintext bytes."""
+    chunks = max(1, -(-size // chunk_size))  # An empty file is still one (empty) chunk
+    return size + chunks * CHUNK_OVERHEAD
+
+def _chunk_aad(attachment_id: int, index: int, last: bool) -> bytes:
+    # Binding the row, position and end marker stops chunks from being moved,
+    # reordered or cut off without the tag check noticing
+    return struct.pack('>qQ?', attachment_id, index, last)
+
+def _seal(aesgcm, attachment_id: int, source, size: int, name: str):
+    """Yield the sealed chunks of `size` bytes read from `source`."""
+    chunks = max(1, -(-size // CHUNK_SIZE))
+    for index in range(chunks):
+        chunk = source.read(CHUNK_SIZE)
+        if len(chunk) != min(CHUNK_SIZE, size - index * CHUNK_SIZE):
+            raise ValueError(f"{name} changed size while it was being stored")
+        nonce = os.urandom(NONCE_SIZE)
+        yield nonce + aesgcm.encrypt(nonce, chunk, _chunk_aad(attachment_id, index, index == chunks - 1))
+
+def _open(aesgcm, attachment_id: int, size: int, chunk_size: int, read):
+    """Yield the plaintext chunks of a sealed attachment, taking its bytes from `read(n)`."""
+    chunks = max(1, -(-size // chunk_size))
+    for index in range(chunks):
+        sealed = read(min(chunk_size, size - index * chunk_size) + CHUNK_OVERHEAD)
+        yield aesgcm.decrypt(sealed[:NONCE_SIZE], sealed[NONCE_SIZE:],
+                             _chunk_aad(attachment_id, index, index == chunks - 1))
+
+class AttachmentStore:
+    """Encrypted notes and files of entries, kept in their own table.
+
+    The password table and the queries listing it never see attachment data.
+    Each attachment is one BLOB of independently sealed AES-GCM chunks
+    (nonce + ciphertext + tag, CHUNK_SIZE plaintext bytes each), written and
+    read in place with sqlite3 incremental blob I/O, so a file of any size
+    streams through a single chunk buffer. The key is derived from the
+    vault's data key that was active when the attachment was written.
+
+    Every operation uses its own short-lived connection, like the backup and
+    re-encryption jobs, so a long upload runs in its own transaction and can
+    be called from a worker thread.
+    """
+
+    def __init__(self, db_path: str, encryptor):
+        self.db_path = db_path
+        self.encryptor = encryptor
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def _cipher(self, key_id: int) -> AESGCM:
+        return AESGCM(self.encryptor.derive_key(ATTACHMENT_KEY_INFO, key_id))
+
+    def add(self, password_id: int, source, size: int, name: str, kind: str = 'file') -> int:
+        """Store `size` bytes read from the binary file object `source`; returns the attachment id."""
+        key_id = self.encryptor.active_key_id
+        aesgcm = self._cipher(key_id)
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute('''
+                    INSERT INTO attachments (password_id, kind, name, size, chunk_size, key_id,
+                                             data, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, zeroblob(?), ?)
+                ''', (password_id, kind, name, size, CHUNK_SIZE, key_id, stored_size(size),
+                      datetime.now().isoformat()))
+                attachment_id = cursor.lastrowid
+                with conn.blobopen('attachments', 'data', attachment_id) as blob:
+                    for sealed in _seal(aesgcm, attachment_id, source, size, name):
+                        blob.write(sealed)
+            return attachment_id
+        finally:
+            conn.close()
+
+    def add_file(self, password_id: int, path: str) -> int:
+        with open(path, 'rb') as source:
+            return self.add(password_id, source, os.fstat(source.fileno()).st_size,
+                            os.path.basename(path))
+
+    def chunks(self, attachment_id: int):
+        """Yield the decrypted chunks of an attachment in order.
+
+        Raises InvalidTag (see DECRYPT_ERRORS) on the first chunk that was
+        damaged or tampered with, and ValueError if the blob has the wrong size.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT size, chunk_size, key_id FROM attachments WHERE id = ?',
+                               (attachment_id,)).fetchone()
+            if row is None:
+                raise KeyError(attachment_id)
+            size, chunk_size, key_id = row
+            aesgcm = self._cipher(key_id)
+            with conn.blobopen('attachments', 'data', attachment_id, readonly=True) as blob:
+                if len(blob) != stored_size(size, chunk_size):
+                    raise ValueError(f"Attachment {attachment_id} has been truncated or padded")
+                yield from _open(aesgcm, attachment_id, size, chunk_size, blob.read)
+        finally:
+            conn.close()
+
+    def save(self, attachment_id: int, path: str):
+        """Decrypt an attachment into the file at `path`; nothing is left behind if it fails."""
+        tmp_path = path + '.part'
+        try:
+            with open(tmp_path, 'wb') as target:
+                for chunk in self.chunks(attachment_id):
+                    target.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read(self, attachment_id: int) -> bytes:
+        """The whole attachment in memory; meant for notes, use save() for files."""
+        return b''.join(self.chunks(attachment_id))
+
+    def list_for(self, password_id: int) -> list:
+        """(id, kind, name, size, created_at) of an entry's attachments, without reading their data."""
+        conn = self._connect()
+        try:
+            return conn.execute('''
+                SELECT id, kind, name, size, created_at FROM attachments
+                WHERE password_id = ? ORDER BY kind DESC, name
+            ''', (password_id,)).fetchall()
+        finally:
+            conn.close()
+
+    def delete(self, attachment_id: int):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM attachments WHERE id = ?', (attachment_id,))
+        finally:
+            conn.close()
+
+    def replace_small(self, cursor, password_id: int, kind: str, name: str, data: bytes):
+        """Replace an entry's item of `kind` (a note, a 2FA secret) with `data`, sealed in memory.
+
+        Runs on the caller's cursor, so it can share a DatabaseManager
+        transaction; empty `data` only removes the old item.
+        """
+        cursor.execute('DELETE FROM attachments WHERE password_id = ? AND kind = ?', (password_id, kind))
+        if not data:
+            return
+        key_id = self.encryptor.active_key_id
+        cursor.execute('''
+            INSERT INTO attachments (password_id, kind, name, size, chunk_size, key_id, data, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, x'', ?)
+        ''', (password_id, kind, name, len(data), CHUNK_SIZE, key_id, datetime.now().isoformat()))
+        attachment_id = cursor.lastrowid
+        sealed = b''.join(_seal(self._cipher(key_id), attachment_id, io.BytesIO(data), len(data), name))
+        cursor.execute('UPDATE attachments SET data = ? WHERE id = ?', (sealed, attachment_id))
+
+    def reseal(self, conn, attachment_id: int, size: int, chunk_size: int, key_id: int):
+        """Re-seal an attachment stored under `key_id` with the active key, chunk by chunk in place.
+
+        Runs on the caller's connection and transaction; the caller sets the
+        row's key_id. Sealed chunks keep their length, so the blob is rewritten
+        without being resized. Raises like chunks() on a damaged attachment,
+        possibly after some chunks were rewritten, so the caller rolls back.
+        """
+        old = self._cipher(key_id)
+        new = self._cipher(self.encryptor.active_key_id)
+        chunks = max(1, -(-size // chunk_size))
+        with conn.blobopen('attachments', 'data', attachment_id) as blob:
+            if len(blob) != stored_size(size, chunk_size):
+                raise ValueError(f"Attachment {attachment_id} has been truncated or padded")
+            for index in range(chunks):
+                aad = _chunk_aad(attachment_id, index, index == chunks - 1)
+                offset = blob.tell()
+                sealed = blob.read(min(chunk_size, size - index * chunk_size) + CHUNK_OVERHEAD)
+                chunk = old.decrypt(sealed[:NONCE_SIZE], sealed[NONCE_SIZE:], aad)
+                nonce = os.urandom(NONCE_SIZE)
+                blob.seek(offset)
+                blob.write(nonce + new.encrypt(nonce, chunk, aad))
+
+    def read_small(self, password_ids: list, kind: str) -> dict:
+        """{password id: plaintext} of the given entries' items of `kind`, in one query.
+
+        Meant for small items, which are read whole instead of through a blob
+        handle. Entries without one are left out; a damaged one maps to None.
+        """
+        if not password_ids:
+            return {}
+        conn = self._connect()
+        try:
+            rows = conn.execute(f'''
+                SELECT id, password_id, size, chunk_size, key_id, data FROM attachments
+                WHERE kind = ? AND password_id IN ({', '.join('?' * len(password_ids))})
+            ''', [kind] + list(password_ids)).fetchall()
+        finally:
+            conn.close()
+        ciphers = {}
+        result = {}
+        for attachment_id, password_id, size, chunk_size, key_id, data in rows:
+            if key_id not in ciphers:
+                ciphers[key_id] = self._cipher(key_id)
+            try:
+                if len(data) != stored_size(size, chunk_size):
+                    raise ValueError(f"Attachment {attachment_id} has been truncated or padded")
+                result[password_id] = b''.join(_open(ciphers[key_id], attachment_id, size, chunk_size,
+                                                      io.BytesIO(data).read))
+            except DECRYPT_ERRORS:
+                result[password_id] = None
+        return result
+
+    def get_note(self, password_id: int):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT id FROM attachments WHERE password_id = ? AND kind = 'note'",
+                               (password_id,)).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else self.read(row[0]).decode('utf-8')
+
+    def set_note(self, password_id: int, text: str):
+        """Replace the entry's secure note; an empty text removes it."""
+        conn = self._connect()
+        try:
+            with conn:
+                self.replace_small(conn.cursor(), password_id, 'note', NOTE_NAME, text.encode('utf-8'))
+        finally:
+            conn.close()
\ No newline at end of file
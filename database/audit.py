@@ -0,0 +1,145 @@
+import getpass
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+GENESIS_HASH = bytes(32)  # "Previous hash" of the first event
+
+def event_hash(previous: bytes, event_id: int, created_at: str, actor: str, action: str,
+               password_id, detail) -> bytes:
+    """Chain link of one event: SHA-256 over the previous link and the event's fields."""
+    payload = json.dumps([event_id, created_at, actor, action, password_id, detail],
+                         separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(previous + payload.encode('utf-8')).digest()
+
+class AuditLog(threading.Thread):
+    """Append-only record of who viewed, copied, changed, imported or exported which entry.
+
+    record() only appends to an in-memory buffer; this thread writes the buffer
+    out in batches, one commit per batch, every `interval` seconds or as soon
+    as `batch_size` events are waiting. So a UI action never waits for an
+    audit commit.
+
+    Batches go through the vault's own connection, holding its write lock
+    (see DatabaseManager.transaction). A commit from a connection of its own
+    would change the vault connection's PRAGMA data_version after every batch,
+    which reads as an outside write and throws away the metadata cache and
+    the search index.
+
+    Each row carries the SHA-256 of the previous row's hash and its own
+    fields, so editing, removing or reordering rows breaks the chain at that
+    point (see verify()). Triggers created by DatabaseManager refuse UPDATE
+    and DELETE on the table. The tail of the chain is read in the same
+    write transaction as the batch, so several writers on one file still
+    extend a single chain.
+    """
+
+    def __init__(self, conn, write_lock, interval: float = 2.0, batch_size: int = 500):
+        super().__init__(daemon=True)
+        self.conn = conn
+        self.write_lock = write_lock
+        self.interval = interval  # seconds between batches
+        self.batch_size = batch_size
+        self.actor = getpass.getuser()
+        self.written = 0
+        self._buffer = []
+        self._writing = False
+        self._flushing = False  # flush() is waiting; write now instead of after `interval`
+        self._failed = False  # The last batch could not be written and is buffered again
+        self._stopping = False
+        self._condition = threading.Condition()
+
+    def record(self, action: str, password_id: int = None, detail: str = None):
+        """Queue one event; stamped now, written with the next batch."""
+        with self._condition:
+            self._buffer.append((datetime.now().isoformat(), action, password_id, detail))
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Write out every event recorded so far; False if that failed or `timeout` (seconds) ran out."""
+        with self._condition:
+            if self.is_alive():
+                self._failed = False
+                self._flushing = True
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: not self._writing and (not self._buffer or self._failed),
+                                         timeout)
+            return not self._buffer
+
+    def stop(self):
+        """Write what is buffered and end the thread, e.g. when the vault is locked."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self.is_alive():
+            self.join()
+
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._stopping or self._flushing
+                                         or len(self._buffer) >= self.batch_size, self.interval)
+                batch, self._buffer = self._buffer, []
+                self._flushing = False
+                self._writing = bool(batch)
+                stopping = self._stopping
+            try:
+                if batch:
+                    self._write(batch)
+            except sqlite3.Error as e:
+                print(f"Error writing {len(batch)} audit events: {e}")
+                with self._condition:
+                    self._buffer[:0] = batch  # Keep them for the next batch
+                    self._failed = True
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+            if stopping:
+                return
+
+    def _write(self, batch: list):
+        with self.write_lock:
+            # The tail is read inside the write transaction, so another
+            # process appending to the same file cannot fork the chain
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                tail = self.conn.execute('SELECT id, hash FROM audit_log ORDER BY id DESC LIMIT 1').fetchone()
+                event_id, previous = tail if tail else (0, GENESIS_HASH)
+                rows = []
+                for created_at, action, password_id, detail in batch:
+                    event_id += 1
+                    previous = event_hash(previous, event_id, created_at, self.actor, action,
+                                          password_id, detail)
+                    rows.append((event_id, created_at, self.actor, action, password_id, detail, previous))
+                self.conn.executemany('''
+                    INSERT INTO audit_log (id, created_at, actor, action, password_id, detail, hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        self.written += len(batch)
+
+def verify(db_path: str) -> int:
+    """Walk the whole chain; returns the id of the first row that does not fit, or None if intact."""
+    conn = sqlite3.connect(db_path)
+    try:
+        previous = GENESIS_HASH
+        expected_id = 1
+        for row in conn.execute('''
+            SELECT id, created_at, actor, action, password_id, detail, hash
+            FROM audit_log ORDER BY id
+        '''):
+            event_id, stored = row[0], row[6]
+            if event_id != expected_id or event_hash(previous, *row[:6]) != stored:
+                return event_id
+            previous = stored
+            expected_id += 1
+        return None
+    finally:
+        conn.close()
\ No newline at end of file
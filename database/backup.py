@@ -0,0 +1,274 @@
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+from datetime import datetime
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from utils.encryption import Encryptor
+
+# File layout: magic, 4-byte header length, JSON header, then chunks of
+# 4-byte length + 12-byte nonce + AES-GCM ciphertext. Every chunk is bound to
+# the header, its index and whether it is the last one, so chunks cannot be
+# reordered, dropped or swapped between backups.
+BACKUP_MAGIC = b'SPBK'
+BACKUP_FORMAT = 1
+BACKUP_KEY_INFO = b'securepass backup v1'
+CHUNK_SIZE = 1 << 20
+
+# Tables copied into an incremental backup: the changed entries and
+# attachments, and the small tables whole
+INCREMENTAL_TABLES = ('passwords', 'attachments', 'categories', 'tags', 'password_tags')
+
+def _chunk_aad(header: bytes, index: int, last: bool) -> bytes:
+    return header + struct.pack('>Q?', index, last)
+
+def read_backup_header(path: str) -> dict:
+    with open(path, 'rb') as f:
+        return _read_header(f)[0]
+
+def _read_header(f) -> tuple:
+    if f.read(len(BACKUP_MAGIC)) != BACKUP_MAGIC:
+        raise ValueError("Not a SecurePass backup")
+    length, = struct.unpack('>I', f.read(4))
+    raw = f.read(length)
+    return json.loads(raw), raw
+
+def list_backups(backup_dir: str) -> list:
+    """Return backup paths, oldest first; names sort by creation time."""
+    if not os.path.isdir(backup_dir):
+        return []
+    return [os.path.join(backup_dir, name) for name in sorted(os.listdir(backup_dir))
+            if name.endswith('.spbk')]
+
+class BackupJob(threading.Thread):
+    """Background job writing an encrypted snapshot of the vault.
+
+    A full backup copies the database with the SQLite backup API a few pages
+    at a time, releasing the lock between steps so the UI connection keeps
+    reading and writing. Writes made meanwhile on another connection make
+    SQLite restart the copy, which is cheap at vault sizes.
+
+    An incremental backup only holds the entry and attachment rows whose
+    change_seq is past the previous backup's watermark. Triggers stamp that
+    column on every insert or update (see DatabaseManager._migrate), so
+    category renames, merges, key rotations and attachment edits are all
+    picked up. The backup also holds the ids of all live rows, so a restore
+    can drop deleted ones.
+
+    Only the newest `keep` full backups are kept, together with the
+    incrementals taken after the oldest of them.
+    """
+
+    def __init__(self, db_path: str, backup_dir: str, encryptor, vault_keys: dict,
+                 incremental: bool = False, keep: int = 5, pages: int = 64):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.encryptor = encryptor
+        self.vault_keys = vault_keys  # wrapped, so a backup outlives key rotation
+        self.incremental = incremental
+        self.keep = keep
+        self.pages = pages
+        self.total = 0
+        self.copied = 0
+        self.path = None
+        self.size = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def progress(self) -> dict:
+        end = self.finished_at or time.monotonic()
+        return {
+            'kind': 'incremental' if self.incremental else 'full',
+            'total': self.total,
+            'copied': self.copied,
+            'seconds': end - self.started_at if self.started_at else 0.0,
+            'size': self.size,
+            'path': self.path,
+            'error': self.error,
+            'done': not self.is_alive() and self.started_at is not None,
+        }
+
+    def _on_step(self, status, remaining, total):
+        self.total = total
+        self.copied = total - remaining
+
+    def run(self):
+        self.started_at = time.monotonic()
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        tmp_path = os.path.join(self.backup_dir, f'.{stamp}.tmp')
+        try:
+            previous = self._latest_header()
+            if previous is None or 'change_seq' not in previous:
+                # Nothing to be incremental against, or only a backup from
+                # before rows carried change stamps
+                self.incremental = False
+
+            src = sqlite3.connect(self.db_path)
+            dst = sqlite3.connect(tmp_path)
+            try:
+                # Read first: rows written during the copy are then copied
+                # again next time rather than missed
+                watermark = src.execute('SELECT value FROM change_counter').fetchone()[0]
+                if self.incremental:
+                    self._copy_changes(src, dst, previous['change_seq'])
+                else:
+                    src.backup(dst, pages=self.pages, progress=self._on_step, sleep=0.001)
+            finally:
+                src.close()
+                dst.close()
+
+            header = {
+                'format': BACKUP_FORMAT,
+                'kind': 'incremental' if self.incremental else 'full',
+                'created_at': datetime.now().isoformat(),
+                'change_seq': watermark,
+                'key_id': self.encryptor.active_key_id,
+                'vault_keys': self.vault_keys,
+            }
+            self.path = os.path.join(self.backup_dir, f"passwords-{stamp}-{header['kind']}.spbk")
+            self._encrypt_file(tmp_path, self.path, header)
+            self.size = os.path.getsize(self.path)
+            self._rotate()
+        except Exception as e:
+            self.error = str(e)
+            print(f"Error backing up vault: {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            self.finished_at = time.monotonic()
+
+    def _latest_header(self):
+        for path in reversed(list_backups(self.backup_dir)):
+            try:
+                return read_backup_header(path)
+            except (OSError, ValueError):
+                continue
+        return None
+
+    def _copy_changes(self, src, dst, watermark: int):
+        for table in INCREMENTAL_TABLES:
+            sql = src.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                              (table,)).fetchone()[0]
+            dst.execute(sql)
+        dst.execute('CREATE TABLE live_ids (id INTEGER PRIMARY KEY)')
+        dst.execute('CREATE TABLE live_attachment_ids (id INTEGER PRIMARY KEY)')
+
+        self.total = src.execute('''
+            SELECT (SELECT COUNT(*) FROM passwords WHERE change_seq > ?)
+                 + (SELECT COUNT(*) FROM attachments WHERE change_seq > ?)
+        ''', (watermark, watermark)).fetchone()[0]
+        for table in ('passwords', 'attachments'):
+            # Streamed row by row; attachment rows can be large
+            rows = src.execute(f'SELECT * FROM {table} WHERE change_seq > ? ORDER BY id', (watermark,))
+            placeholders = ', '.join('?' * len(rows.description))
+            for row in rows:
+                dst.execute(f'INSERT INTO {table} VALUES ({placeholders})', row)
+                self.copied += 1
+        dst.executemany('INSERT INTO live_ids VALUES (?)', src.execute('SELECT id FROM passwords'))
+        dst.executemany('INSERT INTO live_attachment_ids VALUES (?)', src.execute('SELECT id FROM attachments'))
+        dst.executemany('INSERT INTO categories VALUES (?)', src.execute('SELECT name FROM categories'))
+        dst.executemany('INSERT INTO tags VALUES (?, ?)', src.execute('SELECT id, name FROM tags'))
+        dst.executemany('INSERT INTO password_tags VALUES (?, ?)', src.execute('''
+            SELECT password_id, tag_id FROM password_tags
+            WHERE password_id IN (SELECT id FROM passwords WHERE change_seq > ?)
+        ''', (watermark,)))
+        dst.commit()
+
+    def _encrypt_file(self, plain_path: str, path: str, header: dict):
+        aesgcm = AESGCM(self.encryptor.derive_key(BACKUP_KEY_INFO, header['key_id']))
+        raw_header = json.dumps(header).encode()
+        tmp_path = path + '.part'
+        with open(plain_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            dst.write(BACKUP_MAGIC + struct.pack('>I', len(raw_header)) + raw_header)
+            index = 0
+            chunk = src.read(CHUNK_SIZE)
+            while True:
+                next_chunk = src.read(CHUNK_SIZE)
+                nonce = os.urandom(12)
+                sealed = aesgcm.encrypt(nonce, chunk, _chunk_aad(raw_header, index, not next_chunk))
+                dst.write(struct.pack('>I', len(sealed)) + nonce + sealed)
+                if not next_chunk:
+                    break
+                chunk = next_chunk
+                index += 1
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, path)
+
+    def _rotate(self):
+        backups = list_backups(self.backup_dir)
+        fulls = [path for path in backups if path.endswith('-full.spbk')]
+        if len(fulls) <= self.keep:
+            return
+        oldest_kept = fulls[-self.keep]
+        # Everything before the oldest kept full backup is superseded by it
+        for path in backups:
+            if path < oldest_kept:
+                os.remove(path)
+
+def decrypt_backup(path: str, master_password: str, target_path: str, auth) -> dict:
+    """Write the SQLite file inside a backup to target_path and return its header.
+
+    The password rows stay encrypted; the keys they need are in the header's
+    vault_keys, unwrapped with the master password that was current when the
+    backup was taken.
+    """
+    with open(path, 'rb') as src:
+        header, raw_header = _read_header(src)
+        data_keys, active_key_id = auth.unwrap_vault_keys(master_password, header['vault_keys'])
+        aesgcm = AESGCM(Encryptor(data_keys, active_key_id).derive_key(BACKUP_KEY_INFO,
+                                                                      header['key_id']))
+        with open(target_path, 'wb') as dst:
+            index = 0
+            last = False
+            while not last:
+                length_bytes = src.read(4)
+                if not length_bytes:
+                    raise ValueError("Backup is truncated")
+                length, = struct.unpack('>I', length_bytes)
+                nonce = src.read(12)
+                sealed = src.read(length)
+                last = not src.peek(1)
+                dst.write(aesgcm.decrypt(nonce, sealed, _chunk_aad(raw_header, index, last)))
+                index += 1
+    return header
+
+def restore_backup(paths: list, master_password: str, target_path: str, auth) -> dict:
+    """Rebuild a vault database from a full backup followed by its incrementals.
+
+    Returns the header of the last backup applied.
+    """
+    header = decrypt_backup(paths[0], master_password, target_path, auth)
+    if header['kind'] != 'full':
+        raise ValueError("A restore has to start from a full backup")
+    conn = sqlite3.connect(target_path)
+    try:
+        for path in paths[1:]:
+            changes_path = target_path + '.incremental'
+            header = decrypt_backup(path, master_password, changes_path, auth)
+            conn.execute('ATTACH DATABASE ? AS changes', (changes_path,))
+            with conn:
+                conn.execute('DELETE FROM passwords WHERE id NOT IN (SELECT id FROM changes.live_ids)')
+                conn.execute('INSERT OR REPLACE INTO passwords SELECT * FROM changes.passwords')
+                conn.execute('DELETE FROM categories')
+                conn.execute('INSERT INTO categories SELECT * FROM changes.categories')
+                conn.execute('INSERT OR REPLACE INTO tags SELECT * FROM changes.tags')
+                conn.execute('''
+                    DELETE FROM password_tags
+                    WHERE password_id NOT IN (SELECT id FROM passwords)
+                       OR password_id IN (SELECT id FROM changes.passwords)
+                ''')
+                conn.execute('INSERT INTO password_tags SELECT * FROM changes.password_tags')
+                conn.execute('DELETE FROM tags WHERE id NOT IN (SELECT id FROM changes.tags)')
+                conn.execute('DELETE FROM attachments WHERE id NOT IN (SELECT id FROM changes.live_attachment_ids)')
+                conn.execute('INSERT OR REPLACE INTO attachments SELECT * FROM changes.attachments')
+            conn.execute('DETACH DATABASE changes')
+            os.remove(changes_path)
+    finally:
+        conn.close()
+    return header
\ No newline at end of file
@@ -1,23 +1,95 @@
 
+import os
 import sqlite3
+import threading
+import uuid
 from datetime import datetime
-from utils.encryption import Encryptor
+from utils.encryption import Encryptor, DECRYPT_ERRORS
+from utils.auth import Auth
 from sqlite3 import Connection
-from functools import lru_cache
+from contextlib import contextmanager
+from utils.prefix_index import PrefixIndex
+from utils.search_index import SearchIndex
+from database.metadata_cache import MetadataCache
+from database.records import PasswordRecord
+from database.reencryption import ReencryptionJob
+from database.integrity import IntegrityScrubber
+from database.backup import BackupJob
+from database.audit import AuditLog, verify as verify_audit_chain
+from database.attachments import AttachmentStore, TOTP_NAME
+from database.usage import UsageCounter, combine as combine_frecency
+from utils.secret_cache import SecretCache
+from utils.domains import registrable_domain, hostname
+
+# Bumped whenever _migrate() gains a new step; stored in PRAGMA user_version
+SCHEMA_VERSION = 10
+
+# Column order expected by PasswordRecord; the metadata variant leaves out the blob
+RECORD_COLUMNS = 'id, website, username, password, category, tags, created_at, updated_at, key_id, uuid'
+METADATA_COLUMNS = 'id, website, username, NULL, category, tags, created_at, updated_at, NULL, uuid'
+
+# Sortable columns and the expression each is ordered by; every one has a
+# matching index (see _migrate), so a sorted page is read in index order
+SORT_KEYS = {
+    'website': 'website COLLATE NOCASE',
+    'username': 'username COLLATE NOCASE',
+    'category': 'category COLLATE NOCASE',
+    'updated_at': 'updated_at',
+    'frecency': 'frecency',  # Most used first when descending, see database.usage
+}
+
+def parse_tags(tags: str) -> list:
+    """Split a comma separated tag string into unique, trimmed tag names."""
+    seen = set()
+    result = []
+    for tag in (tags or '').split(','):
+        tag = tag.strip()
+        if tag and tag.casefold() not in seen:
+            seen.add(tag.casefold())
+            result.append(tag)
+    return result
 
 class DatabaseManager:
+    # The pools are keyed by absolute database path, so each open vault gets
+    # its own connection and caches while managers on the same file share them
     _connection_pool = {}
+    _cache_pool = {}
+    _index_pool = {}  # path -> [data_version, SearchIndex], see get_search_index()
+    _audit_pool = {}  # path -> AuditLog; one writer per file keeps its batches in order
+    # path -> lock held for every write transaction on the pooled connection; the
+    # write queue, imports, usage flushes and UI-thread writes share that connection
+    _write_lock_pool = {}
 
-    def __init__(self, master_key: str):
-        self.db_path = 'passwords.db'
-        self.encryptor = Encryptor(master_key)
+    def __init__(self, master_key: str, auth: Auth = None, db_path: str = 'passwords.db'):
+        self.db_path = db_path
+        self._pool_key = os.path.abspath(db_path)
+        # Rows are encrypted with the vault's data keys, which the master password unwraps
+        self.auth = auth or Auth()
+        data_keys, active_key_id = self.auth.unwrap_data_keys(master_key)
+        self.encryptor = Encryptor(data_keys, active_key_id)
         self.conn = self._get_connection()
+        self._write_lock = self._write_lock_pool.setdefault(self._pool_key, threading.RLock())
+        self.attachments = AttachmentStore(self.db_path, self.encryptor)
+        self.cache = self._cache_pool.setdefault(self._pool_key, MetadataCache())
+        # Decrypted secrets depend on this manager's key, so this cache is not shared
+        self.secret_cache = SecretCache()
+        # Ids of rows that failed to decrypt, found by verify_integrity() or on read
+        self.corrupt_ids = set()
+        # Copies counted since the last flush_usage()
+        self.usage = UsageCounter()
+        self._transaction_depth = 0
+        # Called if the outermost transaction() rolls back, to undo in-memory effects
+        self._rollback_hooks = []
         self._init_db()
+        self.audit = self._audit_pool.get(self._pool_key)
+        if self.audit is None:
+            self.audit = self._audit_pool[self._pool_key] = AuditLog(self.conn, self._write_lock)
+            self.audit.start()
 
     def _get_connection(self) -> Connection:
         # Reuse existing connection if available
-        if self.db_path in self._connection_pool:
-            return self._connection_pool[self.db_path]
+        if self._pool_key in self._connection_pool:
+            return self._connection_pool[self._pool_key]
 
         conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.execute("PRAGMA foreign_keys = ON")
@@ -25,9 +97,38 @@ class DatabaseManager:
         conn.execute("PRAGMA synchronous = NORMAL")  # Faster synchronization
         conn.execute("PRAGMA cache_size = -2000")  # 2MB cache
 
-        self._connection_pool[self.db_path] = conn
+        self._connection_pool[self._pool_key] = conn
         return conn
 
+    def close(self):
+        """Lock this vault: drop decrypted secrets and close its pooled connection."""
+        self.secret_cache.wipe()
+        audit = self._audit_pool.pop(self._pool_key, None)
+        if audit is not None:
+            audit.stop()
+        conn = self._connection_pool.pop(self._pool_key, None)
+        if conn is not None:
+            conn.close()
+        self._cache_pool.pop(self._pool_key, None)
+        self._index_pool.pop(self._pool_key, None)
+        self._write_lock_pool.pop(self._pool_key, None)
+
+    def lock(self):
+        """Drop the vault keys and decrypted secrets, keeping the connection, caches and index.
+
+        unlock() unwraps the keys again, so an idle lock costs one KDF run
+        instead of reopening the vault.
+        """
+        self.secret_cache.wipe()
+        self.encryptor.wipe()
+
+    def unlock(self, master_key: str):
+        """Restore the keys dropped by lock(); raises ValueError on a wrong master password."""
+        data_keys, active_key_id = self.auth.unwrap_data_keys(master_key)
+        for key_id, data_key in data_keys.items():
+            self.encryptor.add_key(key_id, data_key)
+        self.encryptor.active_key_id = active_key_id
+
     def _init_db(self):
         cursor = self.conn.cursor()
         cursor.execute('''
@@ -48,141 +149,856 @@ class DatabaseManager:
                 name TEXT PRIMARY KEY
             )
         ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS password_tags (
+                password_id INTEGER NOT NULL REFERENCES passwords(id) ON DELETE CASCADE,
+                tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+                PRIMARY KEY (password_id, tag_id)
+            ) WITHOUT ROWID
+        ''')
+        # Category filters, counts and set-based renames all go through this index
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_passwords_category
+            ON passwords(category)
+        ''')
+
+        # The primary key covers lookups by password; this one covers lookups by tag
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_password_tags_tag
+            ON password_tags(tag_id, password_id)
+        ''')
+
+        # Checkpoint of an unfinished re-encryption, see start_reencryption()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS key_rotation (
+                target_key_id INTEGER PRIMARY KEY,
+                last_id INTEGER NOT NULL
+            )
+        ''')
+
+        self._migrate(cursor)
         self.conn.commit()
 
+    def _migrate(self, cursor):
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+
+        if version < 1:
+            # Normalize the free-form comma strings into the tag tables
+            rows = cursor.execute(
+                "SELECT id, tags FROM passwords WHERE tags IS NOT NULL AND tags != ''"
+            ).fetchall()
+            for password_id, tags in rows:
+                self._set_tags(cursor, password_id, tags)
+
+        if version < 2:
+            # Which data key each row is encrypted with; existing rows use the first one
+            cursor.execute('ALTER TABLE passwords ADD COLUMN key_id INTEGER NOT NULL DEFAULT 1')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_passwords_key_id ON passwords(key_id)')
+
+        if version < 3:
+            # Stable identity for merging copies of a vault; row ids differ between copies
+            cursor.execute('ALTER TABLE passwords ADD COLUMN uuid TEXT')
+            ids = cursor.execute('SELECT id FROM passwords').fetchall()
+            cursor.executemany('UPDATE passwords SET uuid = ? WHERE id = ?',
+                               [(str(uuid.uuid4()), password_id) for password_id, in ids])
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_passwords_uuid ON passwords(uuid)')
+
+        if version < 4:
+            # Registrable domain of the website, so a URL finds its entries by equality
+            cursor.execute('ALTER TABLE passwords ADD COLUMN domain TEXT')
+            rows = cursor.execute('SELECT id, website FROM passwords').fetchall()
+            cursor.executemany('UPDATE passwords SET domain = ? WHERE id = ?',
+                               [(registrable_domain(website), password_id) for password_id, website in rows])
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_passwords_domain ON passwords(domain)')
+
+        if version < 5:
+            # Indexes behind the sortable table columns; the row id each entry
+            # carries doubles as the tie-breaker that keeps pages stable
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_passwords_website_nocase '
+                           'ON passwords(website COLLATE NOCASE)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_passwords_username_nocase '
+                           'ON passwords(username COLLATE NOCASE)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_passwords_category_nocase '
+                           'ON passwords(category COLLATE NOCASE)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_passwords_updated_at ON passwords(updated_at)')
+
+        if version < 6:
+            # Audit trail, written by AuditLog; rows are never changed or removed
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS audit_log (
+                    id INTEGER PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    actor TEXT,
+                    action TEXT NOT NULL,
+                    password_id INTEGER,
+                    detail TEXT,
+                    hash BLOB NOT NULL
+                )
+            ''')
+            for statement in ('UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS audit_log_no_{statement.lower()}
+                    BEFORE {statement} ON audit_log
+                    BEGIN SELECT RAISE(ABORT, 'audit_log is append-only'); END
+                ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_log_password '
+                           'ON audit_log(password_id, created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_log_created_at ON audit_log(created_at)')
+
+        if version < 7:
+            # Secure notes and files, see AttachmentStore; `data` holds the
+            # sealed chunks and is only ever touched through blob I/O
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS attachments (
+                    id INTEGER PRIMARY KEY,
+                    password_id INTEGER NOT NULL REFERENCES passwords(id) ON DELETE CASCADE,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    chunk_size INTEGER NOT NULL,
+                    key_id INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    created_at TEXT
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_attachments_password '
+                           'ON attachments(password_id, kind)')
+
+        if version < 8:
+            # How often and how lately each entry was used, written by flush_usage()
+            cursor.execute('ALTER TABLE passwords ADD COLUMN use_count INTEGER NOT NULL DEFAULT 0')
+            cursor.execute('ALTER TABLE passwords ADD COLUMN last_used_at TEXT')
+            cursor.execute('ALTER TABLE passwords ADD COLUMN frecency REAL NOT NULL DEFAULT 0')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_passwords_frecency ON passwords(frecency)')
+
+        if version < 9:
+            # Every insert or update of an entry or attachment stamps the row
+            # with the next value of one counter, whatever code path wrote it;
+            # incremental backups copy the rows stamped after the last backup
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS change_counter (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    value INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute('INSERT OR IGNORE INTO change_counter (id, value) VALUES (1, 0)')
+            for table in ('passwords', 'attachments'):
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0')
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table}(change_seq)')
+                for event, condition in (('INSERT', ''), ('UPDATE', 'WHEN NEW.change_seq = OLD.change_seq')):
+                    cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS {table}_stamp_{event.lower()}
+                        AFTER {event} ON {table} {condition}
+                        BEGIN
+                            UPDATE change_counter SET value = value + 1 WHERE id = 1;
+                            UPDATE {table} SET change_seq = (SELECT value FROM change_counter WHERE id = 1)
+                            WHERE id = NEW.id;
+                        END
+                    ''')
+
+        if version < 10:
+            # Re-encryption resumes its attachment pass separately from the entries
+            cursor.execute('ALTER TABLE key_rotation ADD COLUMN last_attachment_id INTEGER NOT NULL DEFAULT 0')
+
+        if version < SCHEMA_VERSION:
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes into one commit, rolling all of them back on error.
+
+        Write methods called inside the block skip their own commit; blocks nest,
+        only the outermost one commits, and an error in an inner block rolls
+        back the outermost one, as does a failed commit. The block holds the connection's write lock, so a write from another
+        thread waits for the commit or rollback instead of landing in (or
+        ending) this transaction.
+        """
+        with self._write_lock:
+            self._transaction_depth += 1
+            try:
+                yield self.conn.cursor()
+            except Exception:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._rollback()
+                raise
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                try:
+                    self._commit()
+                except Exception:
+                    # A commit that failed (say the file stayed locked) leaves
+                    # the transaction open; end it like a failed block
+                    self._rollback()
+                    raise
+                self._rollback_hooks = []
+
+    def _rollback(self):
+        self.conn.rollback()
+        # Reads inside the block may have cached rolled back data, and
+        # the search index may hold rows that were never committed
+        self.cache.invalidate()
+        self._index_pool.pop(self._pool_key, None)
+        hooks, self._rollback_hooks = self._rollback_hooks, []
+        for hook in hooks:
+            hook()
+
+    def _commit(self):
+        if self._transaction_depth == 0:
+            self.conn.commit()
+            self.cache.invalidate()
+
+    def _cached(self, key, loader):
+        """Read through the metadata cache, first noticing writes by other connections."""
+        # data_version changes whenever another connection commits to the file
+        data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if data_version != self.cache.data_version:
+            if self.cache.data_version is not None:
+                self.cache.invalidate()
+            self.cache.data_version = data_version
+        return self.cache.get(key, loader)
+
+    def cache_stats(self) -> dict:
+        """Return hit/miss counters and the current generation of the metadata cache."""
+        return self.cache.stats()
+
+    def _set_tags(self, cursor, password_id: int, tags: str):
+        """Replace the tag links of one password with the tags in `tags`."""
+        old_tag_ids = self._unlink_tags(cursor, password_id)
+        for tag in parse_tags(tags):
+            cursor.execute('INSERT OR IGNORE INTO tags (name) VALUES (?)', (tag,))
+            cursor.execute('''
+                INSERT OR IGNORE INTO password_tags (password_id, tag_id)
+                SELECT ?, id FROM tags WHERE name = ?
+            ''', (password_id, tag))
+        self._prune_tags(cursor, old_tag_ids)
+
+    def _unlink_tags(self, cursor, password_id: int) -> list:
+        """Remove the tag links of one password and return the unlinked tag ids."""
+        cursor.execute('SELECT tag_id FROM password_tags WHERE password_id = ?', (password_id,))
+        tag_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute('DELETE FROM password_tags WHERE password_id = ?', (password_id,))
+        return tag_ids
+
+    def _prune_tags(self, cursor, tag_ids: list):
+        """Delete those of `tag_ids` that no password uses any more."""
+        cursor.executemany('''
+            DELETE FROM tags
+            WHERE id = ? AND NOT EXISTS (SELECT 1 FROM password_tags WHERE tag_id = tags.id)
+        ''', [(tag_id,) for tag_id in tag_ids])
+
+    def _record_cursor(self):
+        """Return a cursor whose rows come back as PasswordRecord objects."""
+        cursor = self.conn.cursor()
+        cursor.row_factory = lambda cursor, row: PasswordRecord(self, *row)
+        return cursor
+
     def add_password(self, website: str, username: str, password: str,
-                    category: str = None, tags: str = None) -> bool:
-        encrypted_pass = self.encryptor.encrypt(password)
+                    category: str = None, tags: str = None, totp: str = None) -> int:
+        """Insert one entry and return its id; `totp` is an optional 2FA secret (see utils.totp)."""
         timestamp = datetime.now().isoformat()
 
-        cursor = self.conn.cursor()
+        with self.transaction() as cursor:
+            password_id = self._insert_password(cursor, website, username, password, category, tags,
+                                                timestamp, timestamp)
+            if totp:
+                self.attachments.replace_small(cursor, password_id, 'totp', TOTP_NAME, totp.encode())
+            return password_id
+
+    def add_passwords_bulk(self, rows) -> int:
+        """Insert many (website, username, password, category, tags) rows in one transaction.
+
+        `rows` may be any iterable, e.g. a streaming importer; it is consumed in
+        batches, each written with a single executemany. Row ids are assigned up
+        front so every password can be encrypted with its id before the insert.
+        """
+        timestamp = datetime.now().isoformat()
+        inserted = 0
+        with self.transaction() as cursor:
+            next_id = cursor.execute('''
+                SELECT MAX(COALESCE((SELECT MAX(id) FROM passwords), 0),
+                           COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'passwords'), 0))
+            ''').fetchone()[0] + 1
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= 5000:
+                    next_id = self._insert_batch(cursor, batch, next_id, timestamp)
+                    inserted += len(batch)
+                    batch = []
+            if batch:
+                self._insert_batch(cursor, batch, next_id, timestamp)
+                inserted += len(batch)
+        return inserted
+
+    def _insert_batch(self, cursor, batch: list, first_id: int, timestamp: str) -> int:
+        key_id = self.encryptor.active_key_id
+        cursor.executemany('''
+            INSERT INTO passwords (id, website, username, password, category, tags,
+                                   created_at, updated_at, key_id, uuid, domain)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(password_id, website, username, self.encryptor.encrypt(password, password_id),
+               category, tags, timestamp, timestamp, key_id, str(uuid.uuid4()),
+               registrable_domain(website))
+              for password_id, (website, username, password, category, tags)
+              in enumerate(batch, first_id)])
+
+        # Tags and categories set-wise rather than row by row
+        links = [(password_id, tag) for password_id, row in enumerate(batch, first_id)
+                 for tag in parse_tags(row[4])]
+        cursor.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)',
+                           {(tag,) for _, tag in links})
+        cursor.executemany('''
+            INSERT OR IGNORE INTO password_tags (password_id, tag_id)
+            SELECT ?, id FROM tags WHERE name = ?
+        ''', links)
+        cursor.executemany('INSERT OR IGNORE INTO categories (name) VALUES (?)',
+                           {(row[3],) for row in batch if row[3]})
+        for password_id, row in enumerate(batch, first_id):
+            self._index('add', password_id, row[0], row[1])
+        return first_id + len(batch)
+
+    def _insert_password(self, cursor, website, username, password, category, tags,
+                         created_at, updated_at, entry_uuid=None) -> int:
+        # The row id is part of the ciphertext's associated data, so the row
+        # is inserted first and its password filled in once the id is known
         cursor.execute('''
             INSERT INTO passwords (website, username, password, category,
-                                 tags, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (website, username, encrypted_pass, category, tags,
-             timestamp, timestamp))
-        self.conn.commit()
-        return True
+                                 tags, created_at, updated_at, uuid, domain)
+            VALUES (?, ?, zeroblob(0), ?, ?, ?, ?, ?, ?)
+        ''', (website, username, category, tags, created_at, updated_at,
+              entry_uuid or str(uuid.uuid4()), registrable_domain(website)))
+        password_id = cursor.lastrowid
+        cursor.execute('UPDATE passwords SET password = ?, key_id = ? WHERE id = ?',
+                       (self.encryptor.encrypt(password, password_id),
+                        self.encryptor.active_key_id, password_id))
+        self._set_tags(cursor, password_id, tags)
+        self._index('add', password_id, website, username)
+        return password_id
 
-    def get_password(self, id: int) -> dict:
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM passwords WHERE id = ?', (id,))
-        row = cursor.fetchone()
-
-        if row:
-            return {
-                'id': row[0],
-                'website': row[1],
-                'username': row[2],
-                'password': self.encryptor.decrypt(row[3]),
-                'category': row[4],
-                'tags': row[5],
-                'created_at': row[6],
-                'updated_at': row[7]
-            }
-        return None
-
-    def search_passwords(self, query: str) -> list:
-        cursor = self.conn.cursor()
+    def get_password(self, id: int) -> PasswordRecord:
+        cursor = self._record_cursor()
+        cursor.execute(f'SELECT {RECORD_COLUMNS} FROM passwords WHERE id = ?', (id,))
+        return cursor.fetchone()
+
+    def get_records(self, ids: list) -> list:
+        """Metadata records for `ids`, in the same order; ids no longer present are left out."""
+        if not ids:
+            return []
+        cursor = self._record_cursor()
+        placeholders = ', '.join('?' * len(ids))
+        cursor.execute(f'SELECT {METADATA_COLUMNS} FROM passwords WHERE id IN ({placeholders})', ids)
+        by_id = {record.id: record for record in cursor}
+        return [by_id[id] for id in ids if id in by_id]
+
+    def get_secret(self, id: int) -> str:
+        """Return the decrypted password of one entry, served from the secret cache when hot."""
+        password = self.secret_cache.get(id)
+        if password is None:
+            if self.encryptor.locked:
+                return None  # Locked: not corrupt, just unreadable until unlock()
+            row = self.conn.execute('SELECT password, key_id FROM passwords WHERE id = ?',
+                                    (id,)).fetchone()
+            if row is None:
+                return None
+            try:
+                password = self.encryptor.decrypt(row[0], id, row[1])
+            except DECRYPT_ERRORS:
+                self.corrupt_ids.add(id)
+                return None
+            self.secret_cache.put(id, password)
+        return password
+
+    def _order_by(self, sort: str, descending: bool, limit: int, offset: int) -> str:
+        """ORDER BY and LIMIT clauses for one page sorted by a SORT_KEYS column."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Cannot sort by {sort!r}")
+        direction = 'DESC' if descending else 'ASC'
+        clause = f'ORDER BY {SORT_KEYS[sort]} {direction}, id {direction}'
+        if limit is not None:
+            clause += f' LIMIT {int(limit)} OFFSET {int(offset)}'
+        return clause
+
+    def search_passwords(self, query: str, include_passwords: bool = True, sort: str = 'updated_at',
+                         descending: bool = True, limit: int = None, offset: int = 0) -> list:
+        """Search metadata; pass include_passwords=False to leave the encrypted blobs out.
+
+        Results are ordered by `sort` (a SORT_KEYS column); `limit` and `offset` select one page.
+        """
+        columns = RECORD_COLUMNS if include_passwords else METADATA_COLUMNS
+        cursor = self._record_cursor()
         # Updated search query to be case-insensitive and search in more fields
-        cursor.execute('''
-            SELECT * FROM passwords
+        cursor.execute(f'''
+            SELECT {columns} FROM passwords
             WHERE LOWER(website) LIKE LOWER(?)
                OR LOWER(username) LIKE LOWER(?)
                OR LOWER(category) LIKE LOWER(?)
                OR LOWER(tags) LIKE LOWER(?)
-            ORDER BY updated_at DESC
+            {self._order_by(sort, descending, limit, offset)}
         ''', (f'%{query}%', f'%{query}%', f'%{query}%', f'%{query}%'))
 
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'id': row[0],
-                'website': row[1],
-                'username': row[2],
-                'password': self.encryptor.decrypt(row[3]),
-                'category': row[4],
-                'tags': row[5],
-                'created_at': row[6],
-                'updated_at': row[7]
-            })
-        return results
-
-    def get_all_passwords(self) -> list:
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM passwords ORDER BY updated_at DESC')
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'id': row[0],
-                'website': row[1],
-                'username': row[2],
-                'password': self.encryptor.decrypt(row[3]),
-                'category': row[4],
-                'tags': row[5],
-                'created_at': row[6],
-                'updated_at': row[7]
-            })
-        return results
+        return cursor.fetchall()
+
+    def find_for_url(self, url: str, include_passwords: bool = False) -> list:
+        """Entries for the site at `url`, e.g. to fill in a login form.
+
+        Matches on the registrable domain, so "https://accounts.example.co.uk/login"
+        finds entries saved as "example.co.uk" or "www.example.co.uk"; entries
+        whose website names the same host come first.
+        """
+        domain = registrable_domain(url)
+        if domain is None:
+            return []
+        columns = RECORD_COLUMNS if include_passwords else METADATA_COLUMNS
+        cursor = self._record_cursor()
+        cursor.execute(f'SELECT {columns} FROM passwords WHERE domain = ? ORDER BY updated_at DESC',
+                       (domain,))
+        records = cursor.fetchall()
+        host = hostname(url)
+        records.sort(key=lambda record: hostname(record.website) != host)
+        return records
+
+    def get_all_passwords(self, category: str = None, include_passwords: bool = True,
+                          skip_corrupt: bool = False, sort: str = 'updated_at', descending: bool = True,
+                          limit: int = None, offset: int = 0) -> list:
+        """Return all passwords, optionally only those in `category` ('' for none).
+
+        Rows come back ordered by `sort`, one of SORT_KEYS, newest first by
+        default; `limit` and `offset` select one page of them.
+
+        Passwords are decrypted lazily, when a record's `password` is read. With
+        include_passwords=False the encrypted blobs are not even loaded and
+        `password` falls back to get_secret(). A record that fails to decrypt
+        returns None and is flagged `corrupt`; skip_corrupt leaves out the rows
+        already known to be corrupt.
+        """
+        columns = RECORD_COLUMNS if include_passwords else METADATA_COLUMNS
+        order_by = self._order_by(sort, descending, limit, offset)
+        cursor = self._record_cursor()
+        if category is None:
+            cursor.execute(f'SELECT {columns} FROM passwords {order_by}')
+        elif category == '':
+            cursor.execute(f'''
+                SELECT {columns} FROM passwords WHERE category IS NULL OR category = ''
+                {order_by}
+            ''')
+        else:
+            cursor.execute(f'SELECT {columns} FROM passwords WHERE category = ? {order_by}',
+                           (category,))
+
+        if skip_corrupt and self.corrupt_ids:
+            return [record for record in cursor if record.id not in self.corrupt_ids]
+        return cursor.fetchall()
 
     def update_password(self, id: int, **kwargs) -> bool:
         timestamp = datetime.now().isoformat()
+        totp = kwargs.pop('totp', None)  # Kept with the attachments; '' removes it
         if 'password' in kwargs:
-            kwargs['password'] = self.encryptor.encrypt(kwargs['password'])
+            kwargs['password'] = self.encryptor.encrypt(kwargs['password'], id)
+            kwargs['key_id'] = self.encryptor.active_key_id
+        if 'website' in kwargs:
+            kwargs['domain'] = registrable_domain(kwargs['website'])
 
-        cursor = self.conn.cursor()
-        update_fields = ', '.join([f"{k} = ?" for k in kwargs.keys()])
-        query = f'UPDATE passwords SET {update_fields}, updated_at = ? WHERE id = ?'
+        update_fields = ''.join([f"{k} = ?, " for k in kwargs.keys()])
+        query = f'UPDATE passwords SET {update_fields}updated_at = ? WHERE id = ?'
 
-        cursor.execute(query, list(kwargs.values()) + [timestamp, id])
-        self.conn.commit()
+        with self.transaction() as cursor:
+            cursor.execute(query, list(kwargs.values()) + [timestamp, id])
+            if totp is not None:
+                self.attachments.replace_small(cursor, id, 'totp', TOTP_NAME, totp.encode())
+            self.secret_cache.invalidate(id)
+            if 'password' in kwargs:
+                self.corrupt_ids.discard(id)  # A new password replaces a damaged one
+            if 'tags' in kwargs:
+                self._set_tags(cursor, id, kwargs['tags'])
+            self._index('update', id, kwargs.get('website'), kwargs.get('username'))
         return True
 
     def delete_password(self, id: int) -> bool:
-        cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM passwords WHERE id = ?', (id,))
-        self.conn.commit()
+        with self.transaction() as cursor:
+            tag_ids = self._unlink_tags(cursor, id)
+            cursor.execute('DELETE FROM passwords WHERE id = ?', (id,))
+            self.secret_cache.invalidate(id)
+            self.corrupt_ids.discard(id)
+            self._index('remove', id)
+            self._prune_tags(cursor, tag_ids)
         return True
 
     def reset_database(self) -> bool:
         """Clear all data from tables without dropping them."""
         try:
-            cursor = self.conn.cursor()
-            # Delete all records instead of dropping tables
-            cursor.execute('DELETE FROM passwords')
-            cursor.execute('DELETE FROM categories')
-            self.conn.commit()
+            with self.transaction() as cursor:
+                # Delete all records instead of dropping tables
+                cursor.execute('DELETE FROM passwords')
+                cursor.execute('DELETE FROM categories')
+                cursor.execute('DELETE FROM password_tags')
+                cursor.execute('DELETE FROM tags')
+            self.secret_cache.wipe()
+            self._index('clear')
             return True
         except Exception as e:
             print(f"Error resetting database: {e}")
             return False
 
-    @lru_cache(maxsize=32)
     def get_all_categories(self) -> tuple:
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT name FROM categories ORDER BY name')
-        return tuple(row[0] for row in cursor.fetchall())
+        return self._cached('categories', lambda: tuple(
+            row[0] for row in self.conn.execute('SELECT name FROM categories ORDER BY name')))
 
     def clear_category_cache(self):
-        """Manually clear the category cache."""
-        self.get_all_categories.cache_clear()
+        """Manually clear the category cache.
+
+        Writes through this manager already invalidate it; this is only needed
+        after changing the file behind its back.
+        """
+        self.cache.invalidate()
 
     def add_category(self, category: str) -> bool:
-        try:
-            cursor = self.conn.cursor()
-            cursor.execute('INSERT INTO categories (name) VALUES (?)', (category,))
-            self.conn.commit()
-            self.clear_category_cache() # Clear cache after adding category
-            return True
-        except sqlite3.IntegrityError:
-            # Category already exists
-            return False
+        with self.transaction() as cursor:
+            cursor.execute('INSERT OR IGNORE INTO categories (name) VALUES (?)', (category,))
+            return cursor.rowcount == 1  # False if the category already exists
+
+    def delete_category(self, category: str, reassign_to: str = None) -> bool:
+        """Delete a category and move its passwords to `reassign_to` (None clears it)."""
+        with self.transaction() as cursor:
+            cursor.execute('DELETE FROM categories WHERE name = ?', (category,))
+            cursor.execute('UPDATE passwords SET category = ? WHERE category = ?',
+                           (reassign_to, category))
+        return True
+
+    def rename_category(self, old_name: str, new_name: str) -> bool:
+        """Rename a category and every password filed under it.
+
+        Renaming onto an existing category merges the two.
+        """
+        with self.transaction() as cursor:
+            cursor.execute('UPDATE OR IGNORE categories SET name = ? WHERE name = ?',
+                           (new_name, old_name))
+            # Left behind only when new_name already existed
+            cursor.execute('DELETE FROM categories WHERE name = ?', (old_name,))
+            cursor.execute('UPDATE passwords SET category = ? WHERE category = ?',
+                           (new_name, old_name))
+        return True
+
+    def apply_category_changes(self, added=(), renamed=None, deleted=None) -> bool:
+        """Apply a batch of category edits in one transaction.
+
+        `renamed` maps old to new names; `deleted` maps each removed category to
+        the category its passwords are reassigned to (None clears it), by its
+        name after the changes.
+        """
+        renamed = renamed or {}
+        # Renames go through a temporary name each, so swapping two names (or
+        # any other cycle) does not merge the categories on the way
+        temporary = {old_name: f'renaming {uuid.uuid4()}' for old_name in renamed}
+        with self.transaction() as cursor:
+            for old_name, temporary_name in temporary.items():
+                self.rename_category(old_name, temporary_name)
+            # With the renamed categories out of the way, a category renamed onto
+            # a deleted name keeps its passwords and a reassignment cannot be
+            # caught up in a rename
+            for category, reassign_to in (deleted or {}).items():
+                self.delete_category(category, reassign_to)
+            for old_name, temporary_name in temporary.items():
+                self.rename_category(temporary_name, renamed[old_name])
+            cursor.executemany('INSERT OR IGNORE INTO categories (name) VALUES (?)',
+                               [(category,) for category in added])
+        return True
 
-    def delete_category(self, category: str) -> bool:
+    def get_category_counts(self) -> list:
+        """Return (category, password count) pairs ordered by name.
+
+        Counts come from the category index alone, so nothing is decrypted.
+        Categories without passwords are included with a count of 0, and
+        passwords without a category are reported under None.
+        """
+        return self._cached('category_counts', self._load_category_counts)
+
+    def _load_category_counts(self) -> list:
         cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM categories WHERE name = ?', (category,))
-        self.conn.commit()
-        self.clear_category_cache() # Clear cache after deleting category
-        return True
\ No newline at end of file
+        cursor.execute('SELECT category, COUNT(*) FROM passwords GROUP BY category')
+        counts = dict(cursor.fetchall())
+        # An empty category string means the same as no category
+        uncategorized = counts.pop(None, 0) + counts.pop('', 0)
+        for category in self.get_all_categories():
+            counts.setdefault(category, 0)
+
+        result = sorted(counts.items(), key=lambda item: item[0].casefold())
+        if uncategorized:
+            result.append((None, uncategorized))
+        return result
+
+    def apply_merge(self, plan) -> bool:
+        """Apply a database.merge.MergePlan in a single transaction.
+
+        Timestamps and uuids come over from the winning side, so merging the
+        other way afterwards finds nothing left to change.
+        """
+        with self.transaction() as cursor:
+            for password_id, entry_uuid in plan.uuid_updates:
+                cursor.execute('UPDATE passwords SET uuid = ? WHERE id = ?', (entry_uuid, password_id))
+            for password_id, entry in plan.replacements():
+                cursor.execute('''
+                    UPDATE passwords SET website = ?, username = ?, password = ?, key_id = ?,
+                                         category = ?, tags = ?, updated_at = ?, domain = ?
+                    WHERE id = ?
+                ''', (entry['website'], entry['username'],
+                      self.encryptor.encrypt(entry['password'], password_id),
+                      self.encryptor.active_key_id, entry.get('category'), entry.get('tags'),
+                      entry.get('updated_at') or datetime.now().isoformat(),
+                      registrable_domain(entry['website']), password_id))
+                self._set_tags(cursor, password_id, entry.get('tags'))
+                self.secret_cache.invalidate(password_id)
+                self._index('update', password_id, entry['website'], entry['username'])
+            for entry in plan.additions:
+                timestamp = datetime.now().isoformat()
+                self._insert_password(cursor, entry['website'], entry['username'], entry['password'],
+                                      entry.get('category'), entry.get('tags'),
+                                      entry.get('created_at') or timestamp,
+                                      entry.get('updated_at') or timestamp, entry.get('uuid'))
+            # Keep merged-in categories selectable in the filter
+            cursor.executemany('INSERT OR IGNORE INTO categories (name) VALUES (?)',
+                               {(entry['category'],) for entry in plan.additions if entry.get('category')}
+                               | {(entry['category'],) for _, entry in plan.replacements()
+                                  if entry.get('category')})
+        return True
+
+    def get_passwords_by_tags(self, tags: list, match_all: bool = True) -> list:
+        """Return passwords carrying all (or, with match_all=False, any) of `tags`."""
+        names = parse_tags(','.join(tags))
+        if not names:
+            return self.get_all_passwords()
+
+        placeholders = ', '.join('?' * len(names))
+        having = 'HAVING COUNT(*) = ?' if match_all else ''
+        params = names + ([len(names)] if match_all else [])
+
+        cursor = self._record_cursor()
+        cursor.execute(f'''
+            SELECT {RECORD_COLUMNS} FROM passwords
+            WHERE id IN (
+                SELECT pt.password_id FROM tags t
+                JOIN password_tags pt ON pt.tag_id = t.id
+                WHERE t.name IN ({placeholders})
+                GROUP BY pt.password_id
+                {having}
+            )
+            ORDER BY updated_at DESC
+        ''', params)
+        return cursor.fetchall()
+
+    def get_tag_counts(self, selected: list = None) -> list:
+        """Return (tag, count) pairs, most used first.
+
+        With `selected` tags the counts are faceted: only passwords carrying every
+        selected tag are counted, and the selected tags themselves are left out.
+        """
+        names = parse_tags(','.join(selected or []))
+        return self._cached(('tag_counts', tuple(name.casefold() for name in names)),
+                            lambda: self._load_tag_counts(names))
+
+    def _load_tag_counts(self, names: list) -> list:
+        cursor = self.conn.cursor()
+        if not names:
+            cursor.execute('''
+                SELECT t.name, COUNT(*) FROM tags t
+                JOIN password_tags pt ON pt.tag_id = t.id
+                GROUP BY t.id
+                ORDER BY COUNT(*) DESC, t.name
+            ''')
+            return cursor.fetchall()
+
+        placeholders = ', '.join('?' * len(names))
+        cursor.execute(f'''
+            SELECT t.name, COUNT(*) FROM password_tags pt
+            JOIN tags t ON t.id = pt.tag_id
+            WHERE pt.password_id IN (
+                SELECT pt2.password_id FROM tags t2
+                JOIN password_tags pt2 ON pt2.tag_id = t2.id
+                WHERE t2.name IN ({placeholders})
+                GROUP BY pt2.password_id
+                HAVING COUNT(*) = ?
+            )
+            AND t.name NOT IN ({placeholders})
+            GROUP BY t.id
+            ORDER BY COUNT(*) DESC, t.name
+        ''', names + [len(names)] + names)
+        return cursor.fetchall()
+
+    def get_all_tags(self) -> tuple:
+        return self._cached('tags', lambda: tuple(
+            row[0] for row in self.conn.execute('SELECT name FROM tags ORDER BY name')))
+
+    def get_tag_index(self) -> PrefixIndex:
+        """Return an in-memory prefix index of all tags for autocomplete."""
+        return self._cached('tag_index', lambda: PrefixIndex(self.get_all_tags()))
+
+    def get_metadata_snapshot(self) -> tuple:
+        """Return (id, website, username, category, tags, updated_at) for every password.
+
+        Nothing is decrypted, so the snapshot is safe to keep cached between writes.
+        """
+        return self._cached('metadata', lambda: tuple(self.conn.execute('''
+            SELECT id, website, username, category, tags, updated_at
+            FROM passwords ORDER BY updated_at DESC
+        ''')))
+
+    def get_site_logins(self) -> list:
+        """Return (domain, website, username) for every password, to spot duplicates by site.
+
+        The domain is the stored registrable domain (see find_for_url), so no
+        website is parsed again.
+        """
+        return self.conn.execute('SELECT domain, website, username FROM passwords').fetchall()
+
+    def get_search_index(self) -> SearchIndex:
+        """Quick-search index over websites and usernames, built from the metadata snapshot.
+
+        Built on first use and then kept current by this process's writes;
+        a commit from another connection makes the next call rebuild it.
+        """
+        data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        entry = self._index_pool.get(self._pool_key)
+        if entry is not None and entry[0] == data_version:
+            return entry[1]
+        self.get_metadata_snapshot()  # Notices other connections' commits first
+        generation = self.cache.generation
+        # The snapshot is newest first; the index wants the oldest first
+        index = SearchIndex((password_id, website, username) for
+                            password_id, website, username, _, _, _ in reversed(self.get_metadata_snapshot()))
+        index.set_scores(dict(self.conn.execute('SELECT id, frecency FROM passwords WHERE frecency > 0')))
+        # A write while building (e.g. from the UI thread) was not applied to this index
+        if generation == self.cache.generation:
+            self._index_pool[self._pool_key] = [data_version, index]
+        return index
+
+    def flush_usage(self) -> dict:
+        """Add the copies counted by `usage` to the vault in one transaction.
+
+        Returns {id: new frecency} of the entries written. Counts that fail to
+        be written are kept for the next flush, also when the failure is a
+        later write of an enclosing transaction.
+        """
+        pending = self.usage.take()
+        if not pending:
+            return {}
+        with self.transaction() as cursor:
+            self._rollback_hooks.append(lambda: self.usage.restore(pending))
+            ids = list(pending)
+            scores = dict(cursor.execute(
+                f"SELECT id, frecency FROM passwords WHERE id IN ({', '.join('?' * len(ids))})", ids))
+            rows = []
+            for password_id, (uses, last_used, score) in pending.items():
+                if password_id in scores:  # Not deleted in the meantime
+                    scores[password_id] = combine_frecency(scores[password_id], score)
+                    rows.append((uses, last_used, scores[password_id], password_id))
+            cursor.executemany('''
+                UPDATE passwords SET use_count = use_count + ?,
+                                     last_used_at = MAX(COALESCE(last_used_at, ''), ?), frecency = ?
+                WHERE id = ?
+            ''', rows)
+        self._index('set_scores', scores)
+        return scores
+
+    def get_audit_events(self, password_id: int = None, start: str = None, end: str = None,
+                         limit: int = 200) -> list:
+        """Audit events, newest first, as (created_at, actor, action, password_id, detail) tuples.
+
+        Narrowed to one entry and/or to the ISO timestamps start <= created_at < end;
+        both go through an index. Events still buffered are written out first.
+        """
+        self.audit.flush()
+        conditions, params = [], []
+        if password_id is not None:
+            conditions.append('password_id = ?')
+            params.append(password_id)
+        if start is not None:
+            conditions.append('created_at >= ?')
+            params.append(start)
+        if end is not None:
+            conditions.append('created_at < ?')
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return self.conn.execute(f'''
+            SELECT created_at, actor, action, password_id, detail FROM audit_log
+            {where} ORDER BY created_at DESC, id DESC LIMIT ?
+        ''', params + [limit]).fetchall()
+
+    def verify_audit_log(self) -> int:
+        """Check the audit hash chain; returns the id of the first bad row, or None if intact."""
+        self.audit.flush()
+        return verify_audit_chain(self.db_path)
+
+    def _index(self, method: str, *args):
+        """Apply a write to the search index, if one has been built."""
+        entry = self._index_pool.get(self._pool_key)
+        if entry is not None:
+            getattr(entry[1], method)(*args)
+
+    def verify_integrity(self, workers: int = None) -> IntegrityScrubber:
+        """Check the database file and authenticate every row on a background thread.
+
+        When the scrub completes, `corrupt_ids` holds exactly the rows that failed.
+        """
+        def finished(corrupt_ids):
+            self.corrupt_ids = corrupt_ids
+
+        scrubber = IntegrityScrubber(self.db_path, self.encryptor, on_complete=finished,
+                                     workers=workers)
+        scrubber.start()
+        return scrubber
+
+    def start_backup(self, incremental: bool = False, keep: int = 5,
+                     backup_dir: str = None) -> BackupJob:
+        """Write an encrypted snapshot to `backups/` next to the database on a background thread."""
+        if backup_dir is None:
+            backup_dir = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'backups')
+        job = BackupJob(self.db_path, backup_dir, self.encryptor, dict(self.auth.config['vault_keys']),
+                        incremental=incremental, keep=keep)
+        job.start()
+        return job
+
+    def rotate_key(self, master_key: str) -> ReencryptionJob:
+        """Switch new writes to a fresh data key and re-encrypt existing rows in the background.
+
+        The old key stays usable until every row has moved off it.
+        """
+        key_id, data_key = self.auth.add_data_key(master_key)
+        self.encryptor.add_key(key_id, data_key)
+        self.encryptor.active_key_id = key_id
+        return self.start_reencryption()
+
+    def start_reencryption(self) -> ReencryptionJob:
+        """Move rows onto the active key on a background thread, resuming any earlier run.
+
+        Also rewrites legacy Fernet rows in the compact format and re-seals
+        attachments. Keys no longer used by any row are retired once the job completes without failures.
+        """
+        target = self.encryptor.active_key_id
+        with self.transaction() as cursor:
+            # A checkpoint for an older target is useless; its rows need another pass anyway
+            cursor.execute('DELETE FROM key_rotation WHERE target_key_id != ?', (target,))
+            cursor.execute('INSERT OR IGNORE INTO key_rotation (target_key_id, last_id) VALUES (?, 0)',
+                           (target,))
+            last_id, last_attachment_id = cursor.execute('''
+                SELECT last_id, last_attachment_id FROM key_rotation WHERE target_key_id = ?
+            ''', (target,)).fetchone()
+        job = ReencryptionJob(self.db_path, self.encryptor, last_id, last_attachment_id,
+                              on_complete=self._retire_keys)
+        job.start()
+        return job
+
+    def _retire_keys(self, in_use: set):
+        retired = [key_id for key_id in self.encryptor.key_ids()
+                   if key_id not in in_use and key_id != self.encryptor.active_key_id]
+        if retired:
+            self.auth.remove_data_keys(retired)
+            for key_id in retired:
+                self.encryptor.remove_key(key_id)
\ No newline at end of file
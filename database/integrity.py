@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.encryption import DECRYPT_ERRORS
+
+class IntegrityScrubber(threading.Thread):
+    """Background job checking that the vault file and every encrypted row are intact.
+
+    Runs PRAGMA quick_check, then streams the rows in batches from its own
+    connection and authenticates them on a pool of worker threads. Only a few
+    batches are in flight at a time, so memory stays flat however large the
+    vault is. Bad row ids end up in `corrupt_ids`.
+    """
+
+    def __init__(self, db_path: str, encryptor, on_complete=None, workers: int = None,
+                 batch_size: int = 500):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.encryptor = encryptor
+        self.on_complete = on_complete  # called with the set of corrupt ids
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.total = 0
+        self.checked = 0
+        self.problems = []  # quick_check messages and read errors
+        self.corrupt_ids = set()
+        self.started_at = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def progress(self) -> dict:
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            'total': self.total,
+            'checked': self.checked,
+            'corrupt': len(self.corrupt_ids),
+            'problems': len(self.problems),
+            'rows_per_second': self.checked / elapsed if elapsed else 0.0,
+            'done': not self.is_alive() and self.started_at is not None,
+        }
+
+    def _check_batch(self, rows) -> list:
+        bad = []
+        for password_id, blob, key_id in rows:
+            try:
+                self.encryptor.decrypt(blob, password_id, key_id)
+            except DECRYPT_ERRORS:
+                bad.append(password_id)
+        return bad
+
+    def _collect(self, future):
+        self.corrupt_ids.update(future.result())
+        self.checked += future.batch_size
+
+    def run(self):
+        self.started_at = time.monotonic()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.problems.extend(row[0] for row in conn.execute('PRAGMA quick_check')
+                                 if row[0] != 'ok')
+            self.total = conn.execute('SELECT COUNT(*) FROM passwords').fetchone()[0]
+
+            pending = []
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                cursor = conn.execute('SELECT id, password, key_id FROM passwords ORDER BY id')
+                while not self._stop_event.is_set():
+                    try:
+                        rows = cursor.fetchmany(self.batch_size)
+                    except sqlite3.DatabaseError as e:
+                        # A damaged page ends the scan; quick_check has the details
+                        self.problems.append(str(e))
+                        break
+                    if not rows:
+                        break
+                    future = pool.submit(self._check_batch, rows)
+                    future.batch_size = len(rows)
+                    pending.append(future)
+                    if len(pending) >= self.workers * 2:
+                        self._collect(pending.pop(0))
+                for future in pending:
+                    self._collect(future)
+        except sqlite3.DatabaseError as e:
+            self.problems.append(str(e))
+        finally:
+            conn.close()
+
+        if self.on_complete and not self._stop_event.is_set():
+            self.on_complete(set(self.corrupt_ids))
\ No newline at end of file
@@ -0,0 +1,96 @@
+import hashlib
+import json
+from database.db_manager import parse_tags
+
+# Fields that make up an entry's content; ids, key ids and timestamps do not
+CONTENT_FIELDS = ('website', 'username', 'password', 'category', 'tags')
+
+def content_hash(entry: dict) -> str:
+    """Hash of an entry's content, stable across vaults and export files.
+
+    Only kept in memory while merging; a stored unkeyed hash would reveal
+    which entries share a password.
+    """
+    canonical = [
+        entry['website'],
+        entry['username'],
+        entry['password'] or '',
+        entry.get('category') or '',
+        sorted(tag.casefold() for tag in parse_tags(entry.get('tags'))),
+    ]
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+def natural_key(entry: dict) -> tuple:
+    return (entry['website'].strip().casefold(), entry['username'].strip().casefold())
+
+def entries_from_vault(db) -> list:
+    """Decrypted entries of a vault, as dicts in the export format."""
+    return [dict(record) for record in db.get_all_passwords()]
+
+class Conflict:
+    """An entry present on both sides with different content."""
+
+    __slots__ = ('local', 'remote', 'resolution')
+
+    def __init__(self, local: dict, remote: dict):
+        self.local = local
+        self.remote = remote
+        # Newer edit wins by default; a tie keeps what is already here
+        newer = (remote.get('updated_at') or '') > (local.get('updated_at') or '')
+        self.resolution = 'remote' if newer else 'local'
+
+class MergePlan:
+    """What merging `remote` entries into a vault would change.
+
+    Built with two hash joins: remote entries are matched to local ones by
+    uuid, then the rest by website and username, so an entry added on two
+    machines separately is not duplicated. Matched pairs with equal content
+    hashes are unchanged; the others become conflicts, resolved by updated_at
+    unless the reviewer flips them. Entries missing on the remote side are
+    kept, as there are no deletion records to tell a delete from an add.
+    """
+
+    def __init__(self, local: list, remote: list):
+        self.additions = []
+        self.conflicts = []
+        self.unchanged = 0
+        # Matched by website/username under different uuids; both sides
+        # adopt the smaller uuid so the copies converge
+        self.uuid_updates = []
+
+        by_uuid = {entry['uuid']: entry for entry in local if entry.get('uuid')}
+        by_key = {}
+        for entry in local:
+            by_key.setdefault(natural_key(entry), entry)
+        matched = set()
+
+        for entry in remote:
+            match = by_uuid.get(entry.get('uuid'))
+            if match is None:
+                match = by_key.get(natural_key(entry))
+                if match is not None and id(match) in matched:
+                    match = None  # Already paired with another remote entry
+            if match is None:
+                self.additions.append(entry)
+                continue
+            matched.add(id(match))
+
+            if entry.get('uuid') and (match['uuid'] is None or entry['uuid'] < match['uuid']):
+                self.uuid_updates.append((match['id'], entry['uuid']))
+            if content_hash(entry) == content_hash(match):
+                self.unchanged += 1
+            else:
+                self.conflicts.append(Conflict(match, entry))
+
+    def replacements(self) -> list:
+        """(local id, remote entry) for every conflict resolved in favour of the remote side."""
+        return [(conflict.local['id'], conflict.remote)
+                for conflict in self.conflicts if conflict.resolution == 'remote']
+
+    def summary(self) -> str:
+        return (f"{len(self.additions)} new, {len(self.replacements())} updated, "
+                f"{len(self.conflicts)} conflicts, {self.unchanged} unchanged")
+
+def plan_merge(db, remote: list) -> MergePlan:
+    """Diff `remote` entries (another vault's or an export's) against the vault `db`."""
+    return MergePlan(entries_from_vault(db), remote)
\ No newline at end of file
@@ -0,0 +1,51 @@
+import threading
+
+class MetadataCache:
+    """In-process cache for metadata derived from the vault (categories, counts, tags).
+
+    Entries are stamped with the generation they were loaded under. Any write
+    bumps the generation, which makes every entry stale at once; stale entries
+    are simply reloaded on their next read.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        # Last PRAGMA data_version seen on the owning connection
+        self.data_version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # key -> (generation, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Return the cached value for `key`, calling `loader()` on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self.generation:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self.generation
+
+        value = loader()
+        with self._lock:
+            # A write that happened while loading leaves this value stale; keep it
+            # stamped with the old generation so the next read reloads it
+            self._entries[key] = (generation, value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'generation': self.generation,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
\ No newline at end of file
@@ -0,0 +1,59 @@
+import sys
+from utils.encryption import DECRYPT_ERRORS
+
+class PasswordRecord:
+    """One row of the passwords table.
+
+    Built by DatabaseManager's row factory. Only the encrypted password is kept;
+    it is decrypted each time `password` is read, so no plaintext stays on the
+    record. Records built without the blob fetch the password by id instead.
+    A password that fails to decrypt reads as None and flags the record corrupt.
+    """
+
+    __slots__ = ('id', 'website', 'username', '_encrypted', 'category', 'tags',
+                 'created_at', 'updated_at', '_key_id', 'uuid', '_db')
+
+    FIELDS = ('id', 'website', 'username', 'password', 'category', 'tags',
+              'created_at', 'updated_at', 'uuid')
+
+    def __init__(self, db, id, website, username, encrypted, category, tags,
+                 created_at, updated_at, key_id=None, uuid=None):
+        self._db = db
+        self.id = id
+        self.website = website
+        self.username = username
+        self._encrypted = encrypted
+        # Categories and tag strings repeat across many rows; share one copy
+        self.category = sys.intern(category) if category else category
+        self.tags = sys.intern(tags) if tags else tags
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self._key_id = key_id
+        self.uuid = uuid
+
+    @property
+    def password(self) -> str:
+        if self._encrypted is None or self._db.encryptor.locked:
+            return self._db.get_secret(self.id)
+        try:
+            return self._db.encryptor.decrypt(self._encrypted, self.id, self._key_id)
+        except DECRYPT_ERRORS:
+            self._db.corrupt_ids.add(self.id)
+            return None
+
+    @property
+    def corrupt(self) -> bool:
+        return self.id in self._db.corrupt_ids
+
+    # Mapping-style access, so records can stand in for the old row dicts
+    # (e.g. dict(record) when exporting)
+    def keys(self):
+        return self.FIELDS
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self) -> str:
+        return f"PasswordRecord(id={self.id!r}, website={self.website!r}, username={self.username!r})"
\ No newline at end of file
@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+import time
+from database.attachments import AttachmentStore
+from utils.encryption import RECORD_VERSION, DECRYPT_ERRORS
+
+class ReencryptionJob(threading.Thread):
+    """Background job moving every row onto the active data key.
+
+    Rewrites rows stored under an older key (after a key rotation) and legacy
+    Fernet rows in the compact AES-GCM format, then re-seals the attachments
+    (files, notes, 2FA secrets) stored under an older key. Uses its own
+    connection and works in small batches; each batch and the checkpoint in
+    key_rotation are committed together, so a job interrupted by a crash or
+    app exit resumes after the last finished batch. A row rewritten by someone
+    else between our read and write is left alone; that write already used
+    the active key.
+    """
+
+    def __init__(self, db_path: str, encryptor, last_id: int = 0, last_attachment_id: int = 0,
+                 on_complete=None, batch_size: int = 200, batch_bytes: int = 4 * 1024 * 1024,
+                 pause: float = 0.05):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.encryptor = encryptor
+        self.attachments = AttachmentStore(db_path, encryptor)
+        self.target_key_id = encryptor.active_key_id
+        self.last_id = last_id
+        self.last_attachment_id = last_attachment_id
+        self.on_complete = on_complete  # called with the key ids still in use
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes  # attachment bytes re-sealed per transaction, at least one attachment
+        self.pause = pause  # seconds between batches, leaving room for the UI
+        self.total = 0
+        self.reencrypted = 0
+        self.failed = []  # ids of rows that could not be decrypted
+        self.failed_attachments = []
+        self.started_at = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def progress(self) -> dict:
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            'total': self.total,
+            'reencrypted': self.reencrypted,
+            'failed': len(self.failed) + len(self.failed_attachments),
+            'rows_per_second': self.reencrypted / elapsed if elapsed else 0.0,
+            'done': not self.is_alive() and self.started_at is not None,
+        }
+
+    def run(self):
+        self.started_at = time.monotonic()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            stale = '(key_id != ? OR substr(password, 1, 1) != ?)'
+            params = (self.target_key_id, RECORD_VERSION)
+            self.total = conn.execute(f'SELECT COUNT(*) FROM passwords WHERE id > ? AND {stale}',
+                                      (self.last_id,) + params).fetchone()[0]
+            self.total += conn.execute('SELECT COUNT(*) FROM attachments WHERE id > ? AND key_id != ?',
+                                       (self.last_attachment_id, self.target_key_id)).fetchone()[0]
+            finished = False
+            while not self._stop_event.is_set():
+                rows = conn.execute(f'''
+                    SELECT id, password, key_id FROM passwords
+                    WHERE id > ? AND {stale}
+                    ORDER BY id LIMIT ?
+                ''', (self.last_id,) + params + (self.batch_size,)).fetchall()
+                if not rows:
+                    finished = True
+                    break
+
+                updates = []
+                for password_id, blob, key_id in rows:
+                    try:
+                        plaintext = self.encryptor.decrypt(blob, password_id, key_id)
+                    except Exception:
+                        self.failed.append(password_id)
+                        continue
+                    updates.append((self.encryptor.encrypt(plaintext, password_id),
+                                    self.target_key_id, password_id, blob))
+
+                with conn:
+                    cursor = conn.executemany('''
+                        UPDATE passwords SET password = ?, key_id = ?
+                        WHERE id = ? AND password = ?
+                    ''', updates)
+                    self.reencrypted += cursor.rowcount
+                    self.last_id = rows[-1][0]
+                    conn.execute('UPDATE key_rotation SET last_id = ? WHERE target_key_id = ?',
+                                 (self.last_id, self.target_key_id))
+                time.sleep(self.pause)
+            if not finished or not self._reseal_attachments(conn):
+                return  # Stopped early; the checkpoint says where to pick up
+
+            with conn:
+                conn.execute('DELETE FROM key_rotation WHERE target_key_id = ?',
+                             (self.target_key_id,))
+            if self.on_complete and not self.failed and not self.failed_attachments:
+                in_use = {row[0] for row in conn.execute(
+                    'SELECT DISTINCT key_id FROM passwords UNION SELECT DISTINCT key_id FROM attachments')}
+                self.on_complete(in_use)
+        finally:
+            conn.close()
+
+    def _reseal_attachments(self, conn) -> bool:
+        """Move the attachments onto the target key; False if stopped before the end."""
+        while not self._stop_event.is_set():
+            rows = conn.execute('''
+                SELECT id, size, chunk_size, key_id FROM attachments
+                WHERE id > ? AND key_id != ?
+                ORDER BY id LIMIT ?
+            ''', (self.last_attachment_id, self.target_key_id, self.batch_size)).fetchall()
+            if not rows:
+                return True
+
+            batch_bytes = 0
+            with conn:
+                # Opened here so that releasing a savepoint does not commit
+                conn.execute('BEGIN IMMEDIATE')
+                for attachment_id, size, chunk_size, key_id in rows:
+                    if batch_bytes and batch_bytes + size > self.batch_bytes:
+                        break  # A large file gets a transaction of its own
+                    batch_bytes += size
+                    # One savepoint per attachment: a damaged one is rolled
+                    # back alone, leaving the rest of the batch to commit
+                    conn.execute('SAVEPOINT reseal')
+                    try:
+                        # Guarded on the old key, like the password rows
+                        cursor = conn.execute('UPDATE attachments SET key_id = ? WHERE id = ? AND key_id = ?',
+                                              (self.target_key_id, attachment_id, key_id))
+                        if cursor.rowcount:
+                            self.attachments.reseal(conn, attachment_id, size, chunk_size, key_id)
+                            self.reencrypted += 1
+                    except DECRYPT_ERRORS:
+                        conn.execute('ROLLBACK TO reseal')
+                        self.failed_attachments.append(attachment_id)
+                    conn.execute('RELEASE reseal')
+                    self.last_attachment_id = attachment_id
+                conn.execute('UPDATE key_rotation SET last_attachment_id = ? WHERE target_key_id = ?',
+                             (self.last_attachment_id, self.target_key_id))
+            time.sleep(self.pause)
+        return False
\ No newline at end of file
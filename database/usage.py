@@ -0,0 +1,66 @@
+import math
+import threading
+from datetime import datetime
+
+# A use counts half as much for every HALF_LIFE that has passed since
+HALF_LIFE = 30 * 24 * 3600  # seconds
+DECAY = math.log(2) / HALF_LIFE
+
+def combine(score: float, other: float) -> float:
+    """Sum of two frecency scores (see UsageCounter); 0 stands for no uses."""
+    if not score or not other:
+        return score or other
+    high, low = max(score, other), min(score, other)
+    return high + math.log1p(math.exp(low - high))
+
+class UsageCounter:
+    """Uses (copies) of entries counted in memory until the next flush.
+
+    record() only touches a dict, so copying never waits for a write;
+    DatabaseManager.flush_usage() adds the counts to the vault in one
+    transaction.
+
+    The frecency score of an entry is ln(sum of e ** (DECAY * t)) over the
+    unix times t of its uses: its exponentially decaying use count, scaled to
+    a fixed epoch instead of to now. Time decays every entry by the same
+    factor, so the order of the stored scores never changes by itself and
+    an index on them is always in "frequent and recent first" order without
+    ever being rewritten. Scores are combined with combine(); 0 means unused.
+    """
+
+    def __init__(self):
+        self._pending = {}  # password id -> [uses, last used (ISO), score of these uses]
+        self._lock = threading.Lock()
+
+    def record(self, password_id: int, when: datetime = None):
+        when = when or datetime.now()
+        score = DECAY * when.timestamp()
+        with self._lock:
+            entry = self._pending.get(password_id)
+            if entry is None:
+                self._pending[password_id] = [1, when.isoformat(), score]
+            else:
+                entry[0] += 1
+                entry[1] = max(entry[1], when.isoformat())
+                entry[2] = combine(entry[2], score)
+
+    def take(self) -> dict:
+        """Hand over the counts gathered so far and start from zero."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, pending: dict):
+        """Put back counts from take() that could not be written."""
+        with self._lock:
+            for password_id, (uses, last_used, score) in pending.items():
+                entry = self._pending.get(password_id)
+                if entry is None:
+                    self._pending[password_id] = [uses, last_used, score]
+                else:
+                    entry[0] += uses
+                    entry[1] = max(entry[1], last_used)
+                    entry[2] = combine(entry[2], score)
+
+    def __len__(self) -> int:
+        return len(self._pending)
\ No newline at end of file
@@ -0,0 +1,125 @@
+import heapq
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from database.db_manager import DatabaseManager
+from utils.auth import Auth
+from utils.file_init import init_program_files
+
+DEFAULT_VAULT = 'Personal'
+
+class VaultRegistry:
+    """Known vaults by name, each a database plus the config holding its keys.
+
+    The default vault is the passwords.db / config.json pair the app has
+    always used; others live in a directory of their own.
+    """
+
+    def __init__(self, registry_file: str = 'vaults.json'):
+        self.registry_file = registry_file
+        self.vaults = {DEFAULT_VAULT: {'db_path': 'passwords.db', 'config_file': 'config.json'}}
+        if os.path.exists(registry_file):
+            with open(registry_file, 'r') as f:
+                self.vaults.update(json.load(f))
+
+    def _save(self):
+        extra = {name: vault for name, vault in self.vaults.items() if name != DEFAULT_VAULT}
+        tmp_file = self.registry_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(extra, f, indent=2)
+        os.replace(tmp_file, self.registry_file)
+
+    def names(self) -> list:
+        return [DEFAULT_VAULT] + sorted(name for name in self.vaults if name != DEFAULT_VAULT)
+
+    def get(self, name: str) -> dict:
+        return self.vaults[name]
+
+    def add(self, name: str, directory: str) -> dict:
+        if name in self.vaults:
+            raise ValueError(f"A vault named '{name}' already exists")
+        vault = {
+            'db_path': os.path.join(directory, 'passwords.db'),
+            'config_file': os.path.join(directory, 'config.json'),
+        }
+        # Setting a master password would overwrite the keys of a vault already there
+        if any(os.path.exists(path) for path in vault.values()):
+            raise ValueError(f"{directory} already holds a vault")
+        os.makedirs(directory, exist_ok=True)
+        init_program_files(vault['config_file'], vault['db_path'])
+        self.vaults[name] = vault
+        self._save()
+        return vault
+
+    def remove(self, name: str) -> bool:
+        """Forget a vault; its files are left where they are."""
+        if name == DEFAULT_VAULT or name not in self.vaults:
+            return False
+        del self.vaults[name]
+        self._save()
+        return True
+
+    def auth(self, name: str) -> Auth:
+        return Auth(self.vaults[name]['config_file'])
+
+class OpenVaults:
+    """The vaults unlocked in this session.
+
+    Every vault gets its own DatabaseManager, so its connection, key material
+    and caches stay separate from the others'.
+    """
+
+    def __init__(self, registry: VaultRegistry):
+        self.registry = registry
+        self.managers = {}
+
+    def unlock(self, name: str, master_key: str) -> DatabaseManager:
+        """Open a vault; raises ValueError on a wrong master password."""
+        if name not in self.managers:
+            vault = self.registry.get(name)
+            self.managers[name] = DatabaseManager(master_key, self.registry.auth(name),
+                                                  db_path=vault['db_path'])
+        return self.managers[name]
+
+    def lock(self, name: str):
+        manager = self.managers.pop(name, None)
+        if manager is not None:
+            manager.close()
+
+    def lock_all(self):
+        for name in list(self.managers):
+            self.lock(name)
+
+    def get(self, name: str) -> DatabaseManager:
+        return self.managers.get(name)
+
+    def names(self) -> list:
+        return [name for name in self.registry.names() if name in self.managers]
+
+    def search(self, query: str) -> list:
+        """Search every open vault at once; returns (vault name, record) pairs, newest first.
+
+        Each vault is queried on its own connection in a worker thread. Every
+        result list is already sorted by updated_at, so they are merged
+        rather than re-sorted.
+        """
+        if not self.managers:
+            return []
+        with ThreadPoolExecutor(max_workers=len(self.managers)) as pool:
+            futures = {name: pool.submit(manager.search_passwords, query, include_passwords=False)
+                       for name, manager in self.managers.items()}
+            results = [[(name, record) for record in future.result()]
+                       for name, future in futures.items()]
+        return list(heapq.merge(*results, key=lambda item: item[1].updated_at or '', reverse=True))
+
+    def purge_expired_secrets(self):
+        for manager in self.managers.values():
+            manager.secret_cache.purge_expired()
+
+    def flush_audit_logs(self):
+        for manager in self.managers.values():
+            manager.audit.flush()
+
+    def wipe_secrets(self):
+        for manager in self.managers.values():
+            manager.secret_cache.wipe()
\ No newline at end of file
@@ -13,8 +13,15 @@ class ImportExportManager:
     def __init__(self, master_key: str):
         self.master_key = master_key
         self.salt = b'exportsecuresalt'  # Different salt for export
-        self.key = self._generate_key(master_key)
-        self.fernet = Fernet(self.key)
+        self._fernet = None
+
+    @property
+    def fernet(self) -> Fernet:
+        # Derived on first use, so unlocking a vault does not pay for a KDF only exports need
+        if self._fernet is None:
+            self.key = self._generate_key(self.master_key)
+            self._fernet = Fernet(self.key)
+        return self._fernet
 
     def _generate_key(self, master_key: str) -> bytes:
         # Use PBKDF2HMAC for key derivation
@@ -31,8 +38,12 @@ class ImportExportManager:
         try:
             # Convert bytes to strings before encryption
             serializable_passwords = []
+            skipped = 0
             for password in passwords:
-                serializable_password = password.copy()
+                serializable_password = dict(password)
+                if serializable_password['password'] is None:
+                    skipped += 1  # Could not be decrypted; leave it out of the export
+                    continue
                 for key, value in serializable_password.items():
                     if isinstance(value, bytes):
                         serializable_password[key] = value.decode('utf-8')
@@ -44,6 +55,8 @@ class ImportExportManager:
             # Write the encrypted data to the file
             with open(filename, 'wb') as f:
                 f.write(encrypted_data)
+            if skipped:
+                print(f"Skipped {skipped} corrupted passwords while exporting")
             return True
         except Exception as e:
             print(f"Error exporting passwords: {e}")
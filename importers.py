@@ -0,0 +1,190 @@
+import csv
+import json
+import os
+import xml.etree.ElementTree as ET
+from utils.domains import registrable_domain
+
+# Streaming readers for other password managers' plaintext exports. Each one
+# yields (website, username, password, category, tags) tuples, the row shape
+# DatabaseManager.add_passwords_bulk() takes, without loading the whole file.
+
+READ_SIZE = 1 << 16
+
+def site_key(website: str, username: str, domain: str = None) -> tuple:
+    """Normalized (site, username) used to spot entries the vault already has.
+
+    The site is the registrable domain find_for_url() matches on, so
+    "https://www.Example.com/login", "login.example.com" and "example.com"
+    are the same site; `domain` is the one a vault entry already has stored.
+    A website without a host ("My bank") is compared as text, ignoring case.
+    """
+    site = domain or registrable_domain(website) or (website or '').strip().casefold()
+    return site, (username or '').strip().casefold()
+
+def iter_browser_csv(path: str):
+    """Chrome, Edge and Firefox password CSVs (url/name, username, password columns)."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            website = row.get('url') or row.get('name') or ''
+            yield website, row.get('username') or '', row.get('password') or '', None, None
+
+def iter_bitwarden_json(path: str):
+    """Unencrypted Bitwarden JSON exports; login items only, folders become categories."""
+    # Folders come first in Bitwarden exports; reading them is a separate cheap pass
+    folders = {folder['id']: folder['name'] for folder in _iter_json_array(path, 'folders')}
+    for item in _iter_json_array(path, 'items'):
+        login = item.get('login')
+        if item.get('type') != 1 or not login:
+            continue
+        uris = login.get('uris') or []
+        website = (uris[0].get('uri') if uris else None) or item.get('name') or ''
+        yield (website, login.get('username') or '', login.get('password') or '',
+               folders.get(item.get('folderId')), None)
+
+def iter_keepass_xml(path: str):
+    """KeePass 2 XML exports; the entry's group becomes its category."""
+    groups = []
+    group_elems = []
+    history_depth = 0
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == 'Group':
+                groups.append(None)
+                group_elems.append(elem)
+            elif elem.tag == 'History':
+                history_depth += 1
+            continue
+
+        if elem.tag == 'Name' and groups and groups[-1] is None:
+            groups[-1] = elem.text
+        elif elem.tag == 'Group':
+            groups.pop()
+            group_elems.pop()
+            elem.clear()
+        elif elem.tag == 'History':
+            history_depth -= 1
+            elem.clear()
+        elif elem.tag == 'Entry' and not history_depth:
+            fields = {string.findtext('Key'): string.findtext('Value') or ''
+                      for string in elem.iter('String')}
+            tags = (elem.findtext('Tags') or '').replace(';', ',') or None
+            # The outermost group is the database itself, not a category
+            category = groups[-1] if len(groups) > 1 else None
+            yield (fields.get('URL') or fields.get('Title') or '', fields.get('UserName', ''),
+                   fields.get('Password', ''), category, tags)
+            # Detach the entry too, or the group keeps an empty element per entry
+            elem.clear()
+            if group_elems:
+                group_elems[-1].remove(elem)
+
+IMPORTERS = {
+    '.csv': iter_browser_csv,
+    '.json': iter_bitwarden_json,
+    '.xml': iter_keepass_xml,
+}
+
+def _iter_json_array(path: str, key: str):
+    """Yield the elements of the top-level array `key` one at a time.
+
+    Only the current element and a read buffer are held in memory; other
+    top-level arrays are stepped over element by element the same way, and
+    reading stops at the end of the wanted one.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8-sig') as f:
+        reader = _JsonReader(f, decoder)
+        reader.expect('{')
+        while not reader.consume('}'):
+            name = reader.value()
+            reader.expect(':')
+            if reader.consume('['):
+                while not reader.consume(']'):
+                    element = reader.value()
+                    if name == key:
+                        yield element
+                    reader.consume(',')
+                if name == key:
+                    return
+            else:
+                reader.value()
+            reader.consume(',')
+
+class _JsonReader:
+    def __init__(self, f, decoder):
+        self.f = f
+        self.decoder = decoder
+        self.buf = ''
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        data = self.f.read(READ_SIZE)
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _skip_space(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return
+
+    def consume(self, char: str) -> bool:
+        self._skip_space()
+        if self.buf.startswith(char, self.pos):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, char: str):
+        if not self.consume(char):
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of the JSON buffer")
+
+    def value(self):
+        self._skip_space()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Probably cut off at the end of the buffer; read on and retry
+                if not self._fill():
+                    raise
+                continue
+            # A number can be cut off without failing to parse
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+class ImportResult:
+    __slots__ = ('imported', 'duplicates', 'skipped')
+
+    def __init__(self):
+        self.imported = 0
+        self.duplicates = 0  # already in the vault, or repeated in the file
+        self.skipped = 0     # no website or no password
+
+def import_file(db, path: str, importer=None) -> ImportResult:
+    """Stream a foreign export into the vault, skipping entries it already has."""
+    importer = importer or IMPORTERS[os.path.splitext(path)[1].lower()]
+    result = ImportResult()
+    # Hash index of what the vault holds, keyed on the stored domains; nothing is decrypted
+    seen = {site_key(website, username, domain) for domain, website, username in db.get_site_logins()}
+
+    def new_rows():
+        for row in importer(path):
+            website, username, password = row[0], row[1], row[2]
+            if not website or not password:
+                result.skipped += 1
+                continue
+            key = site_key(website, username)
+            if key in seen:
+                result.duplicates += 1
+                continue
+            seen.add(key)
+            yield row
+
+    result.imported = db.add_passwords_bulk(new_rows())
+    return result
\ No newline at end of file
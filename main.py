@@ -1,11 +1,19 @@
 import sys
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
-from ui.login_window import LoginWindow
-from PySide6.QtGui import QIcon
-from utils.file_init import init_program_files  # Add this import
+from utils.single_instance import notify_running_instance, InstanceServer
 
 def main():
+    # A second launch hands its arguments (a search query) to the running
+    # instance and exits before loading any UI module or opening the vault
+    if notify_running_instance(sys.argv[1:]):
+        return
+
+    from PySide6.QtWidgets import QApplication
+    import PySide6.QtAsyncio as QtAsyncio
+    from PySide6.QtGui import QIcon
+    from ui.login_window import LoginWindow
+    from ui.theme import apply_theme
+    from utils.file_init import init_program_files
+
     # Initialize program files before starting the app
     init_program_files()
 
@@ -20,11 +28,21 @@ def main():
     # Set the application icon
     app.setWindowIcon(QIcon("icon/logo.ico"))  # Set the application icon
 
+    # One style sheet for the whole app, parsed once
+    apply_theme(app)
+
     # Create and show the login window
     login_window = LoginWindow()
     login_window.show()
 
-    sys.exit(app.exec())
+    # Later launches raise whichever window is current instead of starting over
+    instance_server = InstanceServer(parent=app)
+    instance_server.activated.connect(
+        lambda args: (login_window.main_window or login_window).activate(' '.join(args).strip()))
+
+    # asyncio runs on top of the Qt event loop, so slots can start coroutines
+    # that await the vault (see utils.async_calls)
+    QtAsyncio.run(handle_sigint=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
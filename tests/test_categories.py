@@ -0,0 +1,34 @@
+from tests.vault import VaultTestCase
+
+class CategoryChangesTest(VaultTestCase):
+    def setUp(self):
+        super().setUp()
+        for category in ('A', 'B', 'C'):
+            self.db.add_category(category)
+        self.ids = {category: self.db.add_password(f'{category.lower()}.example.com', 'user', 'secret',
+                                                   category=category)
+                    for category in ('A', 'B', 'C')}
+
+    def categories(self) -> dict:
+        """{original category: category now} of the entries made in setUp."""
+        return {category: self.db.get_password(password_id).category
+                for category, password_id in self.ids.items()}
+
+    def test_swap_keeps_categories_apart(self):
+        self.db.apply_category_changes(renamed={'A': 'B', 'B': 'A'})
+        self.assertEqual(self.categories(), {'A': 'B', 'B': 'A', 'C': 'C'})
+        self.assertEqual(sorted(self.db.get_all_categories()), ['A', 'B', 'C'])
+
+    def test_rotation_through_three_names(self):
+        self.db.apply_category_changes(renamed={'A': 'B', 'B': 'C', 'C': 'A'})
+        self.assertEqual(self.categories(), {'A': 'B', 'B': 'C', 'C': 'A'})
+
+    def test_reassignment_uses_names_after_renames(self):
+        # C's entries go to the category called B once the swap is done
+        self.db.apply_category_changes(renamed={'A': 'B', 'B': 'A'}, deleted={'C': 'B'})
+        self.assertEqual(self.categories(), {'A': 'B', 'B': 'A', 'C': 'B'})
+        self.assertEqual(sorted(self.db.get_all_categories()), ['A', 'B'])
+
+    def test_rename_onto_deleted_name(self):
+        self.db.apply_category_changes(renamed={'A': 'C'}, deleted={'C': None})
+        self.assertEqual(self.categories(), {'A': 'C', 'B': 'B', 'C': None})
\ No newline at end of file
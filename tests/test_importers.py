@@ -0,0 +1,25 @@
+import os
+from importers import import_file, site_key
+from tests.vault import VaultTestCase
+
+class ImportDuplicatesTest(VaultTestCase):
+    def test_site_key_matches_find_for_url(self):
+        self.assertEqual(site_key('https://www.Example.com/login', 'User'),
+                         site_key('login.example.com', 'user'))
+        self.assertNotEqual(site_key('alice.github.io', 'user'), site_key('bob.github.io', 'user'))
+        self.assertEqual(site_key('My bank', 'user'), ('my bank', 'user'))
+
+    def test_entries_found_by_url_are_duplicates(self):
+        self.db.add_password('https://login.example.com', 'user', 'secret')
+        self.db.add_password('My bank', 'user', 'secret')
+        path = os.path.join(self.tmp.name, 'export.csv')
+        with open(path, 'w', newline='') as f:
+            f.write('url,username,password\n'
+                    'https://example.com/account,user,secret\n'
+                    'https://example.com/account,other,secret\n'
+                    'my bank,user,secret\n'
+                    'https://other.example.org,user,secret\n')
+        result = import_file(self.db, path)
+        self.assertEqual((result.imported, result.duplicates), (2, 2))
+        # The entry already there and the new one for 'other'
+        self.assertEqual(len(self.db.find_for_url('https://www.example.com/')), 2)
\ No newline at end of file
@@ -0,0 +1,43 @@
+import sqlite3
+from tests.vault import VaultTestCase
+
+class NestedTransactionTest(VaultTestCase):
+    def setUp(self):
+        super().setUp()
+        self.password_id = self.db.add_password('example.com', 'user', 'secret')
+        self.other = sqlite3.connect(self.db_path)
+        self.addCleanup(self.other.close)
+
+    def committed_use_count(self):
+        # Read through another connection, which only sees committed data
+        return self.other.execute('SELECT use_count FROM passwords WHERE id = ?',
+                                  (self.password_id,)).fetchone()[0]
+
+    def test_inner_block_does_not_commit(self):
+        self.db.usage.record(self.password_id)
+        with self.db.transaction():
+            self.db.flush_usage()
+            self.assertEqual(self.committed_use_count(), 0)
+        self.assertEqual(self.committed_use_count(), 1)
+
+    def test_inner_error_rolls_back_outer_block(self):
+        self.db.usage.record(self.password_id)
+        with self.assertRaises(TypeError):
+            with self.db.transaction():
+                self.db.flush_usage()
+                self.db.add_password('other.com', 'user', 'secret', bogus=1)
+        self.assertEqual(self.committed_use_count(), 0)
+        self.assertFalse(self.db.conn.in_transaction)
+        self.assertEqual(len(self.db.usage), 1)
+
+    def test_failed_commit_rolls_back(self):
+        self.db.conn.execute('PRAGMA busy_timeout = 0')
+        self.db.usage.record(self.password_id)
+        self.other.execute('BEGIN')
+        self.other.execute('SELECT COUNT(*) FROM passwords').fetchone()  # Holds a read lock
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.db.transaction():
+                self.db.flush_usage()
+        self.other.rollback()
+        self.assertFalse(self.db.conn.in_transaction)
+        self.assertEqual(len(self.db.usage), 1)
\ No newline at end of file
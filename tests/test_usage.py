@@ -0,0 +1,35 @@
+from tests.vault import VaultTestCase
+from ui.write_queue import Mutation, WriteQueue
+
+class UsageRollbackTest(VaultTestCase):
+    def setUp(self):
+        super().setUp()
+        self.password_id = self.db.add_password('example.com', 'user', 'secret')
+        self.db.usage.record(self.password_id)
+
+    def use_count(self):
+        return self.db.conn.execute('SELECT use_count FROM passwords WHERE id = ?',
+                                    (self.password_id,)).fetchone()[0]
+
+    def test_counts_survive_enclosing_rollback(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.flush_usage()
+                raise RuntimeError('later write failed')
+        self.assertEqual(len(self.db.usage), 1)
+        self.assertEqual(self.use_count(), 0)
+
+        self.db.flush_usage()
+        self.assertEqual(len(self.db.usage), 0)
+        self.assertEqual(self.use_count(), 1)
+
+    def test_failed_batch_keeps_usage_for_retry(self):
+        queue = WriteQueue()
+        failed = []
+        queue.failed.connect(lambda mutation, error: failed.append(mutation.kind))
+        # The add fails on an unknown argument after the usage counts were taken
+        written = queue._write(self.db, [Mutation('usage', self.db),
+                                         Mutation('add', self.db, values={'bogus': 1})])
+        self.assertEqual([mutation.kind for mutation in written], ['usage'])
+        self.assertEqual(failed, ['add'])
+        self.assertEqual(self.use_count(), 1)
\ No newline at end of file
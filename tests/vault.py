@@ -0,0 +1,19 @@
+import os
+import tempfile
+import unittest
+from database.db_manager import DatabaseManager
+from utils.auth import Auth
+
+MASTER_PASSWORD = 'test-master-password'
+
+class VaultTestCase(unittest.TestCase):
+    """A fresh vault in a temporary directory for every test."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.auth = Auth(config_file=os.path.join(self.tmp.name, 'config.json'))
+        self.auth.set_master_password(MASTER_PASSWORD)
+        self.db_path = os.path.join(self.tmp.name, 'passwords.db')
+        self.db = DatabaseManager(MASTER_PASSWORD, self.auth, self.db_path)
+        self.addCleanup(self.db.close)
\ No newline at end of file
@@ -1,7 +1,9 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit,
-                             QPushButton, QLabel, QComboBox, QMessageBox, QInputDialog)
-from PySide6.QtCore import Qt
+                             QPushButton, QLabel, QComboBox, QMessageBox, QInputDialog,
+                             QCompleter)
+from PySide6.QtCore import Qt, QStringListModel
 from utils.password_generator import PasswordGenerator
+from utils.totp import Totp
 
 class AddPasswordDialog(QDialog):
     def __init__(self, parent=None, categories=None):
@@ -14,7 +16,7 @@ class AddPasswordDialog(QDialog):
 
     def setup_ui(self):
         self.setWindowTitle("Add New Password")
-        self.setFixedSize(400, 450)
+        self.setFixedSize(400, 530)
 
         layout = QVBoxLayout(self)
         layout.setSpacing(15)
@@ -38,6 +40,7 @@ class AddPasswordDialog(QDialog):
         pass_layout.addWidget(self.password_input)
 
         gen_pass_btn = QPushButton("Generate")
+        gen_pass_btn.setProperty("variant", "success")
         gen_pass_btn.clicked.connect(self.generate_password)
         pass_layout.addWidget(gen_pass_btn)
         layout.addLayout(pass_layout)
@@ -58,11 +61,18 @@ class AddPasswordDialog(QDialog):
         # Tags
         layout.addWidget(QLabel("Tags (comma separated):"))
         self.tags_input = QLineEdit()
+        self.setup_tag_completer()
         layout.addWidget(self.tags_input)
 
+        # 2FA
+        layout.addWidget(QLabel("2FA secret (optional):"))
+        self.totp_input = QLineEdit()
+        self.totp_input.setPlaceholderText("Base32 key or otpauth:// link")
+        layout.addWidget(self.totp_input)
+
         # Set fixed height for input fields
         for widget in [self.website_input, self.username_input,
-                      self.password_input, self.tags_input]:
+                      self.password_input, self.tags_input, self.totp_input]:
             widget.setFixedHeight(38)
 
         self.category_input.setFixedHeight(38)
@@ -72,86 +82,58 @@ class AddPasswordDialog(QDialog):
         save_btn = QPushButton("Save")
         save_btn.clicked.connect(self.accept)
         cancel_btn = QPushButton("Cancel")
+        cancel_btn.setProperty("variant", "neutral")
         cancel_btn.clicked.connect(self.reject)
 
         button_layout.addWidget(save_btn)
         button_layout.addWidget(cancel_btn)
         layout.addLayout(button_layout)
 
-        self.apply_styles()
-
-    def apply_styles(self):
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #1e272e;
-                color: white;
-            }
-            QLabel {
-                color: white;
-                font-size: 13px;
-                margin-bottom: 2px;
-            }
-            QLineEdit, QComboBox {
-                padding: 8px 12px;
-                border: 2px solid #485460;
-                border-radius: 6px;
-                background-color: #2d3436;
-                color: white;
-                min-height: 20px;
-                font-size: 13px;
-                margin-bottom: 5px;
-            }
-            QLineEdit:focus, QComboBox:focus {
-                border: 2px solid #0984e3;
-            }
-            QLineEdit::placeholder {
-                color: #b2bec3;
-            }
-            QComboBox {
-                min-height: 20px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2d3436;
-                color: white;
-                selection-background-color: #0984e3;
-                padding: 4px;
-            }
-            QPushButton {
-                padding: 5px 16px;
-                border-radius: 6px;
-                color: white;
-                background-color: #0984e3;
-                min-height: 20px;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background-color: #0773c5;
-            }
-            QPushButton[text="Cancel"] {
-                background-color: #636e72;
-            }
-            QPushButton[text="Cancel"]:hover {
-                background-color: #535c60;
-            }
-            QPushButton[text="Generate"] {
-                background-color: #00b894;
-                min-height: 25px;
-            }
-            QPushButton[text="Generate"]:hover {
-                background-color: #00a381;
-            }
-        """)
+    def setup_tag_completer(self):
+        # Completions come from the db's in-memory prefix index, so each keystroke
+        # is a bisection instead of a scan over every tag in the vault
+        self.tag_index = self.db.get_tag_index() if self.db else None
+        if self.tag_index is None:
+            return
+        self.tag_model = QStringListModel(self)
+        completer = QCompleter(self.tag_model, self)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.tags_input.setCompleter(completer)
+        self.tags_input.textEdited.connect(self.update_tag_completions)
+
+    def update_tag_completions(self, text: str):
+        # Only the tag after the last comma is completed; the rest is kept as typed
+        head, _, prefix = text.rpartition(',')
+        prefix = prefix.strip()
+        head = f"{head}, " if head else ""
+        entered = {tag.strip().casefold() for tag in head.split(',')}
+        suggestions = [head + tag for tag in self.tag_index.complete(prefix)
+                       if tag.casefold() not in entered] if prefix else []
+        self.tag_model.setStringList(suggestions)
+        if suggestions:
+            self.tags_input.completer().complete()
 
     def generate_password(self):
         password = self.password_gen.generate()
         self.password_input.setText(password)
         self.password_input.setEchoMode(QLineEdit.EchoMode.Normal)
 
+    def accept(self):
+        if self.totp_input.text().strip():
+            try:
+                Totp(self.totp_input.text())
+            except ValueError:
+                QMessageBox.warning(self, "Error", "The 2FA secret is not a valid base32 key or otpauth:// link!")
+                return
+        super().accept()
+
     def get_values(self):
         return {
             'website': self.website_input.text(),
             'username': self.username_input.text(),
             'password': self.password_input.text(),
             'category': self.category_input.currentText(),
-            'tags': self.tags_input.text()
+            'tags': self.tags_input.text(),
+            'totp': self.totp_input.text().strip()
         }
\ No newline at end of file
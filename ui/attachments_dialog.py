@@ -0,0 +1,141 @@
+import os
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QListWidget, QListWidgetItem, QPlainTextEdit, QFileDialog)
+from PySide6.QtCore import Qt
+from utils.async_calls import run_blocking, spawn
+
+def format_size(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+class AttachmentsDialog(QDialog):
+    """Secure note and attached files of one entry.
+
+    Files are encrypted and decrypted a chunk at a time on a worker thread
+    (see AttachmentStore), so large ones neither freeze the dialog nor have
+    to fit in memory.
+    """
+
+    def __init__(self, db, password_id: int, website: str, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.password_id = password_id
+        self.website = website
+        self.note = db.attachments.get_note(password_id) or ''
+        if self.note:
+            db.audit.record('view', password_id, 'Note')
+        self.busy = False
+        self.setup_ui()
+        self.load_files()
+
+    def setup_ui(self):
+        self.setWindowTitle(f"Notes & Attachments - {self.website}")
+        self.resize(460, 480)
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel("Secure note"))
+        self.note_input = QPlainTextEdit()
+        self.note_input.setPlainText(self.note)
+        layout.addWidget(self.note_input)
+
+        layout.addWidget(QLabel("Attachments"))
+        self.file_list = QListWidget()
+        self.file_list.itemDoubleClicked.connect(lambda item: self.save_file())
+        layout.addWidget(self.file_list)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        btn_layout = QHBoxLayout()
+        self.add_btn = QPushButton("Attach File...")
+        self.add_btn.setProperty("variant", "primary")
+        self.save_btn = QPushButton("Save As...")
+        self.save_btn.setProperty("variant", "neutral")
+        self.delete_btn = QPushButton("Delete")
+        self.delete_btn.setProperty("variant", "danger")
+        close_btn = QPushButton("Save & Close")
+        close_btn.setProperty("variant", "success")
+        btn_layout.addWidget(self.add_btn)
+        btn_layout.addWidget(self.save_btn)
+        btn_layout.addWidget(self.delete_btn)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        self.add_btn.clicked.connect(self.attach_file)
+        self.save_btn.clicked.connect(self.save_file)
+        self.delete_btn.clicked.connect(self.delete_file)
+        close_btn.clicked.connect(self.save_and_close)
+
+    def load_files(self):
+        self.file_list.clear()
+        for attachment_id, kind, name, size, _ in self.db.attachments.list_for(self.password_id):
+            if kind != 'file':
+                continue
+            item = QListWidgetItem(f"{name}  ({format_size(size)})")
+            item.setData(Qt.ItemDataRole.UserRole, (attachment_id, name))
+            self.file_list.addItem(item)
+
+    def set_busy(self, message: str = ''):
+        self.busy = bool(message)
+        for button in (self.add_btn, self.save_btn, self.delete_btn):
+            button.setEnabled(not self.busy)
+        self.status_label.setText(message)
+
+    def attach_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Attach File")
+        if path:
+            self.set_busy(f"Encrypting {os.path.basename(path)}...")
+            spawn(self.attach_file_async(path))
+
+    async def attach_file_async(self, path: str):
+        try:
+            await run_blocking(self.db.attachments.add_file, self.password_id, path)
+        except Exception as e:
+            print(f"Error attaching {path}: {e}")
+            self.set_busy()
+            self.status_label.setText(f"Could not attach the file: {e}")
+            return
+        self.db.audit.record('attach', self.password_id, os.path.basename(path))
+        self.set_busy()
+        self.load_files()
+
+    def save_file(self):
+        item = self.file_list.currentItem()
+        if item is None or self.busy:
+            return
+        attachment_id, name = item.data(Qt.ItemDataRole.UserRole)
+        path, _ = QFileDialog.getSaveFileName(self, "Save Attachment", name)
+        if path:
+            self.set_busy(f"Decrypting {name}...")
+            spawn(self.save_file_async(attachment_id, name, path))
+
+    async def save_file_async(self, attachment_id: int, name: str, path: str):
+        try:
+            await run_blocking(self.db.attachments.save, attachment_id, path)
+        except Exception as e:
+            print(f"Error saving attachment {attachment_id}: {e}")
+            self.set_busy()
+            self.status_label.setText(f"{name} is damaged or could not be written")
+            return
+        self.db.audit.record('view', self.password_id, name)
+        self.set_busy()
+        self.status_label.setText(f"Saved to {path}")
+
+    def delete_file(self):
+        item = self.file_list.currentItem()
+        if item is None or self.busy:
+            return
+        attachment_id, name = item.data(Qt.ItemDataRole.UserRole)
+        self.db.attachments.delete(attachment_id)
+        self.db.audit.record('detach', self.password_id, name)
+        self.load_files()
+
+    def save_and_close(self):
+        note = self.note_input.toPlainText()
+        if note != self.note:
+            self.db.attachments.set_note(self.password_id, note)
+            self.db.audit.record('update', self.password_id, 'Note')
+        self.accept()
\ No newline at end of file
@@ -0,0 +1,37 @@
+from PySide6.QtCore import QObject, QEvent, QTimer, Signal
+
+# Input that counts as the user being there
+ACTIVITY_EVENTS = frozenset({
+    QEvent.Type.KeyPress,
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.MouseMove,
+    QEvent.Type.Wheel,
+    QEvent.Type.TouchBegin,
+})
+
+class IdleLock(QObject):
+    """Emits `idle` once no input has reached the application for `auth.session_timeout`.
+
+    Installed as an application-wide event filter, so input to any window,
+    dialog or popup counts. The filter only stamps Auth.update_activity() and
+    never consumes an event; a timer asks Auth.is_session_valid().
+    """
+    idle = Signal()
+
+    def __init__(self, app, auth, check_interval: int = 5000, parent=None):
+        super().__init__(parent)
+        self.auth = auth
+        self.auth.update_activity()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.timer.start(check_interval)  # milliseconds
+        app.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() in ACTIVITY_EVENTS:
+            self.auth.update_activity()
+        return False
+
+    def check(self):
+        if not self.auth.is_session_valid():
+            self.idle.emit()
\ No newline at end of file
@@ -0,0 +1,54 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit,
+                             QPushButton, QLabel, QMessageBox)
+
+class ChangePasswordDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Change Master Password")
+        self.setFixedSize(400, 330)
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        layout.addWidget(QLabel("Current master password:"))
+        self.current_input = QLineEdit()
+        self.current_input.setEchoMode(QLineEdit.EchoMode.Password)
+        layout.addWidget(self.current_input)
+
+        layout.addWidget(QLabel("New master password:"))
+        self.new_input = QLineEdit()
+        self.new_input.setEchoMode(QLineEdit.EchoMode.Password)
+        layout.addWidget(self.new_input)
+
+        layout.addWidget(QLabel("Confirm new master password:"))
+        self.confirm_input = QLineEdit()
+        self.confirm_input.setEchoMode(QLineEdit.EchoMode.Password)
+        layout.addWidget(self.confirm_input)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        save_btn = QPushButton("Save")
+        save_btn.clicked.connect(self.validate_and_accept)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setProperty("variant", "neutral")
+        cancel_btn.clicked.connect(self.reject)
+
+        button_layout.addWidget(save_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+
+    def validate_and_accept(self):
+        if self.new_input.text() != self.confirm_input.text():
+            QMessageBox.warning(self, "Error", "Passwords do not match!")
+            return
+        if len(self.new_input.text()) < 8:
+            QMessageBox.warning(self, "Error", "Password must be at least 8 characters!")
+            return
+        self.accept()
+
+    def get_values(self):
+        return self.current_input.text(), self.new_input.text()
\ No newline at end of file
@@ -1,15 +1,16 @@
 from PySide6.QtWidgets import (QWidget, QPushButton, QVBoxLayout, QApplication)
 from PySide6.QtCore import Qt, QSize, Signal, QPoint
-from PySide6.QtGui import QIcon, QCursor
+from PySide6.QtGui import QIcon, QCursor, QKeySequence, QShortcut
 
 class FloatingWidget(QWidget):
     clicked = Signal()
+    quickSearchRequested = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint | Qt.WindowType.Tool)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.setStyleSheet("background: transparent;")
+        self.setObjectName("floatingIcon")
         self.setFixedSize(50, 50)
 
         layout = QVBoxLayout(self)
@@ -17,19 +18,16 @@ class FloatingWidget(QWidget):
 
         self.icon_button = QPushButton()
         self.icon_button.setFixedSize(50, 50)
-        self.icon_button.setStyleSheet("""
-            QPushButton {
-                background-color: rgba(45, 52, 54, 0.8);
-                border-radius: 25px;
-            }
-            QPushButton:hover {
-                background-color: rgba(9, 132, 227, 0.9);
-            }
-        """)
         self.icon_button.setIcon(QIcon("icon/logo.ico"))
         self.icon_button.setIconSize(QSize(30, 30))
+        self.icon_button.setToolTip("Quick search (Ctrl+Shift+Space)")
         self.icon_button.clicked.connect(self.on_clicked)
 
+        # Works while any SecurePass window has focus; Qt has no system-wide hotkeys
+        quick_search_shortcut = QShortcut(QKeySequence("Ctrl+Shift+Space"), self)
+        quick_search_shortcut.setContext(Qt.ShortcutContext.ApplicationShortcut)
+        quick_search_shortcut.activated.connect(self.quickSearchRequested)
+
         layout.addWidget(self.icon_button)
         self.move_to_edge()
 
@@ -39,7 +37,8 @@ class FloatingWidget(QWidget):
         self.is_dragging = False
 
     def on_clicked(self):
-        self.clicked.emit()
+        # The quick search popup has a button to bring back the main window
+        self.quickSearchRequested.emit()
 
     def move_to_edge(self):
         screen = QApplication.primaryScreen()
@@ -0,0 +1,86 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QFont, QPixmap
+
+class LockScreen(QWidget):
+    """Takes the place of the main window's contents while the session is locked.
+
+    Styled like the login card (see ui/theme.py); the table and toolbar it
+    replaces are kept as they are and come back on unlock.
+    """
+    unlockRequested = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        outer = QVBoxLayout(self)
+        outer.addStretch()
+
+        card = QWidget()
+        card.setObjectName("loginCard")
+        card.setFixedWidth(360)
+        layout = QVBoxLayout(card)
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        title_layout = QHBoxLayout()
+        title_layout.setSpacing(10)
+        title_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        icon_label = QLabel()
+        icon_label.setPixmap(QPixmap("icon/lock.png").scaled(24, 24, Qt.KeepAspectRatio,
+                                                              Qt.SmoothTransformation))
+        title_layout.addWidget(icon_label)
+        title = QLabel("Vault Locked")
+        title.setFont(QFont("Arial", 18, QFont.Weight.Bold))
+        title.setObjectName("loginTitle")
+        title_layout.addWidget(title)
+        layout.addLayout(title_layout)
+
+        self.password_input = QLineEdit()
+        self.password_input.setPlaceholderText("Enter master password")
+        self.password_input.setEchoMode(QLineEdit.EchoMode.Password)
+        self.password_input.returnPressed.connect(self.submit)
+        layout.addWidget(self.password_input)
+
+        self.status_label = QLabel()
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_label.setObjectName("loginStatus")
+        layout.addWidget(self.status_label)
+
+        self.unlock_button = QPushButton("Unlock")
+        self.unlock_button.setObjectName("loginButton")
+        self.unlock_button.setProperty("variant", "primary")
+        self.unlock_button.clicked.connect(self.submit)
+        layout.addWidget(self.unlock_button)
+
+        card_row = QHBoxLayout()
+        card_row.addStretch()
+        card_row.addWidget(card)
+        card_row.addStretch()
+        outer.addLayout(card_row)
+        outer.addStretch()
+        self.reset()
+
+    def reset(self):
+        self.password_input.clear()
+        self.password_input.setEnabled(True)
+        self.unlock_button.setEnabled(True)
+        self.status_label.setText("Locked after inactivity; enter your master password")
+
+    def submit(self):
+        password = self.password_input.text()
+        if not password or not self.unlock_button.isEnabled():
+            return
+        self.password_input.setEnabled(False)
+        self.unlock_button.setEnabled(False)
+        self.status_label.setText("Unlocking...")
+        self.unlockRequested.emit(password)
+
+    def show_error(self, message: str):
+        self.password_input.setEnabled(True)
+        self.unlock_button.setEnabled(True)
+        self.password_input.selectAll()
+        self.password_input.setFocus()
+        self.status_label.setText(message)
\ No newline at end of file
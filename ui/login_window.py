@@ -1,14 +1,17 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLineEdit, QPushButton, QLabel, QMessageBox)
+                             QLineEdit, QPushButton, QLabel, QMessageBox, QComboBox)
 from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QFont, QPixmap
-from utils.auth import Auth
+from database.vaults import VaultRegistry, DEFAULT_VAULT
 from ui.main_window import MainWindow
 
 class LoginWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.auth = Auth()
+        self.registry = VaultRegistry()
+        self.vault_name = DEFAULT_VAULT
+        self.auth = self.registry.auth(self.vault_name)
+        self.main_window = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -26,22 +29,9 @@ class LoginWindow(QMainWindow):
         # Set window transparency
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
 
-        # Style the central widget with proper background and borders
-        central_widget.setStyleSheet("""
-            QWidget#centralWidget {
-                background-color: white;
-                border: 2px solid #dfe6e9;
-                border-radius: 15px;
-            }
-        """)
-        central_widget.setObjectName("centralWidget")
-
-        # Remove the old main window style and replace with transparent background
-        self.setStyleSheet("""
-            QMainWindow {
-                background: transparent;
-            }
-        """)
+        # The card and the transparent window around it are styled in ui/theme.py
+        central_widget.setObjectName("loginCard")
+        self.setObjectName("loginWindow")
 
         layout = QVBoxLayout(central_widget)
         layout.setSpacing(15)  # Add spacing between widgets
@@ -52,18 +42,7 @@ class LoginWindow(QMainWindow):
         close_button = QPushButton("×")
         close_button.setFixedSize(30, 30)
         close_button.clicked.connect(self.close)
-        close_button.setStyleSheet("""
-            QPushButton {
-                background-color: #ff5f57;
-                border-radius: 15px;
-                color: white;
-                font-size: 20px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #ff3b36;
-            }
-        """)
+        close_button.setObjectName("closeButton")
         top_layout.addStretch()
         top_layout.addWidget(close_button)
         layout.addLayout(top_layout)
@@ -84,11 +63,21 @@ class LoginWindow(QMainWindow):
         title = QLabel("SecurePass Manager")
         title.setFont(QFont("Arial", 18, QFont.Weight.Bold))
         title.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        title.setStyleSheet("color: #2d3436;")
+        title.setObjectName("loginTitle")
         title_layout.addWidget(title)
 
         layout.addLayout(title_layout)
 
+        # Vault to unlock; only shown once there is more than one
+        self.vault_input = QComboBox()
+        self.vault_input.addItems(self.registry.names())
+        self.vault_input.currentTextChanged.connect(self.select_vault)
+        if len(self.registry.names()) > 1:
+            self.setFixedSize(400, 410)
+        else:
+            self.vault_input.hide()
+        layout.addWidget(self.vault_input)
+
         # Create password input field
         self.password_input = QLineEdit()
         self.password_input.setPlaceholderText("Enter master password")
@@ -103,50 +92,16 @@ class LoginWindow(QMainWindow):
         self.status_label = QLabel()
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-        # Style input fields with better colors and borders
-        input_style = """
-            QLineEdit {
-                padding: 12px;
-                border: 2px solid #dfe6e9;
-                border-radius: 8px;
-                background-color: #f5f6fa;
-                font-size: 14px;
-                color: #2d3436;
-            }
-            QLineEdit:focus {
-                border: 2px solid #0984e3;
-                background-color: white;
-            }
-            QLineEdit::placeholder {
-                color: #b2bec3;
-            }
-        """
-
-        self.password_input.setStyleSheet(input_style)
         layout.addWidget(self.password_input)
 
-        self.confirm_password.setStyleSheet(input_style)
         layout.addWidget(self.confirm_password)
 
-        # Style status label
-        self.status_label.setStyleSheet("color: #636e72; font-size: 13px;")
+        self.status_label.setObjectName("loginStatus")
         layout.addWidget(self.status_label)
 
-        # Style login button
         self.login_button = QPushButton("Login" if self.auth.has_master_password() else "Set Password")
-        self.login_button.setStyleSheet("""
-            QPushButton {
-                padding: 12px;
-                background-color: #0984e3;
-                color: white;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #0773c5;
-            }
-        """)
+        self.login_button.setObjectName("loginButton")
+        self.login_button.setProperty("variant", "primary")
         self.login_button.clicked.connect(self.handle_login)
         layout.addWidget(self.login_button)
 
@@ -169,6 +124,18 @@ class LoginWindow(QMainWindow):
             self.move(self.pos() + delta)
             self.oldPos = event.globalPos()
 
+    def activate(self, query: str = ''):
+        # Launched again before unlocking; the query has nothing to search yet
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        self.password_input.setFocus()
+
+    def select_vault(self, name: str):
+        self.vault_name = name
+        self.auth = self.registry.auth(name)
+        self.update_status()
+
     def update_status(self):
         if self.auth.has_master_password():
             self.status_label.setText("Enter your master password to unlock")
@@ -193,6 +160,8 @@ class LoginWindow(QMainWindow):
                 return
 
             self.auth.set_master_password(password)
+            self.password_input.clear()
+            self.confirm_password.clear()
             QMessageBox.information(self, "Success", "Master password set successfully!")
             self.update_status()
 
@@ -209,6 +178,8 @@ class LoginWindow(QMainWindow):
                 QMessageBox.warning(self, "Error", "Incorrect password!")
 
     def _create_main_window(self, password):
-        self.main_window = MainWindow(password)
+        self.main_window = MainWindow(password, self.vault_name)
+        # This window stays alive behind the main one; it must not keep the password
+        self.password_input.clear()
         self.main_window.show()
         self.close()
\ No newline at end of file
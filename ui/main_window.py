@@ -1,76 +1,108 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QTableWidget, QTableWidgetItem,
                              QLineEdit, QLabel, QDialog, QStatusBar, QComboBox,
-                             QHeaderView, QMenu, QApplication, QToolButton, QMessageBox, QListWidget, QFileDialog)
-from PySide6.QtCore import Qt, QSize, QProcess, QUrl, QEvent, QTimer, QThread, Signal
+                             QHeaderView, QMenu, QApplication, QToolButton, QMessageBox, QListWidget, QFileDialog,
+                             QInputDialog, QCheckBox)
+from PySide6.QtCore import Qt, QSize, QProcess, QUrl, QEvent, QTimer
 from PySide6.QtGui import QIcon, QFont, QAction, QKeySequence, QDesktopServices, QPixmap, QPixmapCache
-from database.db_manager import DatabaseManager
+from database.vaults import VaultRegistry, OpenVaults, DEFAULT_VAULT
+import os
 import sys
 from utils.password_generator import PasswordGenerator
 from utils.auth import Auth  # Fix: Changed from relative to absolute import
 from .add_password_dialog import AddPasswordDialog
 from .manage_categories_dialog import ManageCategoriesDialog
+from .change_password_dialog import ChangePasswordDialog
+from .merge_dialog import MergeDialog
+from .attachments_dialog import AttachmentsDialog
+from database.merge import plan_merge, entries_from_vault
 from import_export import ImportExportManager  # Import the new module
+from importers import import_file
 from .floating_icon import FloatingWidget  # Import the FloatingWidget
-
-class LoadPasswordsThread(QThread):
-    passwordsLoaded = Signal(list)
-
-    def __init__(self, db_manager):
-        super().__init__()
-        self.db_manager = db_manager
-
-    def run(self):
-        passwords = self.db_manager.get_all_passwords()
-        self.passwordsLoaded.emit(passwords)
+from .quick_search import QuickSearchPopup
+from .write_queue import WriteQueue
+from .auto_lock import IdleLock
+from .lock_screen import LockScreen
+from .totp_column import TotpColumn
+from .theme import apply_theme, current_theme
+from utils.async_calls import AsyncProxy, run_blocking, spawn
+
+# Rows per table page; each page is one indexed, sorted query
+PAGE_SIZE = 500
+# Table column -> the DatabaseManager sort key behind its header
+SORTABLE_COLUMNS = {0: 'website', 2: 'username', 6: 'category', 7: 'updated_at'}
+# Item data of a search result's website cell: the vault the row belongs to
+VAULT_ROLE = Qt.ItemDataRole.UserRole + 1
 
 class MainWindow(QMainWindow):
-    def __init__(self, master_password):
+    def __init__(self, master_password, vault: str = DEFAULT_VAULT):
         super().__init__()
         self.master_password = master_password
-        # Initialize database manager early
-        self.db = DatabaseManager(master_password)
+        # Several vaults can be unlocked at once; self.db is the one on screen
+        self.vaults = OpenVaults(VaultRegistry())
+        self.reencryption_jobs = {}
+        self.import_export_managers = {}
+        # The running load or search that will fill the table; a newer one cancels it
+        self.table_task = None
+        self.sort_key = 'updated_at'
+        self.sort_descending = True
+        self.page = 0
+        self.open_vault(vault, master_password)
+        self.vault_name = vault
+        self.db = self.vaults.get(vault)
+        self.reencryption = self.reencryption_jobs[vault]
 
         # Use QTimer to defer UI setup
         QTimer.singleShot(0, self.setup_ui)
 
         # Set window properties immediately
         self.setWindowTitle("SecurePass Manager by Santosh Bist")
+        self.setObjectName("mainWindow")
         self.setMinimumSize(800, 600)
 
         self.password_gen = PasswordGenerator()
         self.passwords = []  # Store password data
-        self.import_export_manager = ImportExportManager(master_password)  # Initialize ImportExportManager
-
-        # Predefine button styles
-        self.edit_button_style = """
-            QPushButton {
-                background-color: #00b894;
-                border-radius: 4px;
-                padding: 4px;
-                min-height: 15px;
-            }
-            QPushButton:hover {
-                background-color: #00a381;
-            }
-        """
-        self.delete_button_style = """
-            QPushButton {
-                background-color: #d63031;
-                border-radius: 4px;
-                padding: 4px;
-                min-height: 15px;
-            }
-            QPushButton:hover {
-                background-color: #c02627;
-            }
-        """
+        self.import_export_manager = self.import_export_managers[vault]
 
         # Create floating widget
         self.floating_widget = FloatingWidget(self)
         self.floating_widget.clicked.connect(self.restore_from_floating)
+        self.floating_widget.quickSearchRequested.connect(self.show_quick_search)
         self.floating_widget.hide()
 
+        self.quick_search = QuickSearchPopup(self)
+        self.quick_search.entryChosen.connect(lambda id: self.copy_secret(id, self.quick_search.db))
+        self.quick_search.openRequested.connect(self.restore_from_floating)
+
+        # Adds, edits and deletes are written in the background and shown right away
+        self.write_queue = WriteQueue(self)
+        self.write_queue.written.connect(self.on_writes_applied)
+        self.write_queue.failed.connect(self.on_write_failed)
+        # Copies are counted in memory and written with the other queued writes
+        QApplication.instance().aboutToQuit.connect(self.flush_usage)
+        QApplication.instance().aboutToQuit.connect(self.write_queue.stop)
+        self.usage_timer = QTimer(self)
+        self.usage_timer.timeout.connect(self.flush_usage)
+        self.usage_timer.start(30000)
+        # Audit events are buffered and written in batches; write out the rest on exit
+        QApplication.instance().aboutToQuit.connect(self.vaults.flush_audit_logs)
+
+        # Lock after auth.session_timeout without input. Keys and plaintexts are
+        # dropped; the window and its table wait behind the lock screen
+        self.locked = False
+        self.lock_screen = None
+        self.idle_lock = IdleLock(QApplication.instance(), self.db.auth, parent=self)
+        self.idle_lock.idle.connect(self.lock_session)
+
+        # Expire cached plaintexts on time even if nothing looks them up again
+        self.secret_purge_timer = QTimer(self)
+        self.secret_purge_timer.timeout.connect(self.vaults.purge_expired_secrets)
+        self.secret_purge_timer.start(5000)
+
+        self.reencryption_timer = QTimer(self)
+        self.reencryption_timer.timeout.connect(self.show_reencryption_progress)
+        self.reencryption_timer.start(1000)
+
     def setup_ui(self):
         self.setWindowTitle("SecurePass Manager")
         self.setMinimumSize(1000, 700)
@@ -82,26 +114,12 @@ class MainWindow(QMainWindow):
         layout.setSpacing(15)
         layout.setContentsMargins(20, 20, 20, 20)
 
-        # Apply dark theme
-        central_widget.setStyleSheet("""
-            QWidget {
-                background-color: #1e272e;
-                color: #ffffff;
-            }
-        """)
-
         # Top toolbar
         toolbar = QHBoxLayout()
 
         # Search section
         search_container = QWidget()
-        search_container.setStyleSheet("""
-            QWidget {
-                background-color: #2d3436;
-                border-radius: 8px;
-                padding: 5px;
-            }
-        """)
+        search_container.setObjectName("searchContainer")
         search_layout = QHBoxLayout(search_container)
         search_layout.setContentsMargins(10, 5, 10, 5)
 
@@ -110,128 +128,123 @@ class MainWindow(QMainWindow):
 
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search passwords...")
-        self.search_input.setStyleSheet("""
-            QLineEdit {
-                border: none;
-                background: transparent;
-                padding: 5px;
-                font-size: 14px;
-                min-width: 250px;
-                color: #ffffff;
-            }
-            QLineEdit::placeholder {
-                color: #b2bec3;
-            }
-        """)
+        self.search_input.setObjectName("searchInput")
         self.search_input.textChanged.connect(self.handle_search)
         search_layout.addWidget(self.search_input)
 
+        self.search_all_vaults = QCheckBox("All vaults")
+        self.search_all_vaults.setToolTip("Search every unlocked vault")
+        self.search_all_vaults.toggled.connect(lambda: self.handle_search(self.search_input.text()))
+        search_layout.addWidget(self.search_all_vaults)
+
         toolbar.addWidget(search_container)
 
+        # Vault switcher
+        self.vault_selector = QComboBox()
+        self.vault_selector.addItems(self.vaults.registry.names())
+        self.vault_selector.setCurrentText(self.vault_name)
+        self.vault_selector.setToolTip("Vault")
+        self.vault_selector.setObjectName("vaultSelector")
+        self.vault_selector.currentTextChanged.connect(self.switch_vault)
+        toolbar.addWidget(self.vault_selector)
+
+        add_vault_btn = QPushButton("➕")
+        add_vault_btn.setToolTip("New Vault")
+        add_vault_btn.setObjectName("addVaultButton")
+        add_vault_btn.setProperty("variant", "neutral")
+        add_vault_btn.clicked.connect(self.add_vault)
+        toolbar.addWidget(add_vault_btn)
+
         # Category filter
         self.category_filter = QComboBox()
-        self.category_filter.addItems(["All Categories"])
         self.load_categories()
-        self.category_filter.setStyleSheet("""
-            QComboBox {
-                padding: 8px;
-                border: 1px solid #485460;
-                border-radius: 6px;
-                min-width: 150px;
-                background-color: #2d3436;
-                color: white;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox::down-arrow {
-                image: none;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #2d3436;
-                color: white;
-                selection-background-color: #0984e3;
-            }
-        """)
-        self.category_filter.currentTextChanged.connect(self.filter_passwords)
+        self.category_filter.setObjectName("categoryFilter")
+        self.category_filter.currentIndexChanged.connect(self.filter_passwords)
         toolbar.addWidget(self.category_filter)
 
+        self.most_used_first = QCheckBox("Most used first")
+        self.most_used_first.setToolTip("Order by how often and how recently entries were copied")
+        self.most_used_first.toggled.connect(self.sort_by_usage)
+        toolbar.addWidget(self.most_used_first)
+
         toolbar.addStretch()
 
         # Add import and export buttons
         self.export_button = QPushButton("📤")  # Export icon
         self.export_button.setToolTip("Export Passwords")
         self.export_button.clicked.connect(self.export_passwords)
-        self.export_button.setStyleSheet("""
-            QPushButton {
-                padding: 10px 20px;
-                background-color: #3498db;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-        """)
+        self.export_button.setProperty("toolbar", True)
+        self.export_button.setProperty("variant", "info")
         toolbar.addWidget(self.export_button)
 
         self.import_button = QPushButton("📥")  # Import icon
-        self.import_button.setToolTip("Import Passwords")
-        self.import_button.clicked.connect(self.import_passwords)
-        self.import_button.setStyleSheet("""
-            QPushButton {
-                padding: 10px 20px;
-                background-color: #2ecc71;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #27ae60;
-            }
-        """)
+        self.import_button.setToolTip("Import or Merge Passwords")
+        import_menu = QMenu(self)
+        import_menu.addAction("Import Export File...", self.import_passwords)
+        import_menu.addAction("Merge From Vault...", self.merge_from_vault)
+        import_menu.addAction("Import From Other Password Manager...", self.import_foreign)
+        self.import_button.setMenu(import_menu)
+        self.import_button.setProperty("toolbar", True)
+        self.import_button.setProperty("variant", "import")
         toolbar.addWidget(self.import_button)
 
+        self.verify_button = QPushButton("🛡️")  # Shield icon
+        self.verify_button.setToolTip("Verify Vault Integrity")
+        self.verify_button.clicked.connect(self.verify_vault)
+        self.verify_button.setProperty("toolbar", True)
+        self.verify_button.setProperty("variant", "neutral")
+        toolbar.addWidget(self.verify_button)
+
+        self.backup_button = QPushButton("💾")  # Disk icon
+        self.backup_button.setToolTip("Back Up Vault")
+        backup_menu = QMenu(self)
+        backup_menu.addAction("Full Backup", lambda: self.backup_vault(incremental=False))
+        backup_menu.addAction("Incremental Backup", lambda: self.backup_vault(incremental=True))
+        self.backup_button.setMenu(backup_menu)
+        self.backup_button.setProperty("toolbar", True)
+        self.backup_button.setProperty("variant", "neutral")
+        toolbar.addWidget(self.backup_button)
+
         # Add manage categories button
         manage_cat_btn = QPushButton("Manage Categories")
-        manage_cat_btn.setStyleSheet("""
-            QPushButton {
-                padding: 10px 20px;
-                background-color: #00b894;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #00a381;
-            }
-        """)
+        manage_cat_btn.setProperty("toolbar", True)
+        manage_cat_btn.setProperty("variant", "success")
         manage_cat_btn.clicked.connect(self.show_categories_dialog)
         toolbar.addWidget(manage_cat_btn)
 
         # Add spacing between buttons
         toolbar.addSpacing(10)
 
+        # Add change master password button to toolbar
+        change_pass_btn = QPushButton("🔑")  # Key icon
+        change_pass_btn.setToolTip("Master Password and Vault Key")
+        change_pass_btn.setProperty("toolbar", True)
+        change_pass_btn.setProperty("variant", "neutral")
+        key_menu = QMenu(self)
+        key_menu.addAction("Change Master Password", self.change_master_password)
+        key_menu.addAction("Rotate Vault Key", self.rotate_vault_key)
+        key_menu.addAction("Lock Now", self.lock_session)
+        change_pass_btn.setMenu(key_menu)
+        toolbar.addWidget(change_pass_btn)
+
+        # Add spacing between buttons
+        toolbar.addSpacing(10)
+
+        theme_btn = QPushButton("🌓")
+        theme_btn.setToolTip("Switch Light/Dark Theme")
+        theme_btn.setProperty("toolbar", True)
+        theme_btn.setProperty("variant", "neutral")
+        theme_btn.clicked.connect(self.toggle_theme)
+        toolbar.addWidget(theme_btn)
+
+        # Add spacing between buttons
+        toolbar.addSpacing(10)
+
         # Add reset account button to toolbar
         reset_btn = QPushButton("🔄")  # Reset icon
         reset_btn.setToolTip("Reset Account")
-        reset_btn.setStyleSheet("""
-            QPushButton {
-                padding: 10px 20px;
-                background-color: #d63031;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #c02627;
-            }
-        """)
+        reset_btn.setProperty("toolbar", True)
+        reset_btn.setProperty("variant", "danger")
         reset_btn.clicked.connect(self.reset_account)
         toolbar.addWidget(reset_btn)
 
@@ -241,19 +254,8 @@ class MainWindow(QMainWindow):
         # Add button with icon
         add_btn = QPushButton("➕")  # Plus icon
         add_btn.setToolTip("Add New Password")
-        add_btn.setStyleSheet("""
-            QPushButton {
-                padding: 10px 20px;
-                background-color: #0984e3;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #0773c5;
-            }
-        """)
+        add_btn.setProperty("toolbar", True)
+        add_btn.setProperty("variant", "primary")
         add_btn.clicked.connect(self.show_add_dialog)
         toolbar.addWidget(add_btn)
 
@@ -265,9 +267,11 @@ class MainWindow(QMainWindow):
         self.password_table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)  # Disable selection
         self.password_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.password_table.customContextMenuRequested.connect(self.show_context_menu)
-        self.password_table.setColumnCount(9)  # Added one more column for actions
+        self.password_table.setColumnCount(10)  # Added one more column for actions
         self.password_table.setHorizontalHeaderLabels(
-            ["Website", "Copy", "Username", "Copy", "Password", "Copy", "Category", "Last Modified", "Actions"])
+            ["Website", "Copy", "Username", "Copy", "Password", "Copy", "Category", "Last Modified", "Actions",
+             "2FA"])
+        self.password_table.cellClicked.connect(self.copy_totp_code)
 
         # Add keyboard shortcuts
         copy_url_shortcut = QAction("Copy URL", self)
@@ -275,50 +279,6 @@ class MainWindow(QMainWindow):
         copy_url_shortcut.triggered.connect(lambda: self.copy_cell_content(0))
         self.addAction(copy_url_shortcut)
 
-        # Update table style to remove selection highlighting
-        self.password_table.setStyleSheet("""
-            QTableWidget {
-                background-color: #2d3436;
-                color: white;
-                gridline-color: #485460;
-                border: 1px solid #485460;
-                border-radius: 8px;
-            }
-            QHeaderView::section {
-                background-color: #1e272e;
-                color: white;
-                padding: 8px;
-                border: none;
-                font-weight: bold;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                color: white;
-                border: none;
-            }
-            QTableWidget::item:selected {
-                background-color: transparent;
-                color: white;
-            }
-            QTableWidget::item:focus {
-                background-color: transparent;
-                color: white;
-                border: none;
-            }
-            QPushButton {
-                background-color: #0984e3;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 8px;
-                font-size: 11px;
-                min-height: 15px;
-            }
-            QPushButton:hover {
-                background-color: #0773c5;
-            }
-        """)
-
         # Set row height
         self.password_table.verticalHeader().setDefaultSectionSize(40)
 
@@ -333,23 +293,45 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(6, QHeaderView.ResizeMode.Stretch)  # Category
         header.setSectionResizeMode(7, QHeaderView.ResizeMode.Stretch)  # Last Modified
         header.setSectionResizeMode(8, QHeaderView.ResizeMode.Fixed)    # Actions column
+        header.setSectionResizeMode(9, QHeaderView.ResizeMode.Fixed)    # 2FA code
+
+        # Header clicks sort in SQLite, never in the widget
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(7, Qt.SortOrder.DescendingOrder)
+        header.sectionClicked.connect(self.sort_by_column)
 
         # Set fixed width for copy button columns
         self.password_table.setColumnWidth(1, 60)
         self.password_table.setColumnWidth(3, 60)
         self.password_table.setColumnWidth(5, 60)
         self.password_table.setColumnWidth(8, 100)  # Width for actions column
+        self.password_table.setColumnWidth(9, 90)
+
+        # 2FA codes are computed for the rows on screen only, once per period
+        self.totp_column = TotpColumn(self.password_table, 9, lambda: self.db, self)
 
         layout.addWidget(self.password_table)
 
+        # Pager below the table
+        pager_layout = QHBoxLayout()
+        pager_layout.addStretch()
+        self.prev_page_button = QPushButton("◀")
+        self.prev_page_button.setToolTip("Previous page")
+        self.prev_page_button.setProperty("variant", "neutral")
+        self.prev_page_button.clicked.connect(lambda: self.change_page(-1))
+        pager_layout.addWidget(self.prev_page_button)
+        self.page_label = QLabel()
+        pager_layout.addWidget(self.page_label)
+        self.next_page_button = QPushButton("▶")
+        self.next_page_button.setToolTip("Next page")
+        self.next_page_button.setProperty("variant", "neutral")
+        self.next_page_button.clicked.connect(lambda: self.change_page(1))
+        pager_layout.addWidget(self.next_page_button)
+        layout.addLayout(pager_layout)
+
         # Add status bar
         self.status_bar = QStatusBar()
-        self.status_bar.setStyleSheet("""
-            QStatusBar {
-                background-color: #2d3436;
-                color: #b2bec3;
-            }
-        """)
         self.setStatusBar(self.status_bar)
 
         # Copyright label
@@ -357,35 +339,95 @@ class MainWindow(QMainWindow):
             '<a href="https://sbist.com.np" style="color:#b2bec3;">Open Source By Santosh Bist | Donate</a>'
         )
         self.copyright_label.setOpenExternalLinks(True)
-        self.copyright_label.setStyleSheet("QStatusBar::item {border: none;}")
         self.status_bar.addPermanentWidget(self.copyright_label)
 
         # Load passwords in a separate thread
         self.load_passwords()
 
-    def filter_passwords(self, category: str):
-        # Clear the table
-        self.password_table.setRowCount(0)
-
-        # Fetch all passwords first
-        all_passwords = self.db.get_all_passwords()
-
-        # Filter passwords based on category from fetched data
-        filtered_passwords = all_passwords
-        if category != "All Categories":
-            filtered_passwords = [p for p in all_passwords if p['category'] == category]
-
-        # Load the filtered passwords into the table
-        self.load_passwords_into_table(filtered_passwords)
+    def filter_passwords(self, index: int = None):
+        # Item data holds the real category name; the text carries the count
+        self.page = 0
+        self.write_queue.flush()
+        self.fill_table(self.load_passwords_async(self.category_filter.currentData()))
 
-        # Update status bar
-        self.status_bar.showMessage(f"Showing {len(filtered_passwords)} passwords for category: {category if category != 'All Categories' else 'All'}")
+    def sort_by_usage(self, enabled: bool):
+        header = self.password_table.horizontalHeader()
+        header.setSortIndicatorShown(not enabled)  # No column shows the score
+        self.sort_key = 'frecency' if enabled else 'updated_at'
+        self.sort_descending = True
+        if not enabled:
+            header.setSortIndicator(7, Qt.SortOrder.DescendingOrder)
+        self.page = 0
+        self.refresh_table()
+
+    def sort_by_column(self, column: int):
+        key = SORTABLE_COLUMNS.get(column)
+        if self.sort_key == 'frecency':
+            if key is None:
+                return
+            # Sorting by a column replaces the usage order
+            self.most_used_first.blockSignals(True)
+            self.most_used_first.setChecked(False)
+            self.most_used_first.blockSignals(False)
+            self.password_table.horizontalHeader().setSortIndicatorShown(True)
+            self.sort_key = None
+        if key == self.sort_key:
+            self.sort_descending = not self.sort_descending
+        elif key is not None:
+            self.sort_key = key
+            self.sort_descending = key == 'updated_at'  # Newest first, names A to Z
+        # The header flips its indicator on any click; put it back on the real sort column
+        sort_column = next(column for column, name in SORTABLE_COLUMNS.items() if name == self.sort_key)
+        self.password_table.horizontalHeader().setSortIndicator(
+            sort_column, Qt.SortOrder.DescendingOrder if self.sort_descending else Qt.SortOrder.AscendingOrder)
+        if key is not None:
+            self.page = 0
+            self.refresh_table()
+
+    def change_page(self, step: int):
+        self.page = max(0, self.page + step)
+        self.refresh_table()
+
+    def refresh_table(self):
+        """Reload what the table shows, the search results or the category, on the current page."""
+        query = self.search_input.text()
+        if query:
+            self.write_queue.flush()
+            self.fill_table(self.search_async(query))
+        else:
+            self.load_passwords()
 
+    def show_page(self, rows: list, paged: bool = True) -> list:
+        """Update the pager for a page fetched with one extra row, and return the page itself."""
+        has_next = paged and len(rows) > PAGE_SIZE
+        if paged:
+            rows = rows[:PAGE_SIZE]
+        first = self.page * PAGE_SIZE if paged else 0
+        self.page_label.setText(f"{first + 1}–{first + len(rows)}" if rows else "")
+        self.prev_page_button.setEnabled(paged and self.page > 0)
+        self.next_page_button.setEnabled(has_next)
+        return rows
 
     def load_passwords(self):
-        self.load_passwords_thread = LoadPasswordsThread(self.db)
-        self.load_passwords_thread.passwordsLoaded.connect(self.load_passwords_into_table)
-        self.load_passwords_thread.start()
+        self.write_queue.flush()  # The table should not come back without the latest edits
+        self.load_categories()  # Keep the counts in the filter current
+        self.fill_table(self.load_passwords_async(self.category_filter.currentData()))
+
+    def fill_table(self, coro):
+        if self.table_task is not None:
+            self.table_task.cancel()
+        self.table_task = spawn(coro)
+
+    async def load_passwords_async(self, category):
+        # Metadata only; passwords are decrypted one at a time when copied
+        passwords = await AsyncProxy(self.db).get_all_passwords(
+            category, include_passwords=False, sort=self.sort_key, descending=self.sort_descending,
+            limit=PAGE_SIZE + 1, offset=self.page * PAGE_SIZE)
+        if not passwords and self.page > 0:
+            # Deletes emptied this page; show the last one that still has rows
+            self.page -= 1
+            return await self.load_passwords_async(category)
+        self.load_passwords_into_table(self.show_page(passwords))
 
     def load_passwords_into_table(self, passwords):
         self.passwords = passwords
@@ -397,20 +439,20 @@ class MainWindow(QMainWindow):
                 self.password_table.insertRow(row)
 
                 # Website
-                website_item = QTableWidgetItem(password['website'])
-                website_item.setData(Qt.ItemDataRole.UserRole, password['id'])
+                website_item = QTableWidgetItem(password.website)
+                website_item.setData(Qt.ItemDataRole.UserRole, password.id)
                 self.password_table.setItem(row, 0, website_item)
 
                 # Add copy buttons
-                self.add_copy_button(row, 1, password['website'], "URL")
-                self.password_table.setItem(row, 2, QTableWidgetItem(password['username']))
-                self.add_copy_button(row, 3, password['username'], "Username")
-                self.password_table.setItem(row, 4, QTableWidgetItem('••••••••'))
-                self.add_copy_button(row, 5, password['password'], "Password")
+                self.add_copy_button(row, 1, password.website, "URL", password.id)
+                self.password_table.setItem(row, 2, QTableWidgetItem(password.username))
+                self.add_copy_button(row, 3, password.username, "Username", password.id)
+                self.set_password_cell(row, 4, password)
+                self.add_secret_copy_button(row, 5, password.id)
 
                 # Category and timestamp
-                self.password_table.setItem(row, 6, QTableWidgetItem(password['category']))
-                self.password_table.setItem(row, 7, QTableWidgetItem(password['updated_at']))
+                self.password_table.setItem(row, 6, QTableWidgetItem(password.category))
+                self.password_table.setItem(row, 7, QTableWidgetItem(password.updated_at))
 
                 # Add actions buttons
                 actions_widget = QWidget()
@@ -421,12 +463,12 @@ class MainWindow(QMainWindow):
                 edit_btn = QPushButton("✏️")
                 edit_btn.setToolTip("Edit")
                 edit_btn.clicked.connect(lambda checked, r=row: self.edit_password(r))
-                edit_btn.setStyleSheet(self.edit_button_style)
+                edit_btn.setProperty("variant", "success")
 
                 delete_btn = QPushButton("🗑️")
                 delete_btn.setToolTip("Delete")
                 delete_btn.clicked.connect(lambda checked, r=row: self.delete_password(r))
-                delete_btn.setStyleSheet(self.delete_button_style)
+                delete_btn.setProperty("variant", "danger")
 
                 actions_layout.addWidget(edit_btn)
                 actions_layout.addWidget(delete_btn)
@@ -442,31 +484,60 @@ class MainWindow(QMainWindow):
             self.load_passwords()
             return
 
-        # Search in database
-        results = self.db.search_passwords(query)
+        self.write_queue.flush()
+        self.page = 0
+        # Every keystroke starts a search; the one for the previous keystroke is dropped
+        self.fill_table(self.search_async(query))
+
+    async def search_async(self, query: str):
+        # Search in database, or in every unlocked vault at once
+        # Only single-vault text searches are sorted and paged by the database;
+        # the other two come back whole, in their own order
+        if self.search_all_vaults.isChecked():
+            results = self.show_page(await AsyncProxy(self.vaults).search(query), paged=False)
+        elif '://' in query:
+            # A pasted address finds the site's entries by domain rather than by substring
+            results = [(self.vault_name, password) for password in
+                       self.show_page(await AsyncProxy(self.db).find_for_url(query), paged=False)]
+        else:
+            passwords = await AsyncProxy(self.db).search_passwords(
+                query, include_passwords=False, sort=self.sort_key, descending=self.sort_descending,
+                limit=PAGE_SIZE + 1, offset=self.page * PAGE_SIZE)
+            if not passwords and self.page > 0:
+                self.page -= 1
+                return await self.search_async(query)
+            results = [(self.vault_name, password) for password in self.show_page(passwords)]
 
         # Clear current table
         self.password_table.setRowCount(0)
 
         # Show search results
         if results:
-            for password in results:
+            for vault_name, password in results:
                 row = self.password_table.rowCount()
                 self.password_table.insertRow(row)
+                db = self.vaults.get(vault_name)
 
                 # Website with ID
-                website_item = QTableWidgetItem(password['website'])
-                website_item.setData(Qt.ItemDataRole.UserRole, password['id'])
+                website = password.website
+                if vault_name != self.vault_name:
+                    website = f"{website}  [{vault_name}]"
+                website_item = QTableWidgetItem(website)
+                website_item.setData(Qt.ItemDataRole.UserRole, password.id)
+                website_item.setData(VAULT_ROLE, vault_name)
                 self.password_table.setItem(row, 0, website_item)
 
                 # Add copy buttons and other fields
-                self.add_copy_button(row, 1, password['website'], "URL")
-                self.password_table.setItem(row, 2, QTableWidgetItem(password['username']))
-                self.add_copy_button(row, 3, password['username'], "Username")
-                self.password_table.setItem(row, 4, QTableWidgetItem('••••••••'))
-                self.add_copy_button(row, 5, password['password'], "Password")
-                self.password_table.setItem(row, 6, QTableWidgetItem(password['category']))
-                self.password_table.setItem(row, 7, QTableWidgetItem(password['updated_at']))
+                self.add_copy_button(row, 1, password.website, "URL", password.id, db)
+                self.password_table.setItem(row, 2, QTableWidgetItem(password.username))
+                self.add_copy_button(row, 3, password.username, "Username", password.id, db)
+                self.set_password_cell(row, 4, password)
+                self.add_secret_copy_button(row, 5, password.id, db)
+                self.password_table.setItem(row, 6, QTableWidgetItem(password.category))
+                self.password_table.setItem(row, 7, QTableWidgetItem(password.updated_at))
+
+                if db is not self.db:
+                    continue  # Entries of other vaults are edited after switching to them
 
                 # Add action buttons
                 actions_widget = QWidget()
@@ -478,13 +549,13 @@ class MainWindow(QMainWindow):
                 edit_btn = QPushButton("✏️")
                 edit_btn.setToolTip("Edit")
                 edit_btn.clicked.connect(lambda checked, r=row: self.edit_password(r))
-                edit_btn.setStyleSheet(self.edit_button_style)
+                edit_btn.setProperty("variant", "success")
 
                 # Delete button
                 delete_btn = QPushButton("🗑️")
                 delete_btn.setToolTip("Delete")
                 delete_btn.clicked.connect(lambda checked, r=row: self.delete_password(r))
-                delete_btn.setStyleSheet(self.delete_button_style)
+                delete_btn.setProperty("variant", "danger")
 
                 actions_layout.addWidget(edit_btn)
                 actions_layout.addWidget(delete_btn)
@@ -501,90 +572,193 @@ class MainWindow(QMainWindow):
         dialog = AddPasswordDialog(parent=self, categories=categories) # Pass self (MainWindow) as parent and categories
         if dialog.exec() == QDialog.DialogCode.Accepted:
             values = dialog.get_values()
-            self.db.add_password(
+            self.write_queue.add(
+                self.db,
                 website=values['website'],
                 username=values['username'],
                 password=values['password'],
                 category=values['category'],
-                tags=values['tags']
+                tags=values['tags'],
+                totp=values['totp'] or None
             )
-            self.load_passwords()  # Refresh the table
+            # Shown at the bottom until the write lands and the table reloads;
+            # inserting above would shift the rows the table's buttons point at
+            row = self.password_table.rowCount()
+            self.password_table.insertRow(row)
+            self.password_table.setItem(row, 0, QTableWidgetItem(values['website']))
+            self.password_table.setItem(row, 2, QTableWidgetItem(values['username']))
+            self.password_table.setItem(row, 6, QTableWidgetItem(values['category']))
+            self.password_table.setItem(row, 7, QTableWidgetItem("Saving..."))
+            self.password_table.scrollToBottom()
 
     def show_context_menu(self, position):
         menu = QMenu()
         copy_action = QAction("Copy Password", self)
         copy_action.triggered.connect(self.copy_password)
         menu.addAction(copy_action)
+        attachments_action = QAction("Notes && Attachments...", self)
+        attachments_action.triggered.connect(self.show_attachments)
+        menu.addAction(attachments_action)
+        history_action = QAction("Show History", self)
+        history_action.triggered.connect(self.show_history)
+        menu.addAction(history_action)
 
         global_pos = self.password_table.mapToGlobal(position)
         menu.exec(global_pos)
 
+    def row_db(self, row: int):
+        """The DatabaseManager of the vault `row` came from; None if that vault has been closed."""
+        vault_name = self.password_table.item(row, 0).data(VAULT_ROLE)
+        return self.db if vault_name is None else self.vaults.get(vault_name)
+
     def copy_password(self):
         current_row = self.password_table.currentRow()
         if current_row >= 0:
             password_id = self.password_table.item(current_row, 0).data(Qt.ItemDataRole.UserRole)
-            # Get the actual password from database
-            password_data = self.db.get_password(password_id)
-            if password_data:
-                # Copy to clipboard
-                QApplication.clipboard().setText(password_data['password'])
-                self.status_bar.showMessage("Password copied to clipboard", 2000)
-
-    def add_copy_button(self, row: int, column: int, content: str, label: str):
+            db = self.row_db(current_row)
+            if password_id is not None and db is not None:
+                self.copy_secret(password_id, db)
+
+    def show_attachments(self):
+        current_row = self.password_table.currentRow()
+        if current_row < 0:
+            return
+        item = self.password_table.item(current_row, 0)
+        password_id = item.data(Qt.ItemDataRole.UserRole)
+        if password_id is None or self.password_table.cellWidget(current_row, 8) is None:
+            return  # Still being saved, or an entry of another vault
+        AttachmentsDialog(self.db, password_id, item.text(), self).exec()
+
+    def show_history(self):
+        current_row = self.password_table.currentRow()
+        if current_row < 0:
+            return
+        item = self.password_table.item(current_row, 0)
+        password_id = item.data(Qt.ItemDataRole.UserRole)
+        db = self.row_db(current_row)
+        if password_id is None or db is None:
+            return
+        events = db.get_audit_events(password_id=password_id, limit=50)
+        lines = [f"{created_at[:19].replace('T', ' ')}  {action}{f' ({detail})' if detail else ''}"
+                 f"  by {actor}" for created_at, actor, action, _, detail in events]
+        QMessageBox.information(self, f"History of {item.text()}",
+                                "\n".join(lines) or "No recorded events.")
+
+    def add_copy_button(self, row: int, column: int, content: str, label: str,
+                        password_id: int = None, db=None):
         btn = QPushButton("Copy")
-        btn.clicked.connect(lambda: self.copy_to_clipboard(content, label))
+        btn.clicked.connect(lambda: self.copy_to_clipboard(content, label, password_id, db))
         self.password_table.setCellWidget(row, column, btn)
 
-    def copy_to_clipboard(self, content: str, label: str):
+    def set_password_cell(self, row: int, column: int, password):
+        if password.corrupt:
+            # Flag the entry instead of failing the whole table
+            item = QTableWidgetItem('⚠ Corrupted')
+            item.setToolTip("This password could not be decrypted")
+        else:
+            item = QTableWidgetItem('••••••••')
+        self.password_table.setItem(row, column, item)
+
+    def add_secret_copy_button(self, row: int, column: int, password_id: int, db=None):
+        # The button only knows the id, so no plaintext lives in the table
+        btn = QPushButton("Copy")
+        btn.clicked.connect(lambda: self.copy_secret(password_id, db))
+        self.password_table.setCellWidget(row, column, btn)
+
+    def copy_secret(self, password_id: int, db=None):
+        db = db or self.db
+        self.write_queue.flush()  # A password edited a moment ago may still be queued
+        password = db.get_secret(password_id)
+        if password is not None:
+            self.copy_to_clipboard(password, "Password", password_id, db)
+        elif password_id in db.corrupt_ids:
+            self.status_bar.showMessage("This password is corrupted and cannot be copied", 5000)
+
+    def copy_to_clipboard(self, content: str, label: str, password_id: int = None, db=None):
         QApplication.clipboard().setText(content)
+        if password_id is not None:
+            (db or self.db).audit.record('copy', password_id, label)
+            (db or self.db).usage.record(password_id)
         self.status_bar.showMessage(f"{label} copied to clipboard", 2000)
 
+    def copy_totp_code(self, row: int, column: int):
+        if column != 9:
+            return
+        code = self.totp_column.code(row)
+        if code:
+            password_id = self.password_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+            self.copy_to_clipboard(code, "2FA code", password_id)
+
     def copy_cell_content(self, column: int):
         current_row = self.password_table.currentRow()
         if current_row >= 0:
+            password_id = self.password_table.item(current_row, 0).data(Qt.ItemDataRole.UserRole)
+            db = self.row_db(current_row)
+            if password_id is None or db is None:
+                return
             if column == 0:  # Website
                 content = self.password_table.item(current_row, 0).text()
-                self.copy_to_clipboard(content, "URL")
+                self.copy_to_clipboard(content, "URL", password_id, db)
             elif column == 2:  # Username
                 content = self.password_table.item(current_row, 2).text()
-                self.copy_to_clipboard(content, "Username")
+                self.copy_to_clipboard(content, "Username", password_id, db)
             elif column == 4:  # Password
-                password_id = self.password_table.item(current_row, 0).data(Qt.ItemDataRole.UserRole)
-                password_data = self.db.get_password(password_id)
-                if password_data:
-                    self.copy_to_clipboard(password_data['password'], "Password")
+                self.copy_secret(password_id, db)
 
     def edit_password(self, row: int):
         password_id = self.password_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+        self.write_queue.flush()
         password_data = self.db.get_password(password_id)
         if password_data:
             dialog = AddPasswordDialog(parent=self, categories=self.db.get_all_categories())  # pass parent and categories
-            dialog.website_input.setText(password_data['website'])
-            dialog.username_input.setText(password_data['username'])
-            dialog.password_input.setText(password_data['password'])
+            dialog.website_input.setText(password_data.website)
+            dialog.username_input.setText(password_data.username)
+            secret = self.db.get_secret(password_id)
+            dialog.password_input.setText(secret)
+            self.db.audit.record('view', password_id, 'Password')
 
             # Set the category by finding the index
-            category_index = dialog.category_input.findText(password_data['category'])
+            category_index = dialog.category_input.findText(password_data.category)
             if category_index != -1:
                 dialog.category_input.setCurrentIndex(category_index)
             else:
                 # If category not found, add it and set as current
-                dialog.category_input.addItem(password_data['category'])
-                dialog.category_input.setCurrentText(password_data['category'])
+                dialog.category_input.addItem(password_data.category)
+                dialog.category_input.setCurrentText(password_data.category)
 
-            dialog.tags_input.setText(password_data['tags'] or '')
+            dialog.tags_input.setText(password_data.tags or '')
+            # A damaged secret shows up empty and is only replaced if a new one is typed in
+            totp = (self.db.attachments.read_small([password_id], 'totp').get(password_id) or b'').decode('utf-8')
+            if totp:
+                dialog.totp_input.setText(totp)
+                self.db.audit.record('view', password_id, '2FA secret')
 
             if dialog.exec() == QDialog.DialogCode.Accepted:
                 values = dialog.get_values()
-                self.db.update_password(
+                # Which fields changed is audited, never their values
+                before = {'website': password_data.website, 'username': password_data.username,
+                          'password': secret, 'category': password_data.category,
+                          'tags': password_data.tags or '', 'totp': totp}
+                changed = [field for field, value in before.items() if values[field] != value]
+                self.db.audit.record('update', password_id, ', '.join(changed))
+                extra = {'totp': values['totp']} if 'totp' in changed else {}
+                self.write_queue.update(
+                    self.db,
                     password_id,
                     website=values['website'],
                     username=values['username'],
                     password=values['password'],
                     category=values['category'],
-                    tags=values['tags']
+                    tags=values['tags'],
+                    **extra
                 )
-                self.load_passwords()
+                # Update the row in place instead of reloading the table
+                self.password_table.item(row, 0).setText(values['website'])
+                self.add_copy_button(row, 1, values['website'], "URL", password_id)
+                self.password_table.item(row, 2).setText(values['username'])
+                self.add_copy_button(row, 3, values['username'], "Username", password_id)
+                self.password_table.setItem(row, 6, QTableWidgetItem(values['category']))
+                self.password_table.setItem(row, 7, QTableWidgetItem("Saving..."))
 
     def delete_password(self, row: int):
         password_id = self.password_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
@@ -598,10 +772,51 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            self.db.delete_password(password_id)
-            self.load_passwords()
+            self.write_queue.delete(self.db, password_id)
+            self.db.audit.record('delete', password_id, website)
+            # Hidden rather than removed, so the rows below keep their numbers
+            self.password_table.setRowHidden(row, True)
             self.status_bar.showMessage(f"Deleted password for {website}")
 
+    def flush_usage(self):
+        for name in self.vaults.names():
+            db = self.vaults.get(name)
+            if db.usage:
+                self.write_queue.flush_usage(db)
+
+    def on_writes_applied(self, mutations: list):
+        mutations = [mutation for mutation in mutations if mutation.kind != 'usage']
+        for mutation in mutations:
+            if mutation.kind == 'add':
+                mutation.db.audit.record('add', mutation.password_id, mutation.values.get('website'))
+        mutations = [mutation for mutation in mutations if mutation.db is self.db]
+        if not mutations:
+            return
+        if any(mutation.kind == 'add' for mutation in mutations):
+            self.load_passwords()  # New rows need their ids and buttons
+            self.status_bar.showMessage("Password saved", 3000)
+            return
+        self.load_categories()  # Counts may have moved
+        updated = {mutation.password_id for mutation in mutations if mutation.kind == 'update'}
+        if not updated:
+            return
+        for password_id in updated:
+            self.totp_column.invalidate(password_id)  # The 2FA secret may have changed
+        records = {record.id: record for record in self.db.get_records(list(updated))}
+        for row in range(self.password_table.rowCount()):
+            item = self.password_table.item(row, 0)
+            record = records.get(item.data(Qt.ItemDataRole.UserRole)) if item else None
+            if record is not None:
+                self.password_table.setItem(row, 7, QTableWidgetItem(record.updated_at))
+        self.status_bar.showMessage("Changes saved", 3000)
+
+    def on_write_failed(self, mutation, error: str):
+        if mutation.kind == 'usage':
+            return  # The counts are kept and written with the next flush
+        QMessageBox.warning(self, "Error", f"Could not save changes: {error}")
+        if mutation.db is self.db:
+            self.load_passwords()  # Drop the change shown ahead of the write
+
     def reset_account(self):
         reply = QMessageBox.warning(
             self,
@@ -627,9 +842,10 @@ class MainWindow(QMainWindow):
             )
 
             if confirm == QMessageBox.StandardButton.Yes:
+                self.write_queue.flush()
                 self.db.reset_database()
-                self.auth = Auth()
-                self.auth.reset_master_password()
+                self.db.audit.record('reset')
+                self.db.auth.reset_master_password()
 
                 QMessageBox.information(
                     self,
@@ -642,74 +858,428 @@ class MainWindow(QMainWindow):
                 QApplication.quit()
                 QProcess.startDetached(sys.executable, sys.argv)
 
-    def show_categories_dialog(self):
-        # Get current categories from combobox
-        current_categories = [self.category_filter.itemText(i)
-                            for i in range(self.category_filter.count())
-                            if self.category_filter.itemText(i) != "All Categories"]
+    def change_master_password(self):
+        dialog = ChangePasswordDialog(self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            current, new = dialog.get_values()
+            # Only the wrapped data key in config.json is rewritten; rows stay as they are
+            if self.db.auth.change_master_password(current, new):
+                self.master_password = new
+                self.import_export_manager = ImportExportManager(new)
+                self.import_export_managers[self.vault_name] = self.import_export_manager
+                self.status_bar.showMessage("Master password changed", 5000)
+            else:
+                QMessageBox.warning(self, "Error", "Current master password is incorrect!")
+
+    def open_vault(self, name: str, master_password: str):
+        """Unlock a vault; raises ValueError on a wrong master password."""
+        db = self.vaults.unlock(name, master_password)
+        # Finish any interrupted key rotation and move rows still in the old
+        # Fernet format over, in the background
+        self.reencryption_jobs[name] = db.start_reencryption()
+        self.import_export_managers[name] = ImportExportManager(master_password)
+        # Have the quick search index ready before the floating icon is used
+        spawn(run_blocking(db.get_search_index))
+        return db
+
+    def lock_session(self):
+        """Drop every key and decrypted secret, keeping the window as it is behind the lock screen."""
+        if self.locked or self.centralWidget() is None:
+            return
+        for job in (getattr(self, 'backup_job', None), getattr(self, 'scrubber', None)):
+            if job is not None and job.is_alive():
+                return  # It reads with the vault key; the next idle check locks once it is done
+        # An open dialog may show a password
+        for widget in QApplication.topLevelWidgets():
+            if isinstance(widget, QDialog) and widget.isVisible():
+                widget.reject()
+        self.quick_search.hide()
+        self.flush_usage()
+        self.write_queue.flush()
+        self.resume_reencryption = self.reencryption.is_alive()
+        self.reencryption_timer.stop()
+        for job in self.reencryption_jobs.values():
+            job.stop()  # Resumed from its checkpoint after unlocking
+            job.join()
+        # Other vaults have their own master passwords and are unlocked again when switched to
+        self.closed_other_vaults = False
+        for name in self.vaults.names():
+            if name != self.vault_name:
+                self.vaults.lock(name)
+                self.reencryption_jobs.pop(name, None)
+                self.closed_other_vaults = True
+        self.db.audit.record('lock')
+        self.vaults.flush_audit_logs()
+        self.db.lock()
+        self.totp_column.invalidate()
+        self.master_password = None
+        self.import_export_managers.clear()
+        self.import_export_manager = None
+        self.locked = True
+
+        if self.lock_screen is None:
+            self.lock_screen = LockScreen()
+            self.lock_screen.unlockRequested.connect(lambda password: spawn(self.unlock_session(password)))
+        self.main_panel = self.takeCentralWidget()
+        self.setCentralWidget(self.lock_screen)
+        self.lock_screen.reset()
+        self.lock_screen.password_input.setFocus()
+        self.status_bar.clearMessage()
+
+    async def unlock_session(self, password: str):
+        try:
+            # Only the key-encryption key is derived again; the window, table,
+            # connection and search index are all still there
+            await run_blocking(self.db.unlock, password)
+        except ValueError:
+            self.db.audit.record('unlock_failed')
+            self.lock_screen.show_error("Incorrect master password")
+            return
+        self.master_password = password
+        self.import_export_manager = ImportExportManager(password)
+        self.import_export_managers[self.vault_name] = self.import_export_manager
+        if self.resume_reencryption:
+            self.reencryption = self.reencryption_jobs[self.vault_name] = self.db.start_reencryption()
+            self.reencryption_timer.start(1000)
+        self.db.audit.record('unlock')
+        self.idle_lock.auth.update_activity()
+        self.locked = False
+
+        self.lock_screen.reset()  # Kept for next time, without the password
+        self.takeCentralWidget()
+        self.setCentralWidget(self.main_panel)
+        self.main_panel = None
+        self.totp_column.invalidate()
+        if self.closed_other_vaults and self.search_all_vaults.isChecked():
+            self.handle_search(self.search_input.text())  # Drop rows of the vaults just closed
+        self.status_bar.showMessage("Unlocked", 2000)
+
+    def switch_vault(self, name: str):
+        if name == self.vault_name:
+            return
+        if self.vaults.get(name) is None and not self.prompt_unlock(name):
+            # Stay on the current vault
+            self.vault_selector.blockSignals(True)
+            self.vault_selector.setCurrentText(self.vault_name)
+            self.vault_selector.blockSignals(False)
+            return
+
+        self.vault_name = name
+        self.db = self.vaults.get(name)
+        self.reencryption = self.reencryption_jobs[name]
+        self.import_export_manager = self.import_export_managers[name]
+        self.totp_column.invalidate()  # Ids are only unique within a vault
+        self.load_passwords()
+        self.status_bar.showMessage(f"Switched to vault {name}", 3000)
+
+    def prompt_unlock(self, name: str) -> bool:
+        password, ok = QInputDialog.getText(self, "Unlock Vault", f"Master password for {name}:",
+                                            QLineEdit.EchoMode.Password)
+        if not ok:
+            return False
+        try:
+            self.open_vault(name, password)
+        except ValueError:
+            QMessageBox.warning(self, "Error", "Incorrect master password!")
+            return False
+        return True
+
+    def add_vault(self):
+        name, ok = QInputDialog.getText(self, "New Vault", "Vault name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name in self.vaults.registry.names():
+            QMessageBox.warning(self, "Error", f"A vault named '{name}' already exists!")
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Folder for the new vault")
+        if not directory:
+            return
+        if any(os.path.exists(os.path.join(directory, file)) for file in ('config.json', 'passwords.db')):
+            QMessageBox.warning(self, "Error", "This folder already holds a vault. Choose an empty folder!")
+            return
+        password, ok = QInputDialog.getText(self, "New Vault", f"Master password for {name}:",
+                                            QLineEdit.EchoMode.Password)
+        if not ok:
+            return
+        confirm, ok = QInputDialog.getText(self, "New Vault", "Confirm master password:",
+                                           QLineEdit.EchoMode.Password)
+        if not ok:
+            return
+        if password != confirm:
+            QMessageBox.warning(self, "Error", "Passwords do not match!")
+            return
+        if len(password) < 8:
+            QMessageBox.warning(self, "Error", "Password must be at least 8 characters!")
+            return
+
+        try:
+            self.vaults.registry.add(name, directory)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        self.vaults.registry.auth(name).set_master_password(password)
+        self.open_vault(name, password)
+        self.vault_selector.addItem(name)
+        self.vault_selector.setCurrentText(name)
+
+    def rotate_vault_key(self):
+        if self.reencryption.is_alive():
+            QMessageBox.information(self, "Rotate Vault Key", "A re-encryption is already running.")
+            return
+        password, ok = QInputDialog.getText(self, "Rotate Vault Key",
+                                            "Master password:", QLineEdit.EchoMode.Password)
+        if not ok:
+            return
+        if not self.db.auth.verify_password(password):
+            QMessageBox.warning(self, "Error", "Incorrect master password!")
+            return
+        # New entries use the new key right away; existing ones follow in the background
+        self.write_queue.flush()
+        self.reencryption = self.db.rotate_key(password)
+        self.reencryption_jobs[self.vault_name] = self.reencryption
+        self.reencryption_timer.start(1000)
+
+    def show_reencryption_progress(self):
+        progress = self.reencryption.progress()
+        if progress['done']:
+            self.reencryption_timer.stop()
+            if progress['failed']:
+                self.status_bar.showMessage(
+                    f"Re-encryption finished; {progress['failed']} entries or attachments could not be decrypted")
+            elif progress['total']:
+                self.status_bar.showMessage("Re-encryption finished", 5000)
+        elif progress['total'] and hasattr(self, 'status_bar'):
+            self.status_bar.showMessage(
+                f"Re-encrypting entries: {progress['reencrypted']}/{progress['total']} "
+                f"({progress['rows_per_second']:.0f}/s)")
+
+    def verify_vault(self):
+        self.verify_button.setEnabled(False)
+        self.scrubber = self.db.verify_integrity()
+        self.scrub_timer = QTimer(self)
+        self.scrub_timer.timeout.connect(self.show_scrub_progress)
+        self.scrub_timer.start(500)
+
+    def show_scrub_progress(self):
+        progress = self.scrubber.progress()
+        if not progress['done']:
+            self.status_bar.showMessage(
+                f"Verifying vault: {progress['checked']}/{progress['total']} "
+                f"({progress['rows_per_second']:.0f}/s)")
+            return
+
+        self.scrub_timer.stop()
+        self.verify_button.setEnabled(True)
+        if not progress['corrupt'] and not progress['problems']:
+            self.status_bar.showMessage(f"Vault verified: {progress['total']} entries intact", 5000)
+            return
+        details = [f"{progress['corrupt']} entries could not be decrypted."]
+        if self.scrubber.corrupt_ids:
+            details.append("Ids: " + ", ".join(str(i) for i in sorted(self.scrubber.corrupt_ids)[:50]))
+        details.extend(self.scrubber.problems[:10])
+        QMessageBox.warning(self, "Vault Integrity", "\n".join(details))
+        self.load_passwords()  # Show the flags
+
+    def backup_vault(self, incremental: bool):
+        # The snapshot is copied a few pages at a time in the background; the table stays usable
+        self.backup_button.setEnabled(False)
+        self.backup_job = self.db.start_backup(incremental=incremental)
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(self.show_backup_progress)
+        self.backup_timer.start(250)
+
+    def show_backup_progress(self):
+        progress = self.backup_job.progress()
+        if not progress['done']:
+            if progress['total']:
+                self.status_bar.showMessage(
+                    f"Backing up vault ({progress['kind']}): {progress['copied']}/{progress['total']}")
+            return
+
+        self.backup_timer.stop()
+        self.backup_button.setEnabled(True)
+        if progress['error']:
+            QMessageBox.critical(self, "Error", f"Backup failed: {progress['error']}")
+        else:
+            self.status_bar.showMessage(
+                f"{progress['kind'].capitalize()} backup saved to {progress['path']} "
+                f"({progress['size'] / 1024:.0f} KiB in {progress['seconds']:.1f} s)", 5000)
 
-        dialog = ManageCategoriesDialog(self, current_categories)
+    def show_categories_dialog(self):
+        self.write_queue.flush()
+        dialog = ManageCategoriesDialog(self, list(self.db.get_all_categories()))
         dialog.categoriesChanged.connect(self.update_categories)
         dialog.exec()
 
     def update_categories(self, new_categories):
         # Update category filter combobox
-        self.category_filter.clear()
-        self.category_filter.addItem("All Categories")
-        self.category_filter.addItems(new_categories)
+        self.load_categories()
 
         # Refresh the table to show updated categories and filter
-        current_category_filter = self.category_filter.currentText()
-        self.filter_passwords(current_category_filter) # Re-apply the current filter, or "All Categories" if none selected
+        self.filter_passwords() # Re-apply the current filter, or "All Categories" if none selected
 
     def load_categories(self):
-        categories = self.db.get_all_categories()
-        self.category_filter.addItems(categories)
+        """Fill the category filter with live per-category counts."""
+        selected = self.category_filter.currentData()
+        counts = self.db.get_category_counts()
+
+        self.category_filter.blockSignals(True)
+        self.category_filter.clear()
+        self.category_filter.addItem(f"All Categories ({sum(count for _, count in counts)})", None)
+        for category, count in counts:
+            if category is None:
+                self.category_filter.addItem(f"Uncategorized ({count})", "")
+            else:
+                self.category_filter.addItem(f"{category} ({count})", category)
+
+        index = self.category_filter.findData(selected)
+        self.category_filter.setCurrentIndex(max(index, 0))
+        self.category_filter.blockSignals(False)
 
     def export_passwords(self):
         file_dialog = QFileDialog()
         filename, _ = file_dialog.getSaveFileName(self, "Export Passwords", "", "Encrypted Files (*.enc)")
         if filename:
-            # Fetch all passwords from the database
-            passwords = self.db.get_all_passwords()
-
-            # Export the passwords using the ImportExportManager
-            if self.import_export_manager.export_passwords(passwords, filename):
-                self.status_bar.showMessage(f"Passwords exported to {filename}", 5000)
+            self.write_queue.flush()
+            spawn(self.export_passwords_async(filename))
+
+    async def export_passwords_async(self, filename: str):
+        # Fetch all passwords from the database; decrypting and writing them happens off the UI thread
+        passwords = await AsyncProxy(self.db).get_all_passwords(skip_corrupt=True)
+
+        # Export the passwords using the ImportExportManager
+        if await AsyncProxy(self.import_export_manager).export_passwords(passwords, filename):
+            self.db.audit.record('export', detail=f"{len(passwords)} entries to {filename}")
+            if self.db.corrupt_ids:
+                self.status_bar.showMessage(
+                    f"Passwords exported to {filename}; "
+                    f"{len(self.db.corrupt_ids)} corrupted entries were skipped", 5000)
             else:
-                QMessageBox.critical(self, "Error", "Failed to export passwords.")
+                self.status_bar.showMessage(f"Passwords exported to {filename}", 5000)
+        else:
+            self.show_error("Failed to export passwords.")
+
+    def show_error(self, message: str):
+        # Coroutines must not open modal dialogs themselves: the dialog's nested
+        # event loop would step other tasks while theirs is still mid-step
+        QTimer.singleShot(0, lambda: QMessageBox.critical(self, "Error", message))
 
     def import_passwords(self):
         file_dialog = QFileDialog()
         filename, _ = file_dialog.getOpenFileName(self, "Import Passwords", "", "Encrypted Files (*.enc)")
         if filename:
-            # Import the passwords using the ImportExportManager
-            passwords = self.import_export_manager.import_passwords(filename)
-
-            if passwords:
-                # Add the imported passwords to the database
-                for password in passwords:
-                    self.db.add_password(
-                        website=password['website'],
-                        username=password['username'],
-                        password=password['password'],
-                        category=password['category'],
-                        tags=password['tags']
-                    )
-                self.load_passwords()  # Refresh the table
-                self.status_bar.showMessage(f"Passwords imported from {filename}", 5000)
-            else:
-                QMessageBox.critical(self, "Error", "Failed to import passwords.")
+            spawn(self.import_passwords_async(filename))
+
+    async def import_passwords_async(self, filename: str):
+        # Import the passwords using the ImportExportManager
+        passwords = await AsyncProxy(self.import_export_manager).import_passwords(filename)
+
+        if passwords:
+            # The merge review is modal, so it runs outside this coroutine (see show_error)
+            QTimer.singleShot(0, lambda: self.merge_imported(passwords, filename))
+        else:
+            self.show_error("Failed to import passwords.")
+
+    def merge_imported(self, passwords: list, filename: str):
+        # Merge rather than append, so re-importing an export adds no duplicates
+        if self.review_and_merge(passwords, os.path.basename(filename)):
+            self.status_bar.showMessage(f"Passwords imported from {filename}", 5000)
+
+    def import_foreign(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Import From Other Password Manager", "",
+            "Browser CSV (*.csv);;Bitwarden JSON (*.json);;KeePass XML (*.xml)")
+        if not filename:
+            return
+        self.import_button.setEnabled(False)
+        self.status_bar.showMessage(f"Importing {os.path.basename(filename)}...")
+        self.write_queue.flush()  # The importer writes on its own thread
+        spawn(self.import_foreign_async(filename))
+
+    async def import_foreign_async(self, filename: str):
+        try:
+            result = await run_blocking(import_file, self.db, filename)
+        except Exception as e:
+            print(f"Error importing {filename}: {e}")
+            self.show_error(f"Failed to import passwords: {e}")
+            return
+        finally:
+            self.import_button.setEnabled(True)
+        self.db.audit.record('import', detail=f"{result.imported} entries from {filename}")
+        self.load_passwords()  # Refresh the table
+        self.status_bar.showMessage(
+            f"Imported {result.imported} passwords; {result.duplicates} duplicates "
+            f"and {result.skipped} incomplete entries skipped", 5000)
+
+    def merge_from_vault(self):
+        others = [name for name in self.vaults.registry.names() if name != self.vault_name]
+        if not others:
+            QMessageBox.information(self, "Merge From Vault", "There is no other vault to merge from.")
+            return
+        name, ok = QInputDialog.getItem(self, "Merge From Vault", f"Merge into {self.vault_name} from:",
+                                        others, 0, False)
+        if not ok:
+            return
+        if self.vaults.get(name) is None and not self.prompt_unlock(name):
+            return
+        if self.review_and_merge(entries_from_vault(self.vaults.get(name)), name):
+            self.status_bar.showMessage(f"Merged passwords from {name}", 5000)
+
+    def review_and_merge(self, entries: list, source: str) -> bool:
+        self.write_queue.flush()  # Plan against, and write after, everything already queued
+        plan = plan_merge(self.db, entries)
+        if not plan.additions and not plan.conflicts:
+            self.db.apply_merge(plan)  # At most adopts the other side's uuids
+            self.status_bar.showMessage(f"Nothing to merge from {source}", 5000)
+            return False
+        dialog = MergeDialog(plan, source, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return False
+        self.db.apply_merge(plan)
+        self.db.audit.record('import', detail=f"{plan.summary()} from {source}")
+        self.load_passwords()  # Refresh the table
+        return True
 
     def changeEvent(self, event):
         if event.type() == QEvent.WindowStateChange:
             if self.windowState() & Qt.WindowState.WindowMinimized:
+                # Nothing decrypted should outlive the window being put away,
+                # and nothing typed should be lost if the app is killed meanwhile
+                self.write_queue.flush()
+                self.vaults.flush_audit_logs()
+                self.vaults.wipe_secrets()
                 self.floating_widget.show()
             else:
                 self.floating_widget.hide()
         super().changeEvent(event)
 
+    def toggle_theme(self):
+        apply_theme(QApplication.instance(), 'light' if current_theme() == 'dark' else 'dark')
+
+    def show_quick_search(self):
+        if self.locked:
+            self.restore_from_floating()  # To the lock screen first
+            return
+        self.quick_search.popup(self.db, self.floating_widget)
+
+    def activate(self, query: str = ''):
+        """Bring the app back for a second launch, searching for `query` if one was passed."""
+        if self.locked:
+            query = ''  # Nothing to search until the lock screen is passed
+        if self.isMinimized() and query:
+            # Stay minimized and answer from the floating icon's quick search
+            self.floating_widget.raise_()
+            self.show_quick_search()
+            self.quick_search.search_input.setText(query)
+            return
+        self.restore_from_floating()
+        self.raise_()
+        if query:
+            self.search_input.setText(query)
+
     def restore_from_floating(self):
+        self.quick_search.hide()
         self.setWindowState(Qt.WindowState.WindowActive)  # Ensure window is active
         self.showNormal()  # Restore window to normal size
         self.activateWindow()  # Bring window to the front
\ No newline at end of file
@@ -1,7 +1,10 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit,
-                             QPushButton, QLabel, QListWidget)
+                             QPushButton, QLabel, QListWidget, QListWidgetItem,
+                             QInputDialog)
 from PySide6.QtCore import Qt, Signal
 
+NO_CATEGORY = "(No category)"
+
 class ManageCategoriesDialog(QDialog):
     # Signal to notify when categories are updated
     categoriesChanged = Signal(list)
@@ -11,110 +14,120 @@ class ManageCategoriesDialog(QDialog):
         self.db = parent.db  # Access the database from the main window
         self.default_categories = []
         self.current_categories = current_categories or self.default_categories
+        # Deleted category -> list item of the category its passwords move to
+        # (None clears it); the name is looked up on save, after any renames
+        self.reassignments = {}
         self.setup_ui()
 
     def setup_ui(self):
         self.setWindowTitle("Manage Categories")
         self.setFixedSize(300, 400)
+        self.setObjectName("manageCategoriesDialog")
         layout = QVBoxLayout(self)
 
-        # Style the dialog
-        self.apply_styles()
-
         # Add category input and button
         input_layout = QHBoxLayout()
         self.category_input = QLineEdit()
         self.category_input.setPlaceholderText("New category name")
         add_btn = QPushButton("Add")
-        add_btn.setStyleSheet("background-color: #0984e3;")
+        add_btn.setProperty("variant", "primary")
         input_layout.addWidget(self.category_input)
         input_layout.addWidget(add_btn)
         layout.addLayout(input_layout)
 
         # Category list
+        # Each item remembers the name it had in the database (None when new),
+        # so renames can be applied as a single UPDATE on save
         self.category_list = QListWidget()
-        self.category_list.addItems(self.current_categories)
+        for category in self.current_categories:
+            item = QListWidgetItem(category)
+            item.setData(Qt.ItemDataRole.UserRole, category)
+            self.category_list.addItem(item)
         layout.addWidget(self.category_list)
 
         # Action buttons
         btn_layout = QHBoxLayout()
+        rename_btn = QPushButton("Rename")
+        rename_btn.setProperty("variant", "neutral")
         delete_btn = QPushButton("Delete")
-        delete_btn.setStyleSheet("background-color: #d63031;")
+        delete_btn.setProperty("variant", "danger")
         close_btn = QPushButton("Save & Close")
-        close_btn.setStyleSheet("background-color: #00b894;")
+        close_btn.setProperty("variant", "success")
+        btn_layout.addWidget(rename_btn)
         btn_layout.addWidget(delete_btn)
         btn_layout.addWidget(close_btn)
         layout.addLayout(btn_layout)
 
         # Connect actions
         add_btn.clicked.connect(self.add_category)
+        rename_btn.clicked.connect(self.rename_category)
         delete_btn.clicked.connect(self.delete_category)
         close_btn.clicked.connect(self.save_and_close)
 
-    def apply_styles(self):
-        self.setStyleSheet("""
-            QDialog {
-                background-color: #1e272e;
-                color: white;
-            }
-            QLineEdit {
-                padding: 8px;
-                border: 2px solid #485460;
-                border-radius: 6px;
-                background-color: #2d3436;
-                color: white;
-                min-height: 20px;
-            }
-            QListWidget {
-                background-color: #2d3436;
-                color: white;
-                border: 1px solid #485460;
-                border-radius: 6px;
-                padding: 5px;
-                font-size: 13px;
-            }
-            QListWidget::item {
-                padding: 8px;
-                border-radius: 4px;
-            }
-            QListWidget::item:selected {
-                background-color: #0984e3;
-            }
-            QPushButton {
-                padding: 8px 16px;
-                border-radius: 6px;
-                color: white;
-                font-weight: bold;
-                min-height: 25px;
-            }
-        """)
+    def category_names(self) -> list:
+        return [self.category_list.item(i).text() for i in range(self.category_list.count())]
 
     def add_category(self):
         category = self.category_input.text().strip()
-        current_categories = {self.category_list.item(i).text() for i in range(self.category_list.count())}
-        if category and category not in current_categories:
+        if category and category not in self.category_names():
             self.category_list.addItem(category)
             self.category_input.clear()
 
+    def rename_category(self):
+        current_item = self.category_list.currentItem()
+        if not current_item:
+            return
+        new_name, ok = QInputDialog.getText(self, "Rename Category", "New name:",
+                                            text=current_item.text())
+        new_name = new_name.strip()
+        if ok and new_name and new_name not in self.category_names():
+            current_item.setText(new_name)
+
     def delete_category(self):
         current_item = self.category_list.currentItem()
         default_categories_set = set(self.default_categories)
-        if current_item and current_item.text() not in default_categories_set:
-            self.category_list.takeItem(self.category_list.row(current_item))
+        if not current_item or current_item.text() in default_categories_set:
+            return
+
+        original = current_item.data(Qt.ItemDataRole.UserRole)
+        if original is not None:
+            # Ask where the passwords filed under this category should go
+            others = [self.category_list.item(i) for i in range(self.category_list.count())
+                      if self.category_list.item(i) is not current_item]
+            target, ok = QInputDialog.getItem(
+                self, "Delete Category",
+                f"Move passwords in '{current_item.text()}' to:",
+                [NO_CATEGORY] + [item.text() for item in others], 0, False)
+            if not ok:
+                return
+            self.reassignments[original] = next(
+                (item for item in others if item.text() == target), None)
+
+        self.category_list.takeItem(self.category_list.row(current_item))
+
+    def final_name(self, item):
+        """Name of the category `item` stands for on save, following it through later deletes."""
+        while item is not None and self.category_list.row(item) < 0:
+            item = self.reassignments.get(item.data(Qt.ItemDataRole.UserRole))
+        return None if item is None else item.text()
 
     def save_and_close(self):
-        new_categories = [self.category_list.item(i).text()
-                     for i in range(self.category_list.count())]
+        new_categories = self.category_names()
 
-        # Add new categories to the database
-        for category in new_categories:
-            if category not in self.current_categories:
-                self.db.add_category(category)
+        added, renamed = [], {}
+        for i in range(self.category_list.count()):
+            item = self.category_list.item(i)
+            original = item.data(Qt.ItemDataRole.UserRole)
+            if original is None:
+                added.append(item.text())
+            elif original != item.text():
+                renamed[original] = item.text()
 
-        # Delete removed categories from the database
-        for category in self.current_categories:
-            if category not in new_categories:
-                self.db.delete_category(category)
+        # Everything is applied in one transaction; a deleted category's
+        # passwords are reassigned by a single UPDATE
+        self.db.apply_category_changes(added=added, renamed=renamed,
+                                       deleted={category: self.final_name(target)
+                                                for category, target in self.reassignments.items()})
 
         self.categoriesChanged.emit(new_categories)
         self.accept()
\ No newline at end of file
@@ -0,0 +1,63 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QTableWidget, QTableWidgetItem, QComboBox, QHeaderView)
+
+class MergeDialog(QDialog):
+    """Review a MergePlan: pick the winning side of each conflict before applying."""
+
+    def __init__(self, plan, source: str, parent=None):
+        super().__init__(parent)
+        self.plan = plan
+        self.source = source
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle(f"Merge from {self.source}")
+        self.resize(760, 460)
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.conflict_table = QTableWidget(len(self.plan.conflicts), 5)
+        self.conflict_table.setHorizontalHeaderLabels(
+            ["Website", "Username", "Changed here", f"Changed in {self.source}", "Keep"])
+        self.conflict_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.conflict_table.verticalHeader().setVisible(False)
+        for row, conflict in enumerate(self.plan.conflicts):
+            self.conflict_table.setItem(row, 0, QTableWidgetItem(conflict.local['website']))
+            self.conflict_table.setItem(row, 1, QTableWidgetItem(conflict.local['username']))
+            self.conflict_table.setItem(row, 2, QTableWidgetItem(conflict.local.get('updated_at') or ''))
+            self.conflict_table.setItem(row, 3, QTableWidgetItem(conflict.remote.get('updated_at') or ''))
+            choice = QComboBox()
+            choice.addItem("This vault", 'local')
+            choice.addItem(self.source, 'remote')
+            choice.setCurrentIndex(choice.findData(conflict.resolution))
+            choice.currentIndexChanged.connect(
+                lambda index, c=conflict, box=choice: self.set_resolution(c, box.currentData()))
+            self.conflict_table.setCellWidget(row, 4, choice)
+        self.conflict_table.setVisible(bool(self.plan.conflicts))
+        layout.addWidget(self.conflict_table)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+        merge_btn = QPushButton("Merge")
+        merge_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.setProperty("variant", "neutral")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addStretch()
+        button_layout.addWidget(merge_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+
+        self.update_summary()
+
+    def set_resolution(self, conflict, resolution: str):
+        conflict.resolution = resolution
+        self.update_summary()
+
+    def update_summary(self):
+        self.summary_label.setText(self.plan.summary())
\ No newline at end of file
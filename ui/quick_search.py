@@ -0,0 +1,109 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QListWidget,
+                             QListWidgetItem, QPushButton, QApplication)
+from PySide6.QtCore import Qt, Signal, QEvent
+
+class QuickSearchPopup(QWidget):
+    """Small always-on-top search box opened from the floating icon.
+
+    Matches come from the vault's in-memory SearchIndex and only the listed
+    rows are read back, so the main table is never built; choosing an entry
+    decrypts just that one password.
+    """
+    entryChosen = Signal(int)
+    openRequested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.db = None
+        self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint |
+                            Qt.WindowType.Tool)
+        self.setFixedSize(340, 300)
+        self.setObjectName("quickSearch")
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+
+        top_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Website or username...")
+        self.search_input.textChanged.connect(self.update_results)
+        self.search_input.returnPressed.connect(self.choose_current)
+        self.search_input.installEventFilter(self)
+        top_layout.addWidget(self.search_input)
+
+        open_btn = QPushButton("⤢")
+        open_btn.setToolTip("Open SecurePass")
+        open_btn.setFixedSize(28, 28)
+        open_btn.setProperty("variant", "neutral")
+        open_btn.clicked.connect(self.open_main_window)
+        top_layout.addWidget(open_btn)
+        layout.addLayout(top_layout)
+
+        self.results = QListWidget()
+        self.results.itemActivated.connect(lambda item: self.choose(item))
+        layout.addWidget(self.results)
+
+    def popup(self, db, anchor: QWidget):
+        """Show next to `anchor` (the floating icon), searching the vault `db`."""
+        self.db = db
+        screen = QApplication.primaryScreen().availableGeometry()
+        x = anchor.x() + anchor.width() + 4
+        if x + self.width() > screen.right():
+            x = anchor.x() - self.width() - 4
+        y = max(screen.top(), min(anchor.y(), screen.bottom() - self.height()))
+        self.move(x, y)
+        self.search_input.clear()
+        self.update_results('')
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.search_input.setFocus()
+
+    def update_results(self, query: str):
+        self.results.clear()
+        if self.db is None:
+            return
+        # Before anything is typed, offer the entries most likely to be wanted
+        index = self.db.get_search_index()
+        ids = index.search(query, limit=20) if query.strip() else index.most_used(limit=20)
+        for record in self.db.get_records(ids):
+            item = QListWidgetItem(f"{record.website}\n{record.username}")
+            item.setData(Qt.ItemDataRole.UserRole, record.id)
+            self.results.addItem(item)
+        self.results.setCurrentRow(0)
+
+    def choose_current(self):
+        item = self.results.currentItem()
+        if item is not None:
+            self.choose(item)
+
+    def choose(self, item):
+        self.hide()
+        self.entryChosen.emit(item.data(Qt.ItemDataRole.UserRole))
+
+    def open_main_window(self):
+        self.hide()
+        self.openRequested.emit()
+
+    def eventFilter(self, obj, event):
+        # Arrow keys move through the results without leaving the search box
+        if obj is self.search_input and event.type() == QEvent.Type.KeyPress:
+            if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if event.key() == Qt.Key.Key_Down else -1
+                row = self.results.currentRow() + step
+                if 0 <= row < self.results.count():
+                    self.results.setCurrentRow(row)
+                return True
+            if event.key() == Qt.Key.Key_Escape:
+                self.hide()
+                return True
+        return super().eventFilter(obj, event)
+
+    def changeEvent(self, event):
+        # Behave like a popup: clicking elsewhere puts it away
+        if event.type() == QEvent.Type.ActivationChange and not self.isActiveWindow():
+            self.hide()
+        super().changeEvent(event)
\ No newline at end of file
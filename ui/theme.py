@@ -0,0 +1,337 @@
+from string import Template
+from PySide6.QtGui import QPalette, QColor
+from PySide6.QtCore import QSettings
+
+# One application-level style sheet, parsed once, instead of a sheet per
+# widget. Widgets pick their look with object names (setObjectName) and the
+# dynamic properties below, set before they are first shown:
+#   variant: primary, info, success, import, neutral, danger
+#   toolbar: "true" for the large main window toolbar buttons
+THEMES = {
+    'dark': {
+        'window': '#1e272e',
+        'surface': '#2d3436',
+        'border': '#485460',
+        'text': '#ffffff',
+        'muted': '#b2bec3',
+        # The login card keeps its light look in both themes
+        'card': '#ffffff',
+        'card_border': '#dfe6e9',
+        'card_input': '#f5f6fa',
+        'card_text': '#2d3436',
+        'card_muted': '#636e72',
+    },
+    'light': {
+        'window': '#f5f6fa',
+        'surface': '#ffffff',
+        'border': '#dfe6e9',
+        'text': '#2d3436',
+        'muted': '#636e72',
+        'card': '#ffffff',
+        'card_border': '#dfe6e9',
+        'card_input': '#f5f6fa',
+        'card_text': '#2d3436',
+        'card_muted': '#636e72',
+    },
+}
+
+# Button colours are the same in both themes: (normal, hover)
+VARIANTS = {
+    'primary': ('#0984e3', '#0773c5'),
+    'info': ('#3498db', '#2980b9'),
+    'success': ('#00b894', '#00a381'),
+    'import': ('#2ecc71', '#27ae60'),
+    'neutral': ('#636e72', '#535c60'),
+    'danger': ('#d63031', '#c02627'),
+}
+
+DEFAULT_THEME = 'dark'
+
+STYLESHEET = Template("""
+/* Main window */
+QMainWindow#mainWindow {
+    background-color: $window;
+}
+QWidget#searchContainer {
+    background-color: $surface;
+    border-radius: 8px;
+    padding: 5px;
+}
+QLineEdit#searchInput {
+    border: none;
+    background: transparent;
+    padding: 5px;
+    font-size: 14px;
+    min-width: 250px;
+    color: $text;
+}
+QComboBox#vaultSelector, QComboBox#categoryFilter {
+    padding: 8px;
+    border: 1px solid $border;
+    border-radius: 6px;
+    min-width: 120px;
+    background-color: $surface;
+    color: $text;
+}
+QComboBox#categoryFilter {
+    min-width: 150px;
+}
+QComboBox#categoryFilter::drop-down {
+    border: none;
+}
+QComboBox#categoryFilter::down-arrow {
+    image: none;
+}
+QComboBox#vaultSelector QAbstractItemView, QComboBox#categoryFilter QAbstractItemView {
+    background-color: $surface;
+    color: $text;
+    selection-background-color: #0984e3;
+}
+QPushButton[toolbar="true"] {
+    padding: 10px 20px;
+    color: white;
+    border: none;
+    border-radius: 6px;
+    font-weight: bold;
+}
+QPushButton#addVaultButton {
+    padding: 8px 10px;
+    color: white;
+    border: none;
+    border-radius: 6px;
+}
+QStatusBar {
+    background-color: $surface;
+    color: $muted;
+}
+QStatusBar::item {
+    border: none;
+}
+
+/* Password table; its row buttons are plain QPushButtons styled from here */
+QTableWidget {
+    background-color: $surface;
+    color: $text;
+    gridline-color: $border;
+    border: 1px solid $border;
+    border-radius: 8px;
+}
+QHeaderView::section {
+    background-color: $window;
+    color: $text;
+    padding: 8px;
+    border: none;
+    font-weight: bold;
+}
+QTableWidget::item {
+    padding: 8px;
+    color: $text;
+    border: none;
+}
+QTableWidget::item:selected, QTableWidget::item:focus {
+    background-color: transparent;
+    color: $text;
+    border: none;
+}
+QTableWidget QPushButton {
+    background-color: #0984e3;
+    color: white;
+    border: none;
+    border-radius: 4px;
+    padding: 6px 8px;
+    font-size: 11px;
+    min-height: 15px;
+}
+QTableWidget QPushButton:hover {
+    background-color: #0773c5;
+}
+QTableWidget QPushButton[variant] {
+    padding: 4px;
+}
+
+/* Dialogs */
+QDialog {
+    background-color: $window;
+    color: $text;
+}
+QDialog QLabel {
+    color: $text;
+    font-size: 13px;
+}
+QDialog QLineEdit, QDialog QComboBox {
+    padding: 8px 12px;
+    border: 2px solid $border;
+    border-radius: 6px;
+    background-color: $surface;
+    color: $text;
+    min-height: 20px;
+    font-size: 13px;
+}
+QDialog QLineEdit:focus, QDialog QComboBox:focus {
+    border: 2px solid #0984e3;
+}
+QDialog QComboBox QAbstractItemView {
+    background-color: $surface;
+    color: $text;
+    selection-background-color: #0984e3;
+    padding: 4px;
+}
+QDialog QTableWidget QComboBox {
+    padding: 2px 6px;
+    border: none;
+    min-height: 0;
+}
+QDialog QListWidget {
+    background-color: $surface;
+    color: $text;
+    border: 1px solid $border;
+    border-radius: 6px;
+    padding: 5px;
+    font-size: 13px;
+}
+QDialog QListWidget::item {
+    padding: 8px;
+    border-radius: 4px;
+}
+QDialog QListWidget::item:selected {
+    background-color: #0984e3;
+}
+QDialog QPushButton {
+    padding: 5px 16px;
+    border-radius: 6px;
+    color: white;
+    background-color: #0984e3;
+    min-height: 20px;
+    font-size: 13px;
+}
+QDialog QPushButton:hover {
+    background-color: #0773c5;
+}
+QDialog#manageCategoriesDialog QPushButton {
+    padding: 8px 16px;
+    font-weight: bold;
+    min-height: 25px;
+}
+
+/* Floating icon and its quick search popup */
+QWidget#floatingIcon {
+    background: transparent;
+}
+QWidget#floatingIcon QPushButton {
+    background-color: rgba(45, 52, 54, 0.8);
+    border-radius: 25px;
+}
+QWidget#floatingIcon QPushButton:hover {
+    background-color: rgba(9, 132, 227, 0.9);
+}
+QWidget#quickSearch {
+    background-color: $window;
+    color: $text;
+    font-size: 13px;
+}
+QWidget#quickSearch QLineEdit, QWidget#quickSearch QListWidget {
+    padding: 5px;
+    border: 1px solid $border;
+    border-radius: 6px;
+    background-color: $surface;
+    color: $text;
+}
+QWidget#quickSearch QListWidget::item:selected {
+    background-color: #0984e3;
+    color: white;
+}
+QWidget#quickSearch QPushButton {
+    border-radius: 6px;
+    color: white;
+}
+
+/* Login window */
+QMainWindow#loginWindow {
+    background: transparent;
+}
+QWidget#loginCard {
+    background-color: $card;
+    border: 2px solid $card_border;
+    border-radius: 15px;
+}
+QLabel#loginTitle {
+    color: $card_text;
+}
+QLabel#loginStatus {
+    color: $card_muted;
+    font-size: 13px;
+}
+QWidget#loginCard QLineEdit, QWidget#loginCard QComboBox {
+    padding: 12px;
+    border: 2px solid $card_border;
+    border-radius: 8px;
+    background-color: $card_input;
+    font-size: 14px;
+    color: $card_text;
+}
+QWidget#loginCard QComboBox {
+    padding: 10px;
+}
+QWidget#loginCard QLineEdit:focus {
+    border: 2px solid #0984e3;
+    background-color: white;
+}
+QPushButton#loginButton {
+    padding: 12px;
+    color: white;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: bold;
+}
+QPushButton#closeButton {
+    border-radius: 15px;
+    color: white;
+    font-size: 20px;
+    font-weight: bold;
+    background-color: #ff5f57;
+}
+QPushButton#closeButton:hover {
+    background-color: #ff3b36;
+}
+""")
+
+def build_stylesheet(name: str = DEFAULT_THEME) -> str:
+    sheet = STYLESHEET.substitute(THEMES[name])
+    # The attribute selector outranks the generic "QDialog QPushButton" style rules
+    for variant, (normal, hover) in VARIANTS.items():
+        selector = f'QPushButton[variant="{variant}"]'
+        sheet += (f'{selector} {{ background-color: {normal}; }}\n'
+                  f'{selector}:hover {{ background-color: {hover}; }}\n')
+    return sheet
+
+def build_palette(name: str = DEFAULT_THEME) -> QPalette:
+    """Palette for everything the style sheet leaves alone (menus, message boxes, tooltips)."""
+    colors = THEMES[name]
+    palette = QPalette()
+    for role, color in (
+        (QPalette.ColorRole.Window, colors['window']),
+        (QPalette.ColorRole.WindowText, colors['text']),
+        (QPalette.ColorRole.Base, colors['surface']),
+        (QPalette.ColorRole.AlternateBase, colors['window']),
+        (QPalette.ColorRole.Text, colors['text']),
+        (QPalette.ColorRole.Button, colors['surface']),
+        (QPalette.ColorRole.ButtonText, colors['text']),
+        (QPalette.ColorRole.ToolTipBase, colors['surface']),
+        (QPalette.ColorRole.ToolTipText, colors['text']),
+        (QPalette.ColorRole.PlaceholderText, colors['muted']),
+        (QPalette.ColorRole.Highlight, '#0984e3'),
+        (QPalette.ColorRole.HighlightedText, '#ffffff'),
+    ):
+        palette.setColor(role, QColor(color))
+    return palette
+
+def current_theme() -> str:
+    name = QSettings().value('theme', DEFAULT_THEME)
+    return name if name in THEMES else DEFAULT_THEME
+
+def apply_theme(app, name: str = None):
+    """Style the whole application; switching themes later re-polishes every widget once."""
+    name = name or current_theme()
+    app.setPalette(build_palette(name))
+    app.setStyleSheet(build_stylesheet(name))
+    QSettings().setValue('theme', name)
\ No newline at end of file
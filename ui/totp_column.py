@@ -0,0 +1,137 @@
+import time
+from PySide6.QtWidgets import QTableWidgetItem
+from PySide6.QtCore import QObject, QTimer, QEvent, Qt
+from utils.totp import Totp
+
+# Codes of the usual 30 second period roll over on multiples of this
+TICK_SECONDS = 30
+
+def format_code(code: str) -> str:
+    half = len(code) // 2
+    return f"{code[:half]} {code[half:]}"
+
+class TotpColumn(QObject):
+    """Live 2FA codes in one column of the password table.
+
+    One shared single-shot timer fires at each period boundary for the whole
+    table. A refresh only looks at the rows inside the viewport: secrets not
+    cached yet are read in one query, and an HMAC is computed only for rows
+    whose cached code belongs to an earlier time step. The cost of a tick
+    follows the window height, not the size of the vault. Scrolling, resizing
+    and refilling the table refresh the rows that came into view.
+
+    Decrypted secrets are cached only for the rows on screen; the rest are
+    dropped at every tick, and invalidate() drops all of them (lock, vault
+    switch, edits).
+    """
+
+    def __init__(self, table, column: int, get_db, parent=None):
+        super().__init__(parent)
+        self.table = table
+        self.column = column
+        self.get_db = get_db  # The vault shown in the table may change
+        self.cache = {}  # password id -> (Totp or None, time step, shown text)
+        self.computed = 0  # HMACs computed so far
+
+        self.tick_timer = QTimer(self)
+        self.tick_timer.setSingleShot(True)
+        self.tick_timer.timeout.connect(self.tick)
+        # Coalesces the many changes of one table fill or scroll into one refresh
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(0)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        table.verticalScrollBar().valueChanged.connect(self.refresh_soon)
+        table.model().rowsInserted.connect(self.refresh_soon)
+        table.viewport().installEventFilter(self)
+        self.schedule_tick()
+
+    def refresh_soon(self, *args):
+        self.refresh_timer.start()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Resize:
+            self.refresh_soon()
+        return False
+
+    def schedule_tick(self):
+        # A little past the boundary so the new time step has surely begun
+        self.tick_timer.start(int((TICK_SECONDS - time.time() % TICK_SECONDS) * 1000) + 50)
+
+    def tick(self):
+        visible = {password_id for _, password_id in self.visible_rows()}
+        self.cache = {password_id: entry for password_id, entry in self.cache.items()
+                      if password_id in visible}
+        self.refresh()
+        self.schedule_tick()
+
+    def invalidate(self, password_id: int = None):
+        if password_id is None:
+            self.cache = {}
+        else:
+            self.cache.pop(password_id, None)
+        self.refresh_soon()
+
+    def visible_rows(self) -> list:
+        """(row, password id) of the own-vault entries inside the viewport."""
+        first = self.table.rowAt(0)
+        if first < 0:
+            return []
+        last = self.table.rowAt(self.table.viewport().height() - 1)
+        if last < 0:
+            last = self.table.rowCount() - 1
+        rows = []
+        for row in range(first, last + 1):
+            item = self.table.item(row, 0)
+            password_id = item.data(Qt.ItemDataRole.UserRole) if item else None
+            # Rows still being saved have no id; those of other vaults no actions
+            if (isinstance(password_id, int) and not self.table.isRowHidden(row)
+                    and self.table.cellWidget(row, 8) is not None):
+                rows.append((row, password_id))
+        return rows
+
+    def refresh(self, now: float = None):
+        db = self.get_db()
+        if db is None or db.encryptor.locked:
+            return
+        rows = self.visible_rows()
+        missing = [password_id for _, password_id in rows if password_id not in self.cache]
+        if missing:
+            secrets = db.attachments.read_small(missing, 'totp')
+            for password_id in missing:
+                self.cache[password_id] = self.load(secrets.get(password_id, b''))
+
+        now = time.time() if now is None else now
+        for row, password_id in rows:
+            totp, step, text = self.cache[password_id]
+            if totp is not None:
+                current = totp.counter(now)
+                if current != step:
+                    text = format_code(totp.code(current))
+                    self.cache[password_id] = (totp, current, text)
+                    self.computed += 1
+            item = self.table.item(row, self.column)
+            if item is None or item.text() != text:
+                item = QTableWidgetItem(text)
+                if text == '⚠':
+                    item.setToolTip("This 2FA secret could not be decrypted")
+                elif text:
+                    item.setToolTip("Click to copy the 2FA code")
+                self.table.setItem(row, self.column, item)
+
+    def load(self, secret) -> tuple:
+        if secret is None:
+            return None, None, '⚠'  # Damaged
+        if not secret:
+            return None, None, ''
+        try:
+            return Totp(secret.decode('utf-8')), None, ''
+        except ValueError:
+            return None, None, '⚠'
+
+    def code(self, row: int) -> str:
+        """The code shown in `row`, without the space, or '' if there is none."""
+        item = self.table.item(row, self.column)
+        text = item.text().replace(' ', '') if item else ''
+        return text if text.isdigit() else ''
\ No newline at end of file
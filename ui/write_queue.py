@@ -0,0 +1,135 @@
+import itertools
+import threading
+from collections import deque
+from PySide6.QtCore import QThread, Signal
+
+class Mutation:
+    """One queued write: kind is 'add', 'update', 'delete' or 'usage' (see DatabaseManager.flush_usage)."""
+    __slots__ = ('kind', 'db', 'password_id', 'values')
+
+    def __init__(self, kind: str, db, password_id: int = None, values: dict = None):
+        self.kind = kind
+        self.db = db
+        self.password_id = password_id  # Filled in for adds once the row exists
+        self.values = values or {}
+
+class WriteQueue(QThread):
+    """Applies the window's edits on a writer thread, so encryption and commits
+    never hold up the UI.
+
+    Mutations are applied in the order they were queued. Whatever has queued
+    up while the previous batch was being written goes into one transaction
+    per vault; several edits of the same row that are still waiting are
+    merged into one, and a delete drops the edits it makes moot. If a batch
+    fails it is retried one mutation at a time, so only the faulty one is
+    lost. Results come back through `written` and `failed`, delivered on the
+    UI thread.
+
+    Anything that reads the vault expecting to see its own edits, writes
+    outside the queue, or locks a vault calls flush() first.
+    """
+    written = Signal(list)  # the Mutations of one batch that were committed
+    failed = Signal(object, str)  # a Mutation that could not be applied, and why
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = deque()
+        self._busy = False
+        self._stopping = False
+        self._condition = threading.Condition()
+
+    def add(self, db, **values):
+        self._enqueue(Mutation('add', db, values=values))
+
+    def update(self, db, password_id: int, **values):
+        with self._condition:
+            # Still waiting edits of this row absorb the new values
+            for mutation in self._queue:
+                if (mutation.kind == 'update' and mutation.db is db
+                        and mutation.password_id == password_id):
+                    mutation.values.update(values)
+                    return
+        self._enqueue(Mutation('update', db, password_id, values))
+
+    def delete(self, db, password_id: int):
+        with self._condition:
+            self._queue = deque(mutation for mutation in self._queue
+                                if not (mutation.kind == 'update' and mutation.db is db
+                                        and mutation.password_id == password_id))
+        self._enqueue(Mutation('delete', db, password_id))
+
+    def flush_usage(self, db):
+        """Write the copies `db` has counted, unless a write of them is already waiting."""
+        with self._condition:
+            if any(mutation.kind == 'usage' and mutation.db is db for mutation in self._queue):
+                return
+        self._enqueue(Mutation('usage', db))
+
+    def _enqueue(self, mutation: Mutation):
+        with self._condition:
+            self._queue.append(mutation)
+            self._condition.notify_all()
+        if not self.isRunning():
+            self.start()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until every queued mutation is committed; False if `timeout` (seconds) ran out."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def stop(self):
+        """Write out what is queued and end the thread, e.g. when the app exits."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                self._busy = True
+            try:
+                written = []
+                for db, mutations in itertools.groupby(batch, key=lambda mutation: mutation.db):
+                    written.extend(self._write(db, list(mutations)))
+                if written:
+                    self.written.emit(written)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write(self, db, mutations: list) -> list:
+        try:
+            with db.transaction():
+                for mutation in mutations:
+                    self._apply(mutation)
+            return mutations
+        except Exception as e:
+            print(f"Error writing {len(mutations)} queued changes, retrying one by one: {e}")
+
+        written = []
+        for mutation in mutations:
+            try:
+                with db.transaction():
+                    self._apply(mutation)
+                written.append(mutation)
+            except Exception as e:
+                print(f"Error applying queued {mutation.kind}: {e}")
+                self.failed.emit(mutation, str(e))
+        return written
+
+    def _apply(self, mutation: Mutation):
+        if mutation.kind == 'add':
+            mutation.password_id = mutation.db.add_password(**mutation.values)
+        elif mutation.kind == 'update':
+            mutation.db.update_password(mutation.password_id, **mutation.values)
+        elif mutation.kind == 'delete':
+            mutation.db.delete_password(mutation.password_id)
+        elif mutation.kind == 'usage':
+            mutation.db.flush_usage()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# A small fixed pool instead of a thread per call. Calls queued behind busy
+# workers have not started yet, so cancelling them (a superseded search, a
+# vault switch) drops them for free.
+MAX_WORKERS = 4
+
+_executor = None
+_tasks = set()
+
+def executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='securepass-io')
+    return _executor
+
+async def run_blocking(func, *args, timeout: float = None, **kwargs):
+    """Run a blocking call on the shared pool and await its result.
+
+    Raises asyncio.TimeoutError after `timeout` seconds. A call abandoned by a
+    timeout or cancellation is dropped if it has not started; one already
+    running finishes on its thread and its result is discarded.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor(), functools.partial(func, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout)
+
+class AsyncProxy:
+    """Awaitable view of an object whose methods block, such as DatabaseManager,
+    Encryptor or ImportExportManager:
+
+        records = await AsyncProxy(db).search_passwords('mail', include_passwords=False)
+
+    Every method call runs on the shared pool; plain attributes are read directly.
+    """
+
+    def __init__(self, target, timeout: float = None):
+        self._target = target
+        self._timeout = timeout
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        async def call(*args, **kwargs):
+            return await run_blocking(attribute, *args, timeout=self._timeout, **kwargs)
+        return call
+
+def spawn(coro) -> asyncio.Task:
+    """Start a coroutine from a Qt slot; errors are printed rather than lost."""
+    task = asyncio.ensure_future(coro)
+    _tasks.add(task)  # The loop itself only keeps weak references
+    task.add_done_callback(_task_done)
+    return task
+
+def _task_done(task: asyncio.Task):
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        error = task.exception()
+        print(f"Error in background task: {type(error).__name__}: {error}")
\ No newline at end of file
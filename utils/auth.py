@@ -1,13 +1,20 @@
+import base64
 import bcrypt
 import json
 import os
 from datetime import datetime, timedelta
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from utils.encryption import Encryptor
+
+KEK_ITERATIONS = 200000
 
 class Auth:
-    def __init__(self):
+    def __init__(self, config_file: str = 'config.json'):
         self.last_activity = datetime.now()
         self.session_timeout = timedelta(minutes=5)
-        self.config_file = 'config.json'
+        self.config_file = config_file
         self._load_config()
 
     def _load_config(self):
@@ -25,14 +32,24 @@ class Auth:
             json.dump(default_config, f)
         self.config = default_config
 
+    def _save_config(self):
+        # The wrapped vault keys live here, so never leave a half-written file
+        tmp_file = self.config_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.config, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.config_file)
+
     def set_master_password(self, password: str) -> bool:
         salt = bcrypt.gensalt()
         password_hash = bcrypt.hashpw(password.encode(), salt)
         self.config['master_hash'] = password_hash.decode()
         self.config['salt'] = salt.decode()
+        # A new vault gets a random data key, wrapped by the master password
+        self._wrap_data_keys(password, {1: os.urandom(32)}, active_key_id=1)
 
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f)
+        self._save_config()
         return True
 
     def verify_password(self, password: str) -> bool:
@@ -44,6 +61,106 @@ class Auth:
             self.config['master_hash'].encode()
         )
 
+    def _derive_kek(self, password: str, salt: bytes, iterations: int) -> bytes:
+        """Derive the key-encryption key that wraps the vault's data keys."""
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=iterations,
+        )
+        return kdf.derive(password.encode())
+
+    @staticmethod
+    def _key_aad(key_id: int) -> bytes:
+        return f'securepass data key {key_id}'.encode()
+
+    def _wrap_data_keys(self, password: str, data_keys: dict, active_key_id: int):
+        salt = os.urandom(16)
+        kek = AESGCM(self._derive_kek(password, salt, KEK_ITERATIONS))
+        wrapped = {}
+        for key_id, data_key in data_keys.items():
+            nonce = os.urandom(12)
+            wrapped[str(key_id)] = base64.b64encode(
+                nonce + kek.encrypt(nonce, data_key, self._key_aad(key_id))).decode()
+        self.config['vault_keys'] = {
+            'kdf_salt': base64.b64encode(salt).decode(),
+            'iterations': KEK_ITERATIONS,
+            'active_key_id': active_key_id,
+            'wrapped_keys': wrapped,
+        }
+
+    def unwrap_data_keys(self, password: str) -> tuple:
+        """Return ({key id: data key}, active key id) for the vault.
+
+        Raises ValueError when the password does not unwrap the keys. Vaults
+        created before envelope encryption have no wrapped keys yet; their rows
+        are encrypted under the key derived straight from the master password,
+        so that key is wrapped and stored as the vault's data key.
+        """
+        vault_keys = self.config.get('vault_keys')
+        if vault_keys is None:
+            if not self.verify_password(password):
+                raise ValueError("Incorrect master password")
+            self._wrap_data_keys(password, {1: Encryptor.derive_legacy_key(password)},
+                                 active_key_id=1)
+            self._save_config()
+            vault_keys = self.config['vault_keys']
+        return self.unwrap_vault_keys(password, vault_keys)
+
+    def unwrap_vault_keys(self, password: str, vault_keys: dict) -> tuple:
+        """Unwrap a `vault_keys` block, e.g. one saved in a backup, without touching the config."""
+        kek = AESGCM(self._derive_kek(password, base64.b64decode(vault_keys['kdf_salt']),
+                                      vault_keys['iterations']))
+        data_keys = {}
+        try:
+            for key_id, blob in vault_keys['wrapped_keys'].items():
+                blob = base64.b64decode(blob)
+                data_keys[int(key_id)] = kek.decrypt(blob[:12], blob[12:], self._key_aad(int(key_id)))
+        except Exception:
+            raise ValueError("Incorrect master password")
+        return data_keys, vault_keys['active_key_id']
+
+    def change_master_password(self, old_password: str, new_password: str) -> bool:
+        """Re-wrap the data keys under a new master password.
+
+        Only the small key blob in the config is rewritten; no row is re-encrypted.
+        """
+        self._load_config()  # Another Auth may have changed the file since we read it
+        if not self.verify_password(old_password):
+            return False
+        data_keys, active_key_id = self.unwrap_data_keys(old_password)
+
+        salt = bcrypt.gensalt()
+        self.config['master_hash'] = bcrypt.hashpw(new_password.encode(), salt).decode()
+        self.config['salt'] = salt.decode()
+        self._wrap_data_keys(new_password, data_keys, active_key_id)
+        self._save_config()
+        return True
+
+    def add_data_key(self, password: str) -> tuple:
+        """Create a new data key, make it the active one and return (key id, key).
+
+        Older keys stay in the keyring until every row has been re-encrypted.
+        """
+        self._load_config()
+        data_keys, _ = self.unwrap_data_keys(password)
+        key_id = max(data_keys) + 1
+        data_keys[key_id] = os.urandom(32)
+        self._wrap_data_keys(password, data_keys, active_key_id=key_id)
+        self._save_config()
+        return key_id, data_keys[key_id]
+
+    def remove_data_keys(self, key_ids) -> bool:
+        """Drop retired keys from the keyring; the active key is never removed."""
+        self._load_config()
+        vault_keys = self.config['vault_keys']
+        for key_id in key_ids:
+            if key_id != vault_keys['active_key_id']:
+                vault_keys['wrapped_keys'].pop(str(key_id), None)
+        self._save_config()
+        return True
+
     def update_activity(self):
         self.last_activity = datetime.now()
 
@@ -56,7 +173,7 @@ class Auth:
     def reset_master_password(self) -> bool:
         """Clear master password without deleting config file."""
         try:
-            with open('config.json', 'w') as f:
+            with open(self.config_file, 'w') as f:
                 json.dump({"master_hash": None, "salt": None}, f)
             return True
         except Exception as e:
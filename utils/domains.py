@@ -0,0 +1,86 @@
+import ipaddress
+import os
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# Offline copy of https://publicsuffix.org/list/public_suffix_list.dat
+SUFFIX_LIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public_suffix_list.dat')
+
+_rules = None
+
+def _load_rules() -> tuple:
+    """Parse the public suffix list into (plain rules, wildcard parents, exceptions)."""
+    global _rules
+    if _rules is None:
+        rules, wildcards, exceptions = set(), set(), set()
+        with open(SUFFIX_LIST, encoding='utf-8') as f:
+            for line in f:
+                rule = line.strip()
+                if not rule or rule.startswith('//'):
+                    continue
+                rule = _to_ascii(rule.lstrip('!*.'))
+                if line.startswith('!'):
+                    exceptions.add(rule)
+                elif line.startswith('*.'):
+                    wildcards.add(rule)
+                else:
+                    rules.add(rule)
+        _rules = rules, wildcards, exceptions
+    return _rules
+
+def _to_ascii(host: str) -> str:
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+def hostname(website: str):
+    """Host part of a URL or of a bare "example.com/path" website entry, lowercased."""
+    website = (website or '').strip()
+    if not website:
+        return None
+    try:
+        host = urlsplit(website if '://' in website else '//' + website).hostname
+    except ValueError:
+        return None
+    if not host or ' ' in host:
+        return None  # Free text such as "My bank", not an address
+    return _to_ascii(host.rstrip('.'))
+
+@lru_cache(maxsize=4096)
+def registrable_domain(website: str):
+    """The domain a site was registered under: "https://www.login.example.co.uk/x" -> "example.co.uk".
+
+    Follows the public suffix list rules, so sites on a shared suffix such as
+    github.io keep apart. IP addresses and single-label hosts are returned
+    as they are; None when `website` holds no host at all.
+    """
+    host = hostname(website)
+    if host is None:
+        return None
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return host
+    except ValueError:
+        pass
+
+    rules, wildcards, exceptions = _load_rules()
+    labels = host.split('.')
+    # Walk from the longest candidate suffix down; the first match is the public suffix
+    for i in range(len(labels)):
+        candidate = '.'.join(labels[i:])
+        if candidate in exceptions:
+            suffix_start = i + 1  # An exception is itself registrable
+            break
+        if candidate in rules:
+            suffix_start = i
+            break
+        if i + 1 < len(labels) and '.'.join(labels[i + 1:]) in wildcards:
+            suffix_start = i
+            break
+    else:
+        suffix_start = len(labels) - 1  # Unlisted TLD: the implicit "*" rule
+
+    if suffix_start == 0:
+        return host  # The host is a public suffix (or a single label like "localhost")
+    return '.'.join(labels[suffix_start - 1:])
\ No newline at end of file
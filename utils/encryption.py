@@ -1,26 +1,103 @@
 import base64
-from cryptography.fernet import Fernet
+import os
+import struct
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+# Binary record layout: version byte + 12-byte nonce + AES-GCM ciphertext and tag.
+# Legacy Fernet tokens are base64 text starting with "gA", so they can never
+# start with this version byte.
+RECORD_VERSION = b'\x01'
+NONCE_SIZE = 12
+
+# What decrypt() raises for a damaged or tampered record: a failed tag check,
+# a bad Fernet token, a truncated blob or a key id missing from the keyring
+DECRYPT_ERRORS = (InvalidTag, InvalidToken, ValueError, KeyError)
+
 class Encryptor:
-    def __init__(self, master_key: str):
-        self.salt = b'securesalt'  # In production, use a random salt
-        self.key = self._generate_key(master_key)
-        self.fernet = Fernet(self.key)
+    def __init__(self, data_keys: dict, active_key_id: int):
+        # data_keys maps key ids to the vault's random 32-byte keys (see
+        # Auth.unwrap_data_keys). Several keys coexist while a rotation re-encrypts
+        # rows; new data is always written under the active one.
+        self._ciphers = {}
+        self._data_keys = {}
+        for key_id, data_key in data_keys.items():
+            self.add_key(key_id, data_key)
+        self.active_key_id = active_key_id
+
+    def add_key(self, key_id: int, data_key: bytes):
+        self._data_keys[key_id] = data_key
+        fernet = Fernet(base64.urlsafe_b64encode(data_key))  # Only used to read legacy rows
+        self._ciphers[key_id] = (fernet, AESGCM(self._record_key(data_key)))
+
+    def remove_key(self, key_id: int):
+        self._ciphers.pop(key_id, None)
+        self._data_keys.pop(key_id, None)
+
+    def key_ids(self) -> list:
+        return list(self._ciphers)
+
+    def wipe(self):
+        """Forget every key and cipher, e.g. when the session locks; add_key() brings them back."""
+        self._ciphers.clear()
+        self._data_keys.clear()
+
+    @property
+    def locked(self) -> bool:
+        return not self._ciphers
 
-    def _generate_key(self, master_key: str) -> bytes:
+    @staticmethod
+    def derive_legacy_key(master_key: str) -> bytes:
+        """Derive the key older versions encrypted rows with, straight from the master password."""
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
-            salt=self.salt,
+            salt=b'securesalt',
             iterations=100000,
         )
-        key = base64.urlsafe_b64encode(kdf.derive(master_key.encode()))
-        return key
+        return kdf.derive(master_key.encode())
+
+    def _record_key(self, raw_key: bytes) -> bytes:
+        # Separate subkey, so the AES-GCM key is never the Fernet key material
+        return self._subkey(raw_key, b'securepass record v1')
+
+    @staticmethod
+    def _subkey(raw_key: bytes, info: bytes) -> bytes:
+        return HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=info,
+        ).derive(raw_key)
+
+    def derive_key(self, info: bytes, key_id: int = None) -> bytes:
+        """Derive a purpose-specific key (e.g. for backups) from a data key, the active one by default."""
+        return self._subkey(self._data_keys[self.active_key_id if key_id is None else key_id], info)
+
+    @staticmethod
+    def _associated_data(row_id: int) -> bytes:
+        # Binding the row id stops a ciphertext from being moved to another row
+        return struct.pack('>q', row_id)
+
+    @staticmethod
+    def is_legacy(encrypted_data: bytes) -> bool:
+        return encrypted_data[:1] != RECORD_VERSION
 
-    def encrypt(self, data: str) -> bytes:
-        return self.fernet.encrypt(data.encode())
+    def encrypt(self, data: str, row_id: int) -> bytes:
+        """Encrypt under the active key; store active_key_id alongside the result."""
+        aesgcm = self._ciphers[self.active_key_id][1]
+        nonce = os.urandom(NONCE_SIZE)
+        ciphertext = aesgcm.encrypt(nonce, data.encode(), self._associated_data(row_id))
+        return RECORD_VERSION + nonce + ciphertext
 
-    def decrypt(self, encrypted_data: bytes) -> str:
-        return self.fernet.decrypt(encrypted_data).decode()
\ No newline at end of file
+    def decrypt(self, encrypted_data: bytes, row_id: int = None, key_id: int = None) -> str:
+        fernet, aesgcm = self._ciphers[self.active_key_id if key_id is None else key_id]
+        if self.is_legacy(encrypted_data):
+            return fernet.decrypt(encrypted_data).decode()
+        nonce = encrypted_data[1:1 + NONCE_SIZE]
+        ciphertext = encrypted_data[1 + NONCE_SIZE:]
+        return aesgcm.decrypt(nonce, ciphertext, self._associated_data(row_id)).decode()
\ No newline at end of file
@@ -2,16 +2,16 @@ import os
 import json
 import sqlite3
 
-def init_program_files():
-    """Initialize config.json and passwords.db if they don't exist"""
+def init_program_files(config_file: str = 'config.json', db_path: str = 'passwords.db'):
+    """Initialize a vault's config file and database if they don't exist"""
     # Initialize config.json
-    if not os.path.exists('config.json'):
-        with open('config.json', 'w') as f:
+    if not os.path.exists(config_file):
+        with open(config_file, 'w') as f:
             json.dump({"master_hash": None, "salt": None}, f)
 
     # Initialize passwords.db and create tables
-    if not os.path.exists('passwords.db'):
-        conn = sqlite3.connect('passwords.db')
+    if not os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
         # Create passwords table
@@ -0,0 +1,72 @@
+import bisect
+
+class PrefixIndex:
+    """Case-insensitive sorted word index answering prefix lookups by bisection.
+
+    Each word can carry a set of references (e.g. password ids) so the same
+    structure serves plain autocomplete and lookups of the entries behind a word.
+    """
+
+    def __init__(self, words=()):
+        self._keys = []      # folded words, kept sorted
+        self._entries = {}   # folded word -> [display word, set of refs]
+        for word in words:
+            self.add(word)
+
+    @staticmethod
+    def _fold(word: str) -> str:
+        return word.strip().casefold()
+
+    def add(self, word: str, ref=None):
+        key = self._fold(word)
+        if not key:
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [word.strip(), set()]
+            bisect.insort(self._keys, key)
+        if ref is not None:
+            entry[1].add(ref)
+
+    def discard(self, word: str, ref=None):
+        """Drop a reference from a word, or the whole word when ref is None.
+
+        A word whose last reference is removed is dropped as well.
+        """
+        key = self._fold(word)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if ref is not None:
+            entry[1].discard(ref)
+            if entry[1]:
+                return
+        del self._entries[key]
+        del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def _range(self, prefix: str):
+        key = self._fold(prefix)
+        start = bisect.bisect_left(self._keys, key)
+        # U+10FFFF sorts after every other character, closing the prefix range
+        end = bisect.bisect_left(self._keys, key + '\U0010ffff', start)
+        return start, end
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """Return up to `limit` words starting with `prefix`, in sorted order."""
+        start, end = self._range(prefix)
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._entries[key][0] for key in self._keys[start:end]]
+
+    def refs_with_prefix(self, prefix: str) -> set:
+        start, end = self._range(prefix)
+        refs = set()
+        for key in self._keys[start:end]:
+            refs |= self._entries[key][1]
+        return refs
+
+    def __contains__(self, word: str) -> bool:
+        return self._fold(word) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._keys)
\ No newline at end of file
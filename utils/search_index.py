@@ -0,0 +1,188 @@
+import heapq
+import itertools
+import re
+import threading
+from array import array
+
+_TERM_SPLIT = re.compile(r'[^\w]+')
+
+def _searchable(website: str, username: str) -> str:
+    website = (website or '').split('://', 1)[-1]
+    if website[:4].lower() == 'www.':
+        website = website[4:]
+    return f"{website}\n{username or ''}".casefold()
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SearchIndex:
+    """In-memory index over websites and usernames for search-as-you-type.
+
+    Every query term has to occur in the entry's website or username; entries
+    where all terms start a word ("goo" in "mail.google.com") rank above those
+    that merely contain them. Within each group the most used entries come
+    first (by the frecency scores given to set_scores()), then the rest most
+    recently changed first.
+
+    Selective queries are answered from a trigram index: the entries listed
+    under the query's rarest trigram are the candidates, each confirmed
+    against its text. Short or very common terms would make that candidate
+    list most of the vault, so those scan the entries in rank order instead,
+    used ones by score and then the others newest first, and stop as soon as
+    enough word matches are found.
+
+    Updates are incremental. Trigram postings are append-only arrays, so a
+    removed or edited entry leaves stale ids behind; the check against the
+    entry's current text filters them out, and the postings are rebuilt once
+    stale ids outnumber live ones. A lock lets the write queue's thread
+    apply edits while the UI searches.
+    """
+
+    def __init__(self, entries=()):
+        """`entries` are (id, website, username) tuples, oldest first."""
+        self._entries = {}   # id -> (searchable text, change sequence); kept in change order
+        self._trigrams = {}  # trigram -> array of ids
+        self._scores = {}  # id -> frecency, only for entries that have been used
+        self._used = None  # ids in _scores, best first; sorted again after changes
+        self._sequence = 0
+        self._postings = 0
+        self._live_postings = 0
+        self._lock = threading.Lock()
+        for password_id, website, username in entries:
+            self._add(password_id, website, username)
+
+    def add(self, password_id: int, website: str, username: str):
+        with self._lock:
+            self._add(password_id, website, username)
+
+    def _add(self, password_id: int, website: str, username: str):
+        if password_id in self._entries:
+            score = self._scores.get(password_id)
+            self._remove(password_id)
+            if score is not None:
+                self._scores[password_id] = score  # An edit keeps the entry's usage
+        text = _searchable(website, username)
+        self._sequence += 1
+        self._entries[password_id] = (text, self._sequence)
+        trigrams = _trigrams(text)
+        for trigram in trigrams:
+            postings = self._trigrams.get(trigram)
+            if postings is None:
+                postings = self._trigrams[trigram] = array('q')
+            postings.append(password_id)
+        self._postings += len(trigrams)
+        self._live_postings += len(trigrams)
+
+    def remove(self, password_id: int):
+        with self._lock:
+            self._remove(password_id)
+
+    def _remove(self, password_id: int):
+        entry = self._entries.pop(password_id, None)
+        if entry is None:
+            return
+        if self._scores.pop(password_id, None) is not None:
+            self._used = None
+        self._live_postings -= len(_trigrams(entry[0]))
+        if self._postings > 2 * self._live_postings + 1024:
+            self._rebuild_trigrams()
+
+    def update(self, password_id: int, website: str = None, username: str = None):
+        """Re-index an edited entry; arguments left as None keep their old value."""
+        with self._lock:
+            entry = self._entries.get(password_id)
+            if entry is None:
+                return
+            old_website, old_username = entry[0].split('\n', 1)
+            self._add(password_id, old_website if website is None else website,
+                      old_username if username is None else username)
+
+    def set_scores(self, scores: dict):
+        """Update the frecency of used entries ({id: score}, see database.usage)."""
+        with self._lock:
+            for password_id, score in scores.items():
+                if password_id in self._entries and score:
+                    self._scores[password_id] = score
+            self._used = None
+
+    def most_used(self, limit: int = 20) -> list:
+        """Ids of the most used entries, best first."""
+        with self._lock:
+            return self._ranked_used()[:limit]
+
+    def _rank(self, password_id: int) -> tuple:
+        return self._scores.get(password_id, 0.0), self._entries[password_id][1]
+
+    def _ranked_used(self) -> list:
+        if self._used is None:
+            self._used = sorted(self._scores, key=self._rank, reverse=True)
+        return self._used
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._trigrams = {}
+            self._scores = {}
+            self._used = None
+            self._postings = 0
+            self._live_postings = 0
+
+    def _rebuild_trigrams(self):
+        self._trigrams = {}
+        self._postings = 0
+        for password_id, (text, _) in self._entries.items():
+            trigrams = _trigrams(text)
+            for trigram in trigrams:
+                self._trigrams.setdefault(trigram, array('q')).append(password_id)
+            self._postings += len(trigrams)
+        self._live_postings = self._postings
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Ids of the entries matching every word of `query`, best first."""
+        terms = [term for term in _TERM_SPLIT.split(query.casefold()) if term]
+        if not terms:
+            return []
+        starts = [re.compile(r'(?<!\w)' + re.escape(term)) for term in terms]
+        with self._lock:
+            return self._search(terms, starts, limit)
+
+    def _search(self, terms: list, starts: list, limit: int) -> list:
+        trigrams = set().union(*(_trigrams(term) for term in terms))
+        if any(trigram not in self._trigrams for trigram in trigrams):
+            return []
+        candidates = None
+        if trigrams:
+            rarest = min((self._trigrams[trigram] for trigram in trigrams), key=len)
+            if len(rarest) <= len(self._entries) // 8:
+                candidates = set(rarest)
+
+        word_matches = []
+        other_matches = []
+        if candidates is None:
+            # Scan in rank order; enough word matches end the scan early
+            unused = (password_id for password_id in reversed(self._entries)
+                      if password_id not in self._scores)
+            for password_id in itertools.chain(self._ranked_used(), unused):
+                text = self._entries[password_id][0]
+                if all(term in text for term in terms):
+                    if all(start.search(text) for start in starts):
+                        word_matches.append(password_id)
+                        if len(word_matches) == limit:
+                            break
+                    elif len(other_matches) < limit:
+                        other_matches.append(password_id)
+        else:
+            for password_id in candidates:
+                entry = self._entries.get(password_id)
+                if entry is None or not all(term in entry[0] for term in terms):
+                    continue
+                if all(start.search(entry[0]) for start in starts):
+                    word_matches.append(password_id)
+                else:
+                    other_matches.append(password_id)
+            word_matches = heapq.nlargest(limit, word_matches, key=self._rank)
+            other_matches = heapq.nlargest(limit, other_matches, key=self._rank)
+        return (word_matches + other_matches)[:limit]
+
+    def __len__(self) -> int:
+        return len(self._entries)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+
+class SecretCache:
+    """Small bounded cache for decrypted secrets with a short time-to-live.
+
+    Keeps repeated copies of the same credential from going back to SQLite and
+    the cipher, while bounding how many plaintexts stay in memory and for how long.
+    Entries are kept in insertion order, which with a fixed TTL is also expiry
+    order, so the oldest entry is both the first evicted and the first to expire.
+    """
+
+    def __init__(self, max_entries: int = 16, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl  # seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, secret)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, secret):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, secret)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def purge_expired(self):
+        """Drop entries whose TTL has passed, so plaintexts do not wait for a lookup."""
+        now = time.monotonic()
+        with self._lock:
+            while self._entries and next(iter(self._entries.values()))[0] <= now:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def wipe(self):
+        """Drop every cached secret, e.g. when the vault is locked or minimized."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
\ No newline at end of file
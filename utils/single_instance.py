@@ -0,0 +1,58 @@
+import hashlib
+import json
+import os
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+CONNECT_TIMEOUT = 200  # milliseconds; a live instance answers well within this
+
+def server_name(db_path: str = 'passwords.db') -> str:
+    """One name per database file, so copies of the app kept in different folders stay independent."""
+    digest = hashlib.sha1(os.path.abspath(db_path).encode('utf-8')).hexdigest()[:16]
+    return f"securepass-{digest}"
+
+def notify_running_instance(args: list, name: str = None) -> bool:
+    """Hand `args` to an already running instance; False if there is none.
+
+    Only blocking socket calls are used, so this works before a
+    QApplication exists and a second launch can exit without one.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name or server_name())
+    if not socket.waitForConnected(CONNECT_TIMEOUT):
+        return False
+    socket.write(json.dumps(args).encode('utf-8') + b'\n')
+    socket.waitForBytesWritten(CONNECT_TIMEOUT)
+    socket.disconnectFromServer()
+    return True
+
+class InstanceServer(QObject):
+    """Listens for later launches of the app and emits their arguments."""
+    activated = Signal(list)
+
+    def __init__(self, name: str = None, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.accept)
+        name = name or server_name()
+        if not self.server.listen(name):
+            # A socket file left behind by a crashed instance; nobody answered on it
+            QLocalServer.removeServer(name)
+            if not self.server.listen(name):
+                print(f"Single instance server not started: {self.server.errorString()}")
+
+    def accept(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.read(socket))
+            # The sender may hang up before readyRead is handled; read what it left first
+            socket.disconnected.connect(lambda socket=socket: (self.read(socket), socket.deleteLater()))
+
+    def read(self, socket):
+        if not socket.canReadLine():
+            return
+        try:
+            args = json.loads(bytes(socket.readLine()).decode('utf-8'))
+        except ValueError:
+            args = []
+        self.activated.emit([str(arg) for arg in args] if isinstance(args, list) else [])
\ No newline at end of file
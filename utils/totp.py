@@ -0,0 +1,47 @@
+import base64
+import hashlib
+import hmac
+import struct
+import time
+from urllib.parse import urlsplit, parse_qs
+
+DIGESTS = {'SHA1': hashlib.sha1, 'SHA256': hashlib.sha256, 'SHA512': hashlib.sha512}
+
+class Totp:
+    """RFC 6238 time-based one-time passwords for one 2FA secret.
+
+    Accepts what sites hand out: a bare base32 secret (spaces and lowercase
+    allowed) or an otpauth://totp/ link, which may also set the digits,
+    period and algorithm. Raises ValueError for anything else.
+    """
+    __slots__ = ('key', 'digits', 'period', 'digest')
+
+    def __init__(self, text: str):
+        text = text.strip()
+        self.digits, self.period, self.digest = 6, 30, hashlib.sha1
+        if text.lower().startswith('otpauth://'):
+            url = urlsplit(text)
+            if url.netloc.lower() != 'totp':
+                raise ValueError("Only time-based (totp) links are supported")
+            params = {name.lower(): values[0] for name, values in parse_qs(url.query).items()}
+            text = params.get('secret', '')
+            self.digits = int(params.get('digits', 6))
+            self.period = int(params.get('period', 30))
+            algorithm = params.get('algorithm', 'SHA1').upper()
+            if algorithm not in DIGESTS or not 6 <= self.digits <= 10 or self.period <= 0:
+                raise ValueError("Unsupported otpauth parameters")
+            self.digest = DIGESTS[algorithm]
+        secret = text.replace(' ', '').replace('-', '').upper()
+        if not secret:
+            raise ValueError("No 2FA secret given")
+        self.key = base64.b32decode(secret + '=' * (-len(secret) % 8))  # binascii.Error is a ValueError
+
+    def counter(self, now: float = None) -> int:
+        """Number of the time step `now` (default: the current time) falls in."""
+        return int((time.time() if now is None else now) // self.period)
+
+    def code(self, counter: int) -> str:
+        mac = hmac.new(self.key, struct.pack('>Q', counter), self.digest).digest()
+        offset = mac[-1] & 0x0F
+        value = struct.unpack('>I', mac[offset:offset + 4])[0] & 0x7FFFFFFF
+        return str(value % 10 ** self.digits).zfill(self.digits)
\ No newline at end of file